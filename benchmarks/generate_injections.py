@@ -0,0 +1,63 @@
+"""
+Synthetic injections log generator.
+
+Usage:
+    generate_injections.py <path> <rows> [--seed=<seed>]
+
+Options:
+    --seed=<seed>   Seed of the random amounts and types [default: 0].
+"""
+
+import random
+from datetime import datetime, timedelta
+from docopt import docopt
+from constants import INJECTIONS_FIELDNAMES
+from date_utils import get_current_date_and_time
+
+MAX_HISTORY_MINUTES = 20 * 365 * 24 * 60
+DEFAULT_STEP_MINUTES = 288
+CHUNK_SIZE = 100_000
+
+
+def generate_injections_csv(
+    path: str, rows: int, end: datetime | None = None, seed: int = 0
+):
+    """
+    Writes a chronologically sorted synthetic injections log that ends at the end date and time.
+
+    Injections are spread evenly (about five per day), closer together if the log
+    would otherwise span more than 20 years.
+
+    Args:
+        path (str): Path to a CSV file.
+        rows (int): Number of injections to generate.
+        end (datetime | None): Date and time of the last injection (now if None).
+        seed (int): Seed of the random amounts and types.
+    """
+    randomizer = random.Random(seed)
+    end = end or get_current_date_and_time()
+    step = timedelta(
+        minutes=max(1, min(DEFAULT_STEP_MINUTES, MAX_HISTORY_MINUTES // rows))
+    )
+    timestamp = end - step * (rows - 1)
+
+    with open(path, "w", newline="") as file:
+        file.write(",".join(INJECTIONS_FIELDNAMES) + "\r\n")
+        chunk = []
+        for _ in range(rows):
+            if randomizer.random() < 0.8:
+                chunk.append(f"short,{randomizer.randint(1, 15)},{timestamp}\r\n")
+            else:
+                chunk.append(f"long,{randomizer.randint(15, 30)},{timestamp}\r\n")
+            timestamp += step
+            if len(chunk) == CHUNK_SIZE:
+                file.write("".join(chunk))
+                chunk = []
+        file.write("".join(chunk))
+
+
+if __name__ == "__main__":
+    args = docopt(__doc__)
+    generate_injections_csv(
+        args["<path>"], int(args["<rows>"]), seed=int(args["--seed"])
+    )
@@ -0,0 +1,343 @@
+"""
+Diabetr benchmarks.
+Run from the project's root directory with `python -m benchmarks.run`.
+
+Usage:
+    run.py [--max-rows=<n>] [--repeat=<n>] [--latency=<ms>] [--output=<file>]
+    run.py compare <baseline> <current> [--threshold=<ratio>]
+
+Options:
+    --max-rows=<n>          Largest injections log to benchmark (10^3 to 10^7) [default: 1000000].
+    --repeat=<n>            Number of timed runs of every benchmark [default: 5].
+    --latency=<ms>          Latency of the stub Nutrition Analysis API [default: 0].
+    --output=<file>         JSON file to write the results to [default: benchmark_results.json].
+    --threshold=<ratio>     Slowdown ratio that counts as a regression [default: 1.2].
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import multiprocessing
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from docopt import docopt
+from tabulate import tabulate
+from benchmarks.generate_injections import generate_injections_csv
+from benchmarks.stub_nutrition_server import start_stub_server, get_stub_server_url
+from file_handlers import InjectionsFileHandler, DosesFileHandler
+from nutrition_client import NutritionClient
+from session import Session
+from server import DiabetrServer, serve_forever
+from helpers import (
+    get_formatted_food_list,
+    calculate_insulin_amount_for_calculated_carbs,
+)
+from nutrition_result import NutritionResult
+from dose import Dose
+from constants import TABLE_STYLE
+
+API_REQUESTS_PER_RUN = 1000
+API_ENDPOINTS = [
+    ("GET", "/doses", None),
+    ("GET", "/injections", None),
+    ("POST", "/injections", {"type": "short", "amount": 4}),
+]
+
+MEAL_INGREDIENTS = [
+    "150g potatoes",
+    "250g cooked chicken",
+    "200g rice",
+    "100g broccoli",
+    "50g cheese",
+]
+
+
+def time_function(function, repeat: int) -> dict:
+    """
+    Calls the function (once untimed to warm up) and measures its timed runs.
+
+    Args:
+        function (callable): Function without arguments to measure.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        dict: The fastest, median and mean run time in seconds.
+    """
+    function()
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+    }
+
+
+def benchmark_read_todays_injections(
+    directory: str, max_rows: int, repeat: int
+) -> list:
+    """
+    Measures reading today's injections from synthetic logs of 10^3 rows up to the maximum number of rows.
+    """
+    results = []
+    rows = 1000
+    while rows <= max_rows:
+        path = os.path.join(directory, f"injections_{rows}.csv")
+        generate_injections_csv(path, rows)
+        ifh = InjectionsFileHandler(path)
+        timings = time_function(ifh.read_todays_injections, repeat)
+        results.append(
+            {"name": "read_todays_injections", "parameters": {"rows": rows}, **timings}
+        )
+        os.remove(path)
+        rows *= 10
+    return results
+
+
+def benchmark_update_dose(directory: str, repeat: int) -> list:
+    """
+    Measures updating the short insulin dose in the doses CSV file.
+    """
+    dfh = DosesFileHandler(os.path.join(directory, "doses.csv"))
+    dfh.create_file_with_default_doses()
+    timings = time_function(lambda: dfh.update_dose(Dose("short", 1, 10)), repeat)
+    return [{"name": "update_dose", "parameters": {}, **timings}]
+
+
+def benchmark_calculation_pipeline(latency: float, repeat: int) -> list:
+    """
+    Measures the request to the stub Nutrition Analysis API, the nutrients table and the insulin calculation.
+    """
+    server = start_stub_server(latency=latency)
+    client = NutritionClient("benchmark", base_url=get_stub_server_url(server))
+    dose = Dose("short", 1, 10)
+    results = []
+    try:
+        for ingredients_count in [1, 5, 20]:
+            meal = ", ".join(
+                MEAL_INGREDIENTS[index % len(MEAL_INGREDIENTS)]
+                for index in range(ingredients_count)
+            )
+
+            def calculate():
+                result = NutritionResult.from_response(client.get_nutrition(meal))
+                get_formatted_food_list(result)
+                calculate_insulin_amount_for_calculated_carbs(result, dose)
+
+            timings = time_function(calculate, repeat)
+            results.append(
+                {
+                    "name": "get_formatted_food_list_pipeline",
+                    "parameters": {
+                        "ingredients": ingredients_count,
+                        "latency_ms": latency * 1000,
+                    },
+                    **timings,
+                }
+            )
+    finally:
+        client.close()
+        server.shutdown()
+    return results
+
+
+def serve_api_in_process(directory: str, addresses: multiprocessing.Queue):
+    """
+    Runs the JSON API service on a free port with the CSV files of the directory.
+    The listening address is put into the queue once the service has started.
+    """
+    session = Session()
+    session.doses_storage = DosesFileHandler(os.path.join(directory, "doses.csv"))
+    session.injections_storage = InjectionsFileHandler(
+        os.path.join(directory, "injections.csv")
+    )
+    asyncio.run(serve_forever(DiabetrServer(session), "127.0.0.1", 0, addresses.put))
+
+
+async def send_concurrent_requests(
+    address: tuple, request: bytes, clients: int, requests: int
+):
+    """
+    Sends the request from concurrent keep-alive connections, each waiting for its previous response.
+    """
+
+    async def send_requests_from_client(requests_count: int):
+        reader, writer = await asyncio.open_connection(*address)
+        for _ in range(requests_count):
+            writer.write(request)
+            content_length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                if line.lower().startswith(b"content-length:"):
+                    content_length = int(line.split(b":")[1])
+            await reader.readexactly(content_length)
+        writer.close()
+
+    await asyncio.gather(
+        *(
+            send_requests_from_client(
+                requests // clients + (index < requests % clients)
+            )
+            for index in range(clients)
+        )
+    )
+
+
+def benchmark_api_service(directory: str, repeat: int) -> list:
+    """
+    Measures the requests per second of the JSON API service under concurrent clients.
+    The service runs in its own process, so the clients do not compete with it for the GIL.
+    """
+    generate_injections_csv(os.path.join(directory, "injections.csv"), 10000)
+    DosesFileHandler(
+        os.path.join(directory, "doses.csv")
+    ).create_file_with_default_doses()
+    context = multiprocessing.get_context("spawn")
+    addresses = context.Queue()
+    process = context.Process(
+        target=serve_api_in_process, args=(directory, addresses), daemon=True
+    )
+    process.start()
+    results = []
+    try:
+        address = addresses.get(timeout=30)
+        for method, target, payload in API_ENDPOINTS:
+            body = b"" if payload is None else json.dumps(payload).encode()
+            request = (
+                f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode()
+            ) + body
+            for clients in [1, 8, 32]:
+                timings = time_function(
+                    lambda: asyncio.run(
+                        send_concurrent_requests(
+                            address, request, clients, API_REQUESTS_PER_RUN
+                        )
+                    ),
+                    repeat,
+                )
+                results.append(
+                    {
+                        "name": "api_service",
+                        "parameters": {
+                            "endpoint": f"{method} {target}",
+                            "clients": clients,
+                            "requests": API_REQUESTS_PER_RUN,
+                        },
+                        "requests_per_second": API_REQUESTS_PER_RUN
+                        / timings["median_s"],
+                        **timings,
+                    }
+                )
+    finally:
+        process.terminate()
+        process.join()
+    return results
+
+
+def get_git_revision() -> str | None:
+    """
+    Returns the current git commit hash (None if it cannot be determined).
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(max_rows: int, repeat: int, latency: float) -> dict:
+    """
+    Runs all of the benchmarks.
+
+    Returns:
+        dict: Environment information and the results of every benchmark.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        results = benchmark_read_todays_injections(directory, max_rows, repeat)
+        results += benchmark_update_dose(directory, repeat)
+        results += benchmark_api_service(directory, repeat)
+    results += benchmark_calculation_pipeline(latency, repeat)
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": get_git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> bool:
+    """
+    Prints the median run times of both result files side by side.
+
+    Returns:
+        bool: True if any benchmark got slower than the threshold ratio.
+    """
+    baseline_medians = {
+        (result["name"], json.dumps(result["parameters"], sort_keys=True)): result[
+            "median_s"
+        ]
+        for result in baseline["results"]
+    }
+    rows = []
+    has_regression = False
+    for result in current["results"]:
+        key = (result["name"], json.dumps(result["parameters"], sort_keys=True))
+        if key not in baseline_medians:
+            continue
+        ratio = result["median_s"] / baseline_medians[key]
+        has_regression = has_regression or ratio > threshold
+        rows.append(
+            [
+                *key,
+                f"{baseline_medians[key] * 1000:.3f}",
+                f"{result['median_s'] * 1000:.3f}",
+                f"{ratio:.2f}" + (" !" if ratio > threshold else ""),
+            ]
+        )
+    print(
+        tabulate(
+            rows,
+            ["Benchmark", "Parameters", "Baseline (ms)", "Current (ms)", "Ratio"],
+            TABLE_STYLE,
+        )
+    )
+    return has_regression
+
+
+def main():
+    args = docopt(__doc__)
+    if args["compare"]:
+        with open(args["<baseline>"]) as file:
+            baseline = json.load(file)
+        with open(args["<current>"]) as file:
+            current = json.load(file)
+        sys.exit(
+            1 if compare_results(baseline, current, float(args["--threshold"])) else 0
+        )
+
+    report = run_benchmarks(
+        int(args["--max-rows"]), int(args["--repeat"]), int(args["--latency"]) / 1000
+    )
+    with open(args["--output"], "w") as file:
+        json.dump(report, file, indent=2)
+    for result in report["results"]:
+        requests_per_second = result.get("requests_per_second")
+        print(
+            f"{result['name']} {result['parameters']}: {result['median_s'] * 1000:.3f} ms"
+            + (f" ({requests_per_second:.0f} req/s)" if requests_per_second else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Local stub of the Nutrition Analysis API.
+
+Usage:
+    stub_nutrition_server.py [--port=<port>] [--latency=<ms>]
+
+Options:
+    --port=<port>       Port to listen on [default: 8765].
+    --latency=<ms>      Delay of every response in milliseconds [default: 0].
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from docopt import docopt
+from ingredients import parse_food_input
+
+STUB_NUTRIENTS_PER_100G = {
+    "calories": 100.0,
+    "fat_total_g": 1.0,
+    "fat_saturated_g": 0.2,
+    "protein_g": 3.0,
+    "sodium_mg": 5.0,
+    "potassium_mg": 50.0,
+    "cholesterol_mg": 0.0,
+    "carbohydrates_total_g": 20.0,
+    "fiber_g": 2.0,
+    "sugar_g": 1.0,
+}
+
+
+def get_stub_response(query: str) -> dict:
+    """
+    Builds a Nutrition Analysis API-like response with the same nutrients per 100 grams for every ingredient.
+
+    Args:
+        query (str): Food list as a text.
+
+    Returns:
+        dict: Nutrition Analysis API-like response object.
+    """
+    items = []
+    for name, grams in parse_food_input(query):
+        grams = grams or 100.0
+        item = {"name": name, "serving_size_g": grams}
+        for key, value in STUB_NUTRIENTS_PER_100G.items():
+            item[key] = round(value * grams / 100, 1)
+        items.append(item)
+    return {"items": items}
+
+
+class StubNutritionRequestHandler(BaseHTTPRequestHandler):
+    """
+    Class for answering the Nutrition Analysis API requests after the server's latency.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        query = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+        body = json.dumps(get_stub_response(query)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port: int = 0, latency: float = 0) -> ThreadingHTTPServer:
+    """
+    Starts the stub server in a background thread.
+
+    Args:
+        port (int): Port to listen on (0 picks a free port).
+        latency (float): Delay of every response in seconds.
+
+    Returns:
+        ThreadingHTTPServer: A running server (its URL is `get_stub_server_url(server)`).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubNutritionRequestHandler)
+    server.latency = latency
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_stub_server_url(server: ThreadingHTTPServer) -> str:
+    """
+    Returns the URL of the stub server's nutrition endpoint.
+
+    Args:
+        server (ThreadingHTTPServer): A running stub server.
+
+    Returns:
+        str: URL to use instead of the Nutrition Analysis API's base URL.
+    """
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1/nutrition"
+
+
+if __name__ == "__main__":
+    args = docopt(__doc__)
+    server = start_stub_server(int(args["--port"]), int(args["--latency"]) / 1000)
+    print(f"Serving the stub Nutrition Analysis API at {get_stub_server_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,47 @@
+import csv
+from date_utils import convert_string_to_datetime
+
+
+def validate_injection_rows(rows) -> tuple:
+    """
+    Validates the injections rows and sorts the valid ones into chronological order.
+
+    Args:
+        rows (iterable): Dictionaries with the `type`, `amount` and `timestamp` keys.
+
+    Returns:
+        tuple: A sorted list of tuples of the timestamp (datetime), insulin type and amount
+        and the number of rejected rows.
+    """
+    valid_rows = []
+    rejected_count = 0
+    for row in rows:
+        try:
+            type = row["type"].strip().lower()
+            amount = int(row["amount"])
+            timestamp = convert_string_to_datetime(row["timestamp"].strip())
+        except (KeyError, AttributeError, TypeError, ValueError):
+            rejected_count += 1
+            continue
+        if type not in ["short", "long"] or amount <= 0:
+            rejected_count += 1
+            continue
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        valid_rows.append((timestamp, type, amount))
+    valid_rows.sort()
+    return valid_rows, rejected_count
+
+
+def read_injections_to_import(path: str) -> tuple:
+    """
+    Reads and validates the injections from a CSV file with the `type`, `amount` and `timestamp` columns.
+
+    Args:
+        path (str): Path to a CSV file.
+
+    Returns:
+        tuple: A sorted list of valid rows and the number of rejected rows.
+    """
+    with open(path, "r", newline="") as file:
+        return validate_injection_rows(csv.DictReader(file))
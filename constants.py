@@ -1,4 +1,25 @@
 NUTRITION_API_BASE_URL = "https://api.calorieninjas.com/v1/nutrition"
+NUTRITION_CACHE_PATH = "files/nutrition_cache.json"
+INGREDIENTS_CACHE_PATH = "files/ingredients_cache.json"
+NUTRITION_API_MAX_WORKERS = 4
+FOODS_DATABASE_PATH = "files/foods.db"
+FOODS_CSV_PATH = "files/foods.csv"
+INJECTIONS_CSV_PATH = "files/injections.csv"
+INJECTIONS_PARTITIONS_PATH = "files/injections"
+DOSES_CSV_PATH = "files/doses.csv"
+SAVED_MEALS_PATH = "files/meals.json"
+SAVED_MEALS_REFRESH_TIMEOUT = 10
+GLUCOSE_PATH = "files/glucose"
+GLUCOSE_MAX_ROWS = 96
+DATABASE_PATH = "files/diabetr.db"
+NUTRITION_API_CONNECT_TIMEOUT = 3.05
+NUTRITION_API_READ_TIMEOUT = 10
+NUTRITION_API_MAX_RETRIES = 2
+NUTRITION_API_BACKOFF_FACTOR = 0.5
+NUTRITION_API_USAGE_PATH = "files/nutrition_api_usage.json"
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_MAX_BODY_SIZE = 64 * 1024
 MAIN_MENU_OPTIONS = [
     "[1] Calculate Meal's Carbohydrates",
     "[2] View Current Insulin Doses",
@@ -6,12 +27,38 @@ MAIN_MENU_OPTIONS = [
     "[4] Change Long Insulin Dose",
     "[5] View Today's Injections",
     "[6] Create New Injection",
-    "[7] Quit",
+    "[7] Calculate Saved Meal",
+    "[8] Save New Meal",
+    "[9] Quit",
 ]
 DATETIME_FORMAT = "%Y-%m-%d %H:%M"
 INJECTIONS_FIELDNAMES = ["type", "amount", "timestamp"]
 DOSES_FIELDNAMES = ["type", "insulin_amount", "carbs_amount"]
 TABLE_STYLE = "rounded_grid"
+TABLE_PAGE_SIZE = 50
 NUTRIENTS_TABLE_HEADERS = ["Food", "Calories", "Fat", "Carbohydrates", "Protein"]
+NUTRIENT_KEYS = ["calories", "fat_total_g", "carbohydrates_total_g", "protein_g"]
+SAVED_MEALS_TABLE_HEADERS = [
+    "Meal",
+    "Food",
+    "Calories",
+    "Fat",
+    "Carbohydrates",
+    "Protein",
+    "Saved",
+]
+BATCH_TABLE_HEADERS = ["Meal", "Calories", "Fat", "Carbohydrates", "Protein", "Insulin"]
 DOSES_TABLE_HEADERS = ["Type", "Insulin Amount", "For Amount of Carbohydrates"]
 INJECTIONS_TABLE_HEADERS = ["Type", "Amount", "Date and Time"]
+GLUCOSE_TABLE_HEADERS = ["Date and Time", "Min", "Mean", "Max", "Injections"]
+REPORT_TABLE_HEADERS = [
+    "Date",
+    "Short",
+    "Long",
+    "7-Day Avg (Short / Long)",
+    "14-Day Avg (Short / Long)",
+    "30-Day Avg (Short / Long)",
+]
+HISTOGRAM_TABLE_HEADERS = ["Hour", "Short Insulin Injections", ""]
+PROFILE_TABLE_HEADERS = ["Phase", "Calls", "Time (ms)", "Share"]
+USAGE_TABLE_HEADERS = ["Month", "Requests", "Rate Limited", "Coalesced", "Waited (s)"]
@@ -0,0 +1,260 @@
+"""
+Programmatic API of diabetr.
+
+The functions return structured results and never prompt or print, so they can be called
+from other tools (thousands of times) without starting a new `main.py` process each time.
+The session (with its Nutrition Analysis API client and connections) and the nutrition
+caches (one instance per file, flushed at exit) are shared by the calls.
+
+    import diabetr
+
+    result = diabetr.calculate("150g potatoes, 250g cooked chicken")
+    diabetr.log_injection("short", result.insulin_amount)
+"""
+
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime
+from dose import Dose
+from injection import Injection
+from date_utils import get_current_date_and_time
+from nutrition_result import NutritionResult, to_nutrition_result
+import helpers
+
+
+@dataclass
+class Result:
+    """
+    Data class for storing the result of a meal's calculation.
+
+    Attributes:
+        meal (str): Food list as a text.
+        items (list): Name and nutrients of each food item (empty if the food input was unknown).
+        total (dict): Total nutrients of the meal, rounded to one decimal.
+        insulin_amount (int): Amount of insulin to inject for the meal.
+    """
+
+    meal: str
+    items: list = field(default_factory=list)
+    total: dict = field(default_factory=dict)
+    insulin_amount: int = 0
+
+    def to_dict(self) -> dict:
+        """
+        Converts the result into a dictionary (e.g. to serialize it as JSON).
+
+        Returns:
+            dict: Meal, items, total nutrients and insulin amount.
+        """
+        return asdict(self)
+
+
+def build_result(meal: str, response: dict | NutritionResult, dose: Dose) -> Result:
+    """
+    Builds the calculation result from the Nutrition Analysis API response.
+
+    Args:
+        meal (str): Food list as a text.
+        response (dict | NutritionResult): Nutrition Analysis API response object or its parsed result.
+        dose (Dose): A short insulin dose object.
+
+    Returns:
+        Result: A calculation result object.
+    """
+    result = to_nutrition_result(response)
+    return Result(
+        meal,
+        result.get_items(),
+        result.get_rounded_totals(),
+        helpers.calculate_insulin_amount_for_calculated_carbs(result, dose),
+    )
+
+
+def calculate(meal: str) -> Result:
+    """
+    Calculates the nutrients of the meal and the amount of short insulin to inject for it.
+
+    Args:
+        meal (str): Food list as a text (e.g. '150g potatoes, 250g cooked chicken').
+
+    Returns:
+        Result: A calculation result object.
+
+    Raises:
+        ValueError: if the food list is empty.
+        NutritionAPIError: if the request to the Nutrition Analysis API failed.
+    """
+    if not meal.strip():
+        raise ValueError("Food list cannot be empty!")
+    response = helpers.get_nutrition_analysis_by_ingredients(meal)
+    return build_result(meal, response, get_short_dose())
+
+
+def calculate_many(meals: list) -> list:
+    """
+    Calculates the meals, sending their requests to the Nutrition Analysis API concurrently.
+
+    Args:
+        meals (list): A list of meals as texts.
+
+    Returns:
+        list: Result objects or NutritionAPIError objects (if the request failed), in the meals order.
+    """
+    dose = get_short_dose()
+    return [
+        (
+            response
+            if isinstance(response, Exception)
+            else build_result(meal, response, dose)
+        )
+        for meal, response in zip(meals, helpers.get_batch_nutrition_analysis(meals))
+    ]
+
+
+def calculate_saved_meal(name: str) -> Result:
+    """
+    Calculates the saved meal from its stored nutrients (without the Nutrition Analysis API).
+
+    Args:
+        name (str): Name of the saved meal.
+
+    Returns:
+        Result: A calculation result object.
+
+    Raises:
+        KeyError: if there is no saved meal with this name.
+    """
+    meal = helpers.get_saved_meals().get_meal(name)
+    if meal is None:
+        raise KeyError(name)
+    return Result(
+        meal["food"],
+        meal["items"],
+        meal["total"],
+        helpers.calculate_insulin_amount(
+            meal["total"]["carbohydrates_total_g"], get_short_dose()
+        ),
+    )
+
+
+def save_meal(name: str, meal: str) -> Result:
+    """
+    Calculates the meal and saves it with its nutrients under the name.
+
+    Args:
+        name (str): Name of the saved meal.
+        meal (str): Food list as a text.
+
+    Returns:
+        Result: A calculation result object.
+
+    Raises:
+        ValueError: if the name or the food list is empty or the food input was unknown.
+        NutritionAPIError: if the request to the Nutrition Analysis API failed.
+    """
+    if not meal.strip():
+        raise ValueError("Food list cannot be empty!")
+    response = helpers.get_nutrition_analysis_by_ingredients(meal)
+    helpers.get_saved_meals().save_meal(name, meal, response)
+    return build_result(meal, response, get_short_dose())
+
+
+def log_injection(
+    type: str, amount: int, timestamp: datetime | None = None
+) -> Injection:
+    """
+    Saves a new injection.
+
+    Injections with a timestamp are merged into the storage in time order (an identical saved
+    injection is not saved again), because the storages append new injections to the end.
+
+    Args:
+        type (str): Insulin's type ('short', 'long').
+        amount (int): Amount of insulin injected.
+        timestamp (datetime | None): Date and time of the injection (now if omitted).
+
+    Returns:
+        Injection: The saved injection object.
+
+    Raises:
+        ValueError: if the type, amount or timestamp is invalid.
+    """
+    if timestamp is None:
+        injection = Injection(type, amount, get_current_date_and_time())
+        helpers.get_session().save_new_injection(injection)
+        return injection
+    injection = Injection(type, amount, timestamp)
+    helpers.get_session().injections_storage.import_injections(
+        [(injection.timestamp, injection.type, injection.amount)]
+    )
+    return injection
+
+
+def get_todays_injections() -> list:
+    """
+    Returns today's injections.
+
+    Returns:
+        list: Injection objects (empty if no injections were saved today).
+    """
+    return helpers.get_session().get_todays_injections() or []
+
+
+def get_injections(start: date, end: date) -> list:
+    """
+    Returns the injections that were saved between the start and end dates (both inclusive).
+
+    Args:
+        start (date): First day of the range.
+        end (date): Last day of the range.
+
+    Returns:
+        list: Injection objects in chronological order.
+    """
+    return list(helpers.get_session().injections_storage.iter_injections(start, end))
+
+
+def get_doses() -> list:
+    """
+    Returns the insulin doses.
+
+    Returns:
+        list: Insulin dose objects.
+    """
+    return list(helpers.get_session().get_doses())
+
+
+def get_short_dose() -> Dose:
+    """
+    Returns the short insulin dose.
+
+    Returns:
+        Dose: An insulin dose object.
+    """
+    return helpers.get_session().get_short_dose()
+
+
+def update_dose(type: str, insulin_amount: int, carbs_amount: int = 0) -> Dose:
+    """
+    Updates the insulin dose.
+
+    Args:
+        type (str): Insulin's type ('short', 'long').
+        insulin_amount (int): Amount of insulin.
+        carbs_amount (int): Amount of carbohydrates covered by the insulin amount (short insulin only).
+
+    Returns:
+        Dose: The updated insulin dose object.
+
+    Raises:
+        ValueError: if the type or any of the amounts is invalid.
+    """
+    dose = Dose(type, insulin_amount, carbs_amount)
+    helpers.get_session().update_dose(dose)
+    return dose
+
+
+def close():
+    """
+    Closes the pooled connections of the Nutrition Analysis API client.
+    """
+    helpers.get_session().close()
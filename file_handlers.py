@@ -1,25 +1,125 @@
 import os
 import csv
+import mmap
+import bisect
+import heapq
+from array import array
+from itertools import groupby
+from datetime import date, datetime
 from date_utils import get_current_date, convert_string_to_datetime
 from constants import INJECTIONS_FIELDNAMES, DOSES_FIELDNAMES
 from injection import Injection
+from injection_table import (
+    InjectionTable,
+    INJECTION_TYPE_CODES,
+    datetime_to_epoch_minute,
+)
 from dose import Dose
+from storage import InjectionsStorage, DosesStorage
+from profiling import span
+from safe_files import lock_file, open_for_replace
 
 
-class InjectionsFileHandler:
+def iter_lines_backwards(mm: mmap.mmap):
+    """
+    Yields the non-empty lines of a memory-mapped file starting from the last one.
+
+    Args:
+        mm (mmap.mmap): Memory-mapped file.
+
+    Yields:
+        tuple: Byte offset of the line's start and the line without its line ending.
+    """
+    end = len(mm)
+    while end > 0:
+        start = mm.rfind(b"\n", 0, end - 1) + 1
+        line = mm[start:end].rstrip(b"\r\n")
+        if line:
+            yield start, line
+        end = start
+
+
+def parse_injection_line(line: str) -> Injection:
+    """
+    Parses a row of the injections CSV file.
+
+    Args:
+        line (str): Row of the injections CSV file without its line ending.
+
+    Returns:
+        Injection: An injection object.
+    """
+    type, amount, timestamp = line.split(",")
+    return Injection(type, int(amount), convert_string_to_datetime(timestamp))
+
+
+def count_daily_totals(lines) -> list:
+    """
+    Counts the number of injections and the sum of their amounts per insulin type for each day.
+
+    Args:
+        lines (iterable): Chronologically sorted rows of the injections CSV file without their line endings.
+
+    Returns:
+        list: Tuples of the day (YYYY-MM-DD), number and sum of short insulin injections,
+        number and sum of long insulin injections.
+    """
+    daily_totals = []
+    for line in lines:
+        type, amount, timestamp = line.split(",")
+        day = timestamp[:10]
+        if not daily_totals or daily_totals[-1][0] != day:
+            daily_totals.append([day, 0, 0, 0, 0])
+        column = 1 + 2 * INJECTION_TYPE_CODES[type]
+        daily_totals[-1][column] += 1
+        daily_totals[-1][column + 1] += int(amount)
+    return [tuple(totals) for totals in daily_totals]
+
+
+def read_injection_table_from_lines(lines) -> InjectionTable:
+    """
+    Reads the trusted rows of the injections CSV file into columns without creating Injection objects.
+
+    Args:
+        lines (iterable): Chronologically sorted rows of the injections CSV file without their line endings.
+
+    Returns:
+        InjectionTable: An injection table object.
+    """
+    minutes, amounts, types = array("i"), array("H"), array("B")
+    for line in lines:
+        type, amount, timestamp = line.split(",")
+        minutes.append(datetime_to_epoch_minute(datetime.fromisoformat(timestamp)))
+        amounts.append(int(amount))
+        types.append(INJECTION_TYPE_CODES[type])
+    return InjectionTable.from_columns(minutes, amounts, types)
+
+
+class InjectionsFileHandler(InjectionsStorage):
     """
     Class for reading/writing injections data from/to CSV file.
 
+    Next to the CSV file a sidecar day index is kept, which maps each day
+    to the byte offset of its first row in the CSV file, and a daily rollup,
+    which keeps the number and sum of injections per insulin type for each day.
+
     Attributes:
         path (str): Path to a CSV file.
+        index_path (str): Path to a day index CSV file.
+        rollup_path (str): Path to a daily rollup CSV file.
     """
 
     def __init__(self, path: str):
         self.path = path
+        self.index_path = f"{os.path.splitext(path)[0]}_index.csv"
+        self.rollup_path = f"{os.path.splitext(path)[0]}_daily.csv"
 
     def read_todays_injections(self) -> list | None:
         """
-        Reads the CSV file and returns a list of injections that were saved today.
+        Reads the CSV file backwards from its end and returns a list of injections that were saved today.
+
+        The injections log is append-only and sorted by time, so the file is memory-mapped
+        and scanned from the last row until a row from an earlier day is found.
 
         Returns:
             list: If there is at least one injection saved today.
@@ -28,18 +128,24 @@ class InjectionsFileHandler:
         if not os.path.exists(self.path):
             self.create_file_with_header()
 
+        today = get_current_date().isoformat()
         todays_injections = []
-        with open(self.path, "r") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                date = convert_string_to_datetime(row["timestamp"]).date()
-                if date == get_current_date():
-                    datetime_timestamp = convert_string_to_datetime(row["timestamp"])
-                    todays_injections.append(
-                        Injection(row["type"], int(row["amount"]), datetime_timestamp)
-                    )
+        with span("csv read"), open(self.path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, line in iter_lines_backwards(mm):
+                    if start == 0:
+                        break
+                    line = line.decode()
+                    day = line[line.rindex(",") + 1 :][:10]
+                    if day < today:
+                        break
+                    if day == today:
+                        todays_injections.append(parse_injection_line(line))
         if not todays_injections:
             return None
+        todays_injections.reverse()
         return todays_injections
 
     def save_new_injection(self, injection: Injection):
@@ -49,26 +155,398 @@ class InjectionsFileHandler:
         Args:
             injection (Injection): Injection object to save.
         """
-        write_header = False
+        with lock_file(self.path):
+            write_header = False
+            if not os.path.exists(self.path):
+                write_header = True
+
+            day_index_is_fresh = not write_header and self.is_day_index_fresh()
+            daily_rollup_is_fresh = not write_header and self.is_daily_rollup_fresh()
+
+            with span("csv write"), open(self.path, "a", newline="") as file:
+                writer = csv.DictWriter(file, INJECTIONS_FIELDNAMES)
+                if write_header:
+                    writer.writeheader()
+                offset = file.tell()
+                writer.writerow(injection.to_dict())
+
+            if day_index_is_fresh:
+                self.add_day_to_index(injection.timestamp.date().isoformat(), offset)
+            else:
+                self.rebuild_day_index()
+            if daily_rollup_is_fresh:
+                self.add_to_daily_rollup(injection)
+            else:
+                self.rebuild_daily_rollup()
+
+    def import_injections(self, rows: list) -> int:
+        """
+        Merges the chronologically sorted rows into the CSV file with a single buffered write.
+
+        Only the part of the file starting from the first day of the imported rows is rewritten
+        (nothing is rewritten if all of the rows are newer than the saved ones).
+        Rows that are already saved (or repeated in the imported rows) are skipped.
+
+        Args:
+            rows (list): Sorted tuples of the timestamp (datetime), insulin type and amount.
+
+        Returns:
+            int: Number of imported rows.
+        """
+        if not rows:
+            return 0
+        with lock_file(self.path):
+            if not os.path.exists(self.path):
+                self.create_file_with_header()
+
+            # The rollup has to be read before the CSV file is written, or it would be outdated.
+            saved_daily_totals = (
+                self.read_daily_rollup() if self.is_daily_rollup_fresh() else None
+            )
+            day_index = self.read_day_index()
+            position = bisect.bisect_left(day_index, (rows[0][0].date().isoformat(),))
+            with span("csv write"), open(self.path, "r+b") as file:
+                file_size = os.fstat(file.fileno()).st_size
+                offset = (
+                    day_index[position][1] if position < len(day_index) else file_size
+                )
+                file.seek(max(0, offset - 1))
+                separator = "" if offset == 0 or file.read(1) == b"\n" else "\r\n"
+                saved_lines = [
+                    line.decode().rstrip("\r\n") for line in file if line.strip()
+                ]
+                known_lines = set(saved_lines)
+                new_lines = [
+                    line
+                    for line in (
+                        f"{type},{amount},{timestamp}"
+                        # Identical rows are next to each other in the sorted rows.
+                        for (timestamp, type, amount), _ in groupby(rows)
+                    )
+                    if line not in known_lines
+                ]
+
+                day_index = day_index[:position]
+                merged_lines = list(
+                    heapq.merge(
+                        saved_lines,
+                        new_lines,
+                        key=lambda line: line[line.rindex(",") + 1 :],
+                    )
+                )
+                chunks = [separator]
+                current_offset = offset + len(separator)
+                for line in merged_lines:
+                    day = line[line.rindex(",") + 1 :][:10]
+                    if not day_index or day > day_index[-1][0]:
+                        day_index.append((day, current_offset))
+                    chunk = f"{line}\r\n"
+                    chunks.append(chunk)
+                    current_offset += len(chunk.encode())
+
+                file.seek(offset)
+                file.write("".join(chunks).encode())
+                file.truncate()
+
+            self.write_day_index(day_index)
+            if saved_daily_totals is not None:
+                first_merged_day = merged_lines[0][merged_lines[0].rindex(",") + 1 :][
+                    :10
+                ]
+                self.write_daily_rollup(
+                    [
+                        totals
+                        for totals in saved_daily_totals
+                        if totals[0] < first_merged_day
+                    ]
+                    + count_daily_totals(merged_lines)
+                )
+            else:
+                self.rebuild_daily_rollup()
+            return len(new_lines)
+
+    def iter_injections(self, start: date, end: date):
+        """
+        Yields the injections that were saved between the start and end dates (both inclusive).
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Yields:
+            Injection: Injection objects in chronological order.
+        """
+        for line in self.iter_lines_in_range(start, end):
+            yield parse_injection_line(line)
+
+    def read_injection_table(self, start: date, end: date) -> InjectionTable:
+        """
+        Reads the injections that were saved between the start and end dates (both inclusive) into columns.
+
+        Rows are trusted (they were validated when saved), so no Injection objects are created.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            InjectionTable: An injection table object.
+        """
+        return read_injection_table_from_lines(self.iter_lines_in_range(start, end))
+
+    def iter_lines_in_range(self, start: date, end: date):
+        """
+        Yields the rows that were saved between the start and end dates (both inclusive).
+
+        The day index is used to seek directly to the first row of the start date,
+        so only the rows of the requested days are read.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Yields:
+            str: Rows of the CSV file without their line endings.
+        """
         if not os.path.exists(self.path):
-            write_header = True
+            return
 
-        with open(self.path, "a", newline="") as file:
-            writer = csv.DictWriter(file, INJECTIONS_FIELDNAMES)
-            if write_header:
-                writer.writeheader()
-            writer.writerow(injection.to_dict())
+        day_index = self.read_day_index()
+        position = bisect.bisect_left(day_index, (start.isoformat(),))
+        if position == len(day_index):
+            return
+
+        start_day, end_day = start.isoformat(), end.isoformat()
+        with span("csv read"), open(self.path, "rb") as file:
+            file.seek(day_index[position][1])
+            for line in file:
+                line = line.decode().rstrip("\r\n")
+                if not line:
+                    continue
+                day = line[line.rindex(",") + 1 :][:10]
+                if day > end_day:
+                    break
+                if day >= start_day:
+                    yield line
+
+    def is_day_index_fresh(self) -> bool:
+        """
+        Checks whether the day index exists and was updated after the last change of the CSV file.
+
+        Returns:
+            bool: True if the day index can be used as it is.
+        """
+        if not os.path.exists(self.index_path) or not os.path.exists(self.path):
+            return False
+        return os.stat(self.index_path).st_mtime_ns >= os.stat(self.path).st_mtime_ns
+
+    def read_day_index(self) -> list:
+        """
+        Reads the day index and rebuilds it first if it is missing or outdated.
+
+        Returns:
+            list: Sorted tuples of the day (YYYY-MM-DD) and the byte offset of its first row.
+        """
+        if not self.is_day_index_fresh():
+            return self.rebuild_day_index()
+
+        with span("csv read"), open(self.index_path, "r", newline="") as file:
+            return [(day, int(offset)) for day, offset in csv.reader(file)]
+
+    def rebuild_day_index(self) -> list:
+        """
+        Scans the whole CSV file and writes a new day index.
+
+        Returns:
+            list: Sorted tuples of the day (YYYY-MM-DD) and the byte offset of its first row.
+        """
+        with lock_file(self.path):
+            day_index = []
+            if os.path.exists(self.path):
+                with span("csv read"), open(self.path, "rb") as file:
+                    file.readline()
+                    offset = file.tell()
+                    for line in file:
+                        row = line.rstrip(b"\r\n")
+                        if row:
+                            day = row[row.rindex(b",") + 1 :][:10].decode()
+                            if not day_index or day > day_index[-1][0]:
+                                day_index.append((day, offset))
+                        offset += len(line)
+
+            self.write_day_index(day_index)
+            return day_index
+
+    def write_day_index(self, day_index: list):
+        """
+        Overwrites the day index.
+
+        Args:
+            day_index (list): Sorted tuples of the day (YYYY-MM-DD) and the byte offset of its first row.
+        """
+        with span("csv write"), open_for_replace(self.index_path, "") as file:
+            csv.writer(file).writerows(day_index)
+
+    def add_day_to_index(self, day: str, offset: int):
+        """
+        Adds the day to the end of the day index if it is not the last indexed day yet.
+
+        Args:
+            day (str): Day of the newly saved row (YYYY-MM-DD).
+            offset (int): Byte offset of the newly saved row.
+        """
+        with span("csv read"), open(self.index_path, "rb") as file:
+            file.seek(max(0, os.fstat(file.fileno()).st_size - 64))
+            last_day = file.read().rstrip(b"\r\n").rsplit(b"\n", 1)[-1][:10].decode()
+
+        if day > last_day:
+            with span("csv write"), open(self.index_path, "a", newline="") as file:
+                csv.writer(file).writerow([day, offset])
+        else:
+            os.utime(self.index_path)
+
+    def read_daily_totals(self, start: date, end: date) -> list:
+        """
+        Reads the daily totals of the days between the start and end dates (both inclusive) from the daily rollup.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            list: Tuples of the day (YYYY-MM-DD), number and sum of short insulin injections,
+            number and sum of long insulin injections (days without injections are left out).
+        """
+        start_day, end_day = start.isoformat(), end.isoformat()
+        return [
+            totals
+            for totals in self.read_daily_rollup()
+            if start_day <= totals[0] <= end_day
+        ]
+
+    def get_revision(self) -> tuple | None:
+        """
+        Returns the CSV file's modification time and size, which change whenever the file is written.
+
+        Returns:
+            tuple: Modification time (in nanoseconds) and size of the file.
+            None: If the file does not exist.
+        """
+        if not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def rebuild_daily_totals(self):
+        """
+        Rebuilds the day index and the daily rollup from the CSV file.
+        """
+        self.rebuild_day_index()
+        self.rebuild_daily_rollup()
+
+    def is_daily_rollup_fresh(self) -> bool:
+        """
+        Checks whether the daily rollup exists and was updated after the last change of the CSV file.
+
+        Returns:
+            bool: True if the daily rollup can be used as it is.
+        """
+        if not os.path.exists(self.rollup_path) or not os.path.exists(self.path):
+            return False
+        return os.stat(self.rollup_path).st_mtime_ns >= os.stat(self.path).st_mtime_ns
+
+    def read_daily_rollup(self) -> list:
+        """
+        Reads the daily rollup and rebuilds it first if it is missing or outdated.
+
+        Returns:
+            list: Chronologically sorted tuples of the day's totals.
+        """
+        if not self.is_daily_rollup_fresh():
+            return self.rebuild_daily_rollup()
+
+        with span("csv read"), open(self.rollup_path, "r", newline="") as file:
+            return [
+                (day, *(int(value) for value in totals))
+                for day, *totals in csv.reader(file)
+            ]
+
+    def rebuild_daily_rollup(self) -> list:
+        """
+        Scans the whole CSV file and writes a new daily rollup.
+
+        Returns:
+            list: Chronologically sorted tuples of the day's totals.
+        """
+        with lock_file(self.path):
+            daily_totals = []
+            if os.path.exists(self.path):
+                with span("csv read"), open(self.path, "r", newline="") as file:
+                    file.readline()
+                    daily_totals = count_daily_totals(
+                        line.rstrip("\r\n") for line in file if line.strip()
+                    )
+            self.write_daily_rollup(daily_totals)
+            return daily_totals
+
+    def write_daily_rollup(self, daily_totals: list):
+        """
+        Overwrites the daily rollup.
+
+        Args:
+            daily_totals (list): Chronologically sorted tuples of the day's totals.
+        """
+        with span("csv write"), open_for_replace(self.rollup_path, "") as file:
+            csv.writer(file).writerows(daily_totals)
+
+    def add_to_daily_rollup(self, injection: Injection):
+        """
+        Adds the injection to the totals of its day, rewriting only the last row of the daily rollup.
+
+        Args:
+            injection (Injection): Newly saved injection object.
+        """
+        day = injection.timestamp.date().isoformat()
+        column = 1 + 2 * INJECTION_TYPE_CODES[injection.type]
+        with span("csv write"), open(self.rollup_path, "r+b") as file:
+            file_size = os.fstat(file.fileno()).st_size
+            tail_offset = max(0, file_size - 256)
+            file.seek(tail_offset)
+            tail = file.read().rstrip(b"\r\n")
+            last_row_offset = tail_offset + tail.rfind(b"\n") + 1
+            last_row = tail[tail.rfind(b"\n") + 1 :].decode().split(",")
+
+            if last_row[0] == day:
+                totals = [day, *(int(value) for value in last_row[1:])]
+                file.seek(last_row_offset)
+            elif not last_row[0] or day > last_row[0]:
+                totals = [day, 0, 0, 0, 0]
+                file.seek(file_size)
+            else:
+                totals = None
+
+            if totals is not None:
+                totals[column] += 1
+                totals[column + 1] += injection.amount
+                file.write(f"{','.join(str(value) for value in totals)}\r\n".encode())
+                file.truncate()
+
+        if totals is None:
+            self.rebuild_daily_rollup()
 
     def create_file_with_header(self):
         """
-        Creates a new file with the header.
+        Creates a new file with the header (unless another process has just created it).
         """
-        with open(self.path, "w", newline="") as file:
-            writer = csv.DictWriter(file, INJECTIONS_FIELDNAMES)
-            writer.writeheader()
+        with lock_file(self.path):
+            if os.path.exists(self.path):
+                return
+            with span("csv write"), open(self.path, "w", newline="") as file:
+                writer = csv.DictWriter(file, INJECTIONS_FIELDNAMES)
+                writer.writeheader()
 
 
-class DosesFileHandler:
+class DosesFileHandler(DosesStorage):
     """
     Class for reading/updating insulin doses data from/to CSV file.
 
@@ -90,7 +568,7 @@ class DosesFileHandler:
             self.create_file_with_default_doses()
 
         doses = []
-        with open(self.path, "r") as file:
+        with span("csv read"), open(self.path, "r") as file:
             reader = csv.DictReader(file)
             for row in reader:
                 doses.append(
@@ -106,27 +584,47 @@ class DosesFileHandler:
         """
         Updates the insulin dose information and saves it to the CSV file.
 
+        The doses are read and written while the file is locked, so concurrent updates are not lost,
+        and the file is replaced with a fully written copy, so readers never see a partially written file.
+
         Args:
             dose (Dose): Insulin Dose object to save.
         """
-        doses = self.read_doses()
-        with open(self.path, "w", newline="") as file:
-            writer = csv.DictWriter(file, DOSES_FIELDNAMES)
-            writer.writeheader()
-            for item in doses:
-                if item.type == dose.type:
-                    item = dose
-                writer.writerow(item.to_dict())
+        with lock_file(self.path):
+            doses = self.read_doses()
+            with span("csv write"), open_for_replace(self.path, "") as file:
+                writer = csv.DictWriter(file, DOSES_FIELDNAMES)
+                writer.writeheader()
+                for item in doses:
+                    if item.type == dose.type:
+                        item = dose
+                    writer.writerow(item.to_dict())
+
+    def get_revision(self) -> tuple | None:
+        """
+        Returns the CSV file's modification time and size, which change whenever the file is written.
+
+        Returns:
+            tuple: Modification time (in nanoseconds) and size of the file.
+            None: If the file does not exist.
+        """
+        if not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
 
     def create_file_with_default_doses(self):
         """
-        Creates a new CSV file with the default values for the insulin doses.
+        Creates a new CSV file with the default values for the insulin doses (unless another process has just created it).
         """
         short_dose = Dose("short", 1, 10)
         long_dose = Dose("long", 24, 0)
 
-        with open(self.path, "w", newline="") as file:
-            writer = csv.DictWriter(file, DOSES_FIELDNAMES)
-            writer.writeheader()
-            writer.writerow(short_dose.to_dict())
-            writer.writerow(long_dose.to_dict())
+        with lock_file(self.path):
+            if os.path.exists(self.path):
+                return
+            with span("csv write"), open_for_replace(self.path, "") as file:
+                writer = csv.DictWriter(file, DOSES_FIELDNAMES)
+                writer.writeheader()
+                writer.writerow(short_dose.to_dict())
+                writer.writerow(long_dose.to_dict())
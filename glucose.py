@@ -0,0 +1,428 @@
+import os
+import csv
+import numpy as np
+from datetime import datetime
+from typing import Iterable
+from safe_files import lock_file, open_for_replace
+from injection_table import datetime_to_epoch_minute, epoch_minute_to_datetime
+
+READINGS_FILENAME = "readings.bin"
+READING_DTYPE = np.dtype([("minute", "<i4"), ("glucose", "<u2")])
+SUMMARY_DTYPE = np.dtype(
+    [
+        ("minute", "<i4"),
+        ("min", "<u2"),
+        ("max", "<u2"),
+        ("sum", "<u4"),
+        ("count", "<u2"),
+    ]
+)
+# Resolution of the readings themselves (each reading is its own bucket at its own minute).
+RAW_RESOLUTION = 1
+SUMMARY_RESOLUTIONS = [15, 60, 360, 1440]
+MMOL_TO_MGDL = 18.0
+MIN_GLUCOSE = 20
+MAX_GLUCOSE = 600
+OUT_OF_RANGE_VALUES = {"low": 40, "high": 400}
+TIMESTAMP_COLUMNS = ["timestamp", "device timestamp", "timestamp (yyyy-mm-ddthh:mm:ss)"]
+GLUCOSE_COLUMNS = [
+    "glucose",
+    "glucose value (mg/dl)",
+    "glucose value (mmol/l)",
+    "historic glucose mg/dl",
+    "historic glucose mmol/l",
+]
+TIMESTAMP_FORMATS = ["%d-%m-%Y %H:%M", "%m-%d-%Y %I:%M %p"]
+
+
+def parse_reading_timestamp(timestamp_string: str) -> datetime:
+    """
+    Parses the CGM reading's date and time (ISO format or the formats of the CGM exports).
+
+    Args:
+        timestamp_string (str): Date and time string.
+
+    Returns:
+        datetime: Local date and time of the reading.
+
+    Raises:
+        ValueError: if the string is not in any of the supported formats.
+    """
+    try:
+        timestamp = datetime.fromisoformat(timestamp_string)
+    except ValueError:
+        for timestamp_format in TIMESTAMP_FORMATS:
+            try:
+                return datetime.strptime(timestamp_string, timestamp_format)
+            except ValueError:
+                pass
+        raise
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def parse_glucose_value(value_string: str, is_mmol: bool) -> int:
+    """
+    Parses the CGM reading's glucose value into mg/dL.
+
+    Args:
+        value_string (str): Glucose value ('Low' and 'High' are the sensor's limits).
+        is_mmol (bool): Whether the value is in mmol/L.
+
+    Returns:
+        int: Glucose value (mg/dL).
+
+    Raises:
+        ValueError: if the value is not a number or is out of the possible range.
+    """
+    value_string = value_string.strip().lower()
+    if value_string in OUT_OF_RANGE_VALUES:
+        return OUT_OF_RANGE_VALUES[value_string]
+    value = float(value_string)
+    glucose = round(value * MMOL_TO_MGDL if is_mmol else value)
+    if not MIN_GLUCOSE <= glucose <= MAX_GLUCOSE:
+        raise ValueError(f"Glucose value {value_string} is out of range.")
+    return glucose
+
+
+def find_csv_header(lines: list) -> tuple:
+    """
+    Finds the header of the CGM export and the columns of the readings' timestamp and glucose value.
+
+    Exports may start with lines of the device's metadata before the header.
+
+    Args:
+        lines (list): Lines of the CSV file.
+
+    Returns:
+        tuple: Index of the header line, timestamp column, glucose column and whether the values are in mmol/L.
+
+    Raises:
+        ValueError: if none of the lines is a supported header.
+    """
+    for index, row in enumerate(csv.reader(lines)):
+        columns = [column.strip().lower() for column in row]
+        timestamp_column = next(
+            (column for column in columns if column in TIMESTAMP_COLUMNS), None
+        )
+        glucose_column = next(
+            (column for column in columns if column in GLUCOSE_COLUMNS), None
+        )
+        if timestamp_column and glucose_column:
+            return (
+                index,
+                row[columns.index(timestamp_column)],
+                row[columns.index(glucose_column)],
+                "mmol" in glucose_column,
+            )
+    raise ValueError("The file has no timestamp and glucose columns.")
+
+
+def read_glucose_readings_to_import(path: str) -> tuple:
+    """
+    Reads and validates the readings from a CGM CSV export (generic `timestamp` and `glucose` columns,
+    Dexcom Clarity or FreeStyle Libre).
+
+    Args:
+        path (str): Path to a CSV file.
+
+    Returns:
+        tuple: Array of valid readings sorted by time (without duplicate minutes) and the number of rejected rows
+        (rows with an empty timestamp or glucose cell, e.g. the scans of FreeStyle Libre, are skipped instead).
+
+    Raises:
+        ValueError: if the file has no timestamp and glucose columns.
+    """
+    with open(path, "r", newline="", encoding="utf-8-sig") as file:
+        lines = file.readlines()
+    header_index, timestamp_column, glucose_column, is_mmol = find_csv_header(lines)
+
+    minutes = []
+    values = []
+    rejected_count = 0
+    for row in csv.DictReader(lines[header_index:]):
+        timestamp_string = (row[timestamp_column] or "").strip()
+        glucose_string = (row[glucose_column] or "").strip()
+        if not timestamp_string or not glucose_string:
+            continue
+        try:
+            timestamp = parse_reading_timestamp(timestamp_string)
+            glucose = parse_glucose_value(glucose_string, is_mmol)
+        except ValueError:
+            rejected_count += 1
+            continue
+        minutes.append(datetime_to_epoch_minute(timestamp))
+        values.append(glucose)
+
+    readings = np.empty(len(minutes), dtype=READING_DTYPE)
+    readings["minute"] = minutes
+    readings["glucose"] = values
+    readings.sort(order="minute", kind="stable")
+    _, first_indexes = np.unique(readings["minute"], return_index=True)
+    return readings[first_indexes], rejected_count
+
+
+def downsample_readings(readings: np.ndarray, resolution: int) -> np.ndarray:
+    """
+    Summarizes the readings into buckets of the resolution with their min, max, sum and count.
+
+    Args:
+        readings (np.ndarray): Readings sorted by time.
+        resolution (int): Bucket size in minutes.
+
+    Returns:
+        np.ndarray: Summaries of the buckets that have readings, sorted by time.
+    """
+    if not len(readings):
+        return np.empty(0, dtype=SUMMARY_DTYPE)
+    buckets = readings["minute"] // resolution * resolution
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    glucose = np.asarray(readings["glucose"])
+
+    summaries = np.empty(len(starts), dtype=SUMMARY_DTYPE)
+    summaries["minute"] = buckets[starts]
+    summaries["min"] = np.minimum.reduceat(glucose, starts)
+    summaries["max"] = np.maximum.reduceat(glucose, starts)
+    summaries["sum"] = np.add.reduceat(glucose.astype(np.uint32), starts)
+    summaries["count"] = np.diff(np.r_[starts, len(glucose)])
+    return summaries
+
+
+def readings_to_summaries(readings: np.ndarray) -> np.ndarray:
+    """
+    Converts the readings into summaries of one reading each.
+
+    Args:
+        readings (np.ndarray): Readings sorted by time.
+
+    Returns:
+        np.ndarray: Summaries sorted by time.
+    """
+    summaries = np.empty(len(readings), dtype=SUMMARY_DTYPE)
+    summaries["minute"] = readings["minute"]
+    summaries["min"] = summaries["max"] = summaries["sum"] = readings["glucose"]
+    summaries["count"] = 1
+    return summaries
+
+
+class GlucoseStore:
+    """
+    Class for storing the CGM readings in fixed-width binary files.
+
+    Each reading takes 6 bytes (minutes since 1970-01-01 00:00 as a signed 32-bit integer and the
+    glucose in mg/dL as an unsigned 16-bit integer) and the readings are kept sorted by time,
+    so that the files can be memory-mapped and a time range is found with a binary search.
+    Summaries of the readings (min, max, sum and count) are kept for every resolution in `SUMMARY_RESOLUTIONS`.
+
+    Attributes:
+        directory (str): Path to the directory of the binary files.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @property
+    def readings_path(self) -> str:
+        return os.path.join(self.directory, READINGS_FILENAME)
+
+    def get_summary_path(self, resolution: int) -> str:
+        """
+        Returns the path to the summaries file of the resolution.
+
+        Args:
+            resolution (int): Bucket size in minutes.
+
+        Returns:
+            str: Path to a binary file.
+        """
+        return os.path.join(self.directory, f"readings_{resolution}m.bin")
+
+    def open_records(self, path: str, dtype: np.dtype) -> np.ndarray:
+        """
+        Memory-maps the records file for reading.
+
+        Args:
+            path (str): Path to a binary file.
+            dtype (np.dtype): Type of the records.
+
+        Returns:
+            np.ndarray: Memory-mapped records (an empty array if the file is missing or empty).
+        """
+        if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def open_readings(self) -> np.ndarray:
+        """
+        Memory-maps the readings.
+
+        Returns:
+            np.ndarray: Memory-mapped readings sorted by time.
+        """
+        return self.open_records(self.readings_path, READING_DTYPE)
+
+    def open_summaries(self, resolution: int) -> np.ndarray:
+        """
+        Memory-maps the summaries of the resolution.
+
+        Args:
+            resolution (int): Bucket size in minutes.
+
+        Returns:
+            np.ndarray: Memory-mapped summaries sorted by time.
+        """
+        return self.open_records(self.get_summary_path(resolution), SUMMARY_DTYPE)
+
+    def import_readings(self, readings: np.ndarray) -> int:
+        """
+        Saves the readings, skipping the minutes that already have a reading.
+
+        Readings newer than the saved ones are appended, older ones are merged into a rewritten file.
+        The summaries are rebuilt only from the first bucket that received a new reading.
+
+        Args:
+            readings (np.ndarray): Readings sorted by time without duplicate minutes.
+
+        Returns:
+            int: Number of imported readings.
+        """
+        if not len(readings):
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        with lock_file(self.readings_path):
+            saved_readings = self.open_readings()
+            overlapping_readings = saved_readings[
+                np.searchsorted(saved_readings["minute"], readings["minute"][0]) :
+            ]
+            readings = readings[
+                ~np.isin(readings["minute"], overlapping_readings["minute"])
+            ]
+            if not len(readings):
+                return 0
+
+            if not len(overlapping_readings):
+                with open(self.readings_path, "ab") as file:
+                    file.write(readings.tobytes())
+            else:
+                merged_readings = np.concatenate([saved_readings, readings])
+                merged_readings.sort(order="minute", kind="stable")
+                del saved_readings, overlapping_readings
+                with open_for_replace(self.readings_path, mode="wb") as file:
+                    file.write(merged_readings.tobytes())
+            self.update_summaries(int(readings["minute"][0]))
+        return len(readings)
+
+    def update_summaries(self, since_minute: int):
+        """
+        Rebuilds the summaries of every resolution from the bucket of the minute onwards.
+
+        Args:
+            since_minute (int): First minute that was changed.
+        """
+        readings = self.open_readings()
+        for resolution in SUMMARY_RESOLUTIONS:
+            bucket_minute = since_minute // resolution * resolution
+            summaries = self.open_summaries(resolution)
+            kept_summaries = np.asarray(
+                summaries[: np.searchsorted(summaries["minute"], bucket_minute)]
+            )
+            new_summaries = downsample_readings(
+                readings[np.searchsorted(readings["minute"], bucket_minute) :],
+                resolution,
+            )
+            data = kept_summaries.tobytes() + new_summaries.tobytes()
+            del summaries, kept_summaries
+            with open_for_replace(self.get_summary_path(resolution), mode="wb") as file:
+                file.write(data)
+
+    def rebuild_summaries(self):
+        """
+        Rebuilds the summaries of every resolution from all of the readings.
+        """
+        with lock_file(self.readings_path):
+            readings = self.open_readings()
+            if len(readings):
+                self.update_summaries(int(readings["minute"][0]))
+
+    def read_summaries(self, start: datetime, end: datetime, max_rows: int) -> tuple:
+        """
+        Reads the summaries of the time range at the finest resolution that fits into `max_rows` buckets.
+
+        The readings themselves are returned if there are at most `max_rows` of them in the range,
+        whatever the CGM's reading interval is. Only the records of the time range are read
+        from the memory-mapped files.
+
+        Args:
+            start (datetime): Start of the range (inclusive).
+            end (datetime): End of the range (exclusive).
+            max_rows (int): Maximum number of buckets in the range.
+
+        Returns:
+            tuple: Resolution in minutes (`RAW_RESOLUTION` for the readings themselves) and the summaries sorted by time.
+        """
+        start_minute = datetime_to_epoch_minute(start)
+        end_minute = datetime_to_epoch_minute(end)
+        readings = self.open_readings()
+        first_index, end_index = np.searchsorted(
+            readings["minute"], [start_minute, end_minute]
+        )
+        if end_index - first_index <= max_rows:
+            return RAW_RESOLUTION, readings_to_summaries(
+                np.array(readings[first_index:end_index])
+            )
+
+        resolution = next(
+            (
+                resolution
+                for resolution in SUMMARY_RESOLUTIONS
+                if (end_minute - start_minute) / resolution <= max_rows
+            ),
+            SUMMARY_RESOLUTIONS[-1],
+        )
+        summaries = self.open_summaries(resolution)
+        first_index, end_index = np.searchsorted(
+            summaries["minute"], [start_minute // resolution * resolution, end_minute]
+        )
+        return resolution, np.array(summaries[first_index:end_index])
+
+
+def get_overlay_rows(
+    summaries: np.ndarray, resolution: int, injections: Iterable
+) -> list:
+    """
+    Merges the glucose summaries and the injections into rows of the same time buckets.
+
+    Args:
+        summaries (np.ndarray): Glucose summaries sorted by time.
+        resolution (int): Bucket size in minutes.
+        injections (Iterable): Injection objects in chronological order.
+
+    Returns:
+        list: Rows of the bucket's start, min, mean and max glucose and the injections of the bucket.
+    """
+    injections_by_bucket = {}
+    for injection in injections:
+        bucket = (
+            datetime_to_epoch_minute(injection.timestamp) // resolution * resolution
+        )
+        injections_by_bucket.setdefault(bucket, []).append(
+            f"{injection.type} {injection.amount}"
+        )
+
+    glucose_by_bucket = {
+        int(summary["minute"]): (
+            int(summary["min"]),
+            round(int(summary["sum"]) / int(summary["count"])),
+            int(summary["max"]),
+        )
+        for summary in summaries
+    }
+    return [
+        [
+            epoch_minute_to_datetime(bucket),
+            *glucose_by_bucket.get(bucket, ("", "", "")),
+            ", ".join(injections_by_bucket.get(bucket, [])),
+        ]
+        for bucket in sorted(glucose_by_bucket.keys() | injections_by_bucket.keys())
+    ]
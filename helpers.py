@@ -1,50 +1,95 @@
-import requests
 import os
 import sys
+import atexit
+import time
+import functools
+import threading
 from tabulate import tabulate
 from decouple import config
 from colors import Colors
 from food import Food
-from date_utils import get_current_date_and_time
+from datetime import date, datetime, timedelta
+from itertools import chain, groupby
+from typing import TYPE_CHECKING, Iterable, Iterator
+from date_utils import get_current_date_and_time, get_current_date
 from dose import Dose
 from injection import Injection
-from file_handlers import DosesFileHandler, InjectionsFileHandler
+from session import Session, get_rate_limiter
+from rate_limiter import USAGE_COUNTERS
+from profiling import span
+from table_renderer import iter_table_pages
+from bulk_import import read_injections_to_import
+from nutrition_cache import NutritionCache
+from saved_meals import SavedMeals
+from nutrition_result import NutritionResult, to_nutrition_result
+from ingredients import parse_food_input, scale_nutrients, get_nutrients_per_100g
 from constants import (
     MAIN_MENU_OPTIONS,
-    NUTRITION_API_BASE_URL,
+    SERVER_HOST,
+    SERVER_PORT,
+    NUTRITION_CACHE_PATH,
+    INGREDIENTS_CACHE_PATH,
+    NUTRITION_API_MAX_WORKERS,
+    FOODS_DATABASE_PATH,
+    FOODS_CSV_PATH,
+    INJECTIONS_CSV_PATH,
+    INJECTIONS_PARTITIONS_PATH,
+    DOSES_CSV_PATH,
+    SAVED_MEALS_PATH,
+    SAVED_MEALS_REFRESH_TIMEOUT,
+    GLUCOSE_PATH,
+    GLUCOSE_MAX_ROWS,
+    DATABASE_PATH,
     TABLE_STYLE,
+    TABLE_PAGE_SIZE,
     NUTRIENTS_TABLE_HEADERS,
+    NUTRIENT_KEYS,
+    BATCH_TABLE_HEADERS,
+    SAVED_MEALS_TABLE_HEADERS,
     DOSES_TABLE_HEADERS,
     INJECTIONS_TABLE_HEADERS,
+    GLUCOSE_TABLE_HEADERS,
+    REPORT_TABLE_HEADERS,
+    HISTOGRAM_TABLE_HEADERS,
+    PROFILE_TABLE_HEADERS,
+    USAGE_TABLE_HEADERS,
 )
 
-try:
-    from simple_term_menu import TerminalMenu
+if TYPE_CHECKING:
+    from nutrition_client import NutritionClient
+    from nutrition_db import LocalNutritionDatabase
 
-    def init_main_menu() -> TerminalMenu:
-        """
-        Returns the TerminalMenu object for Main Menu.
-
-        Returns:
-            TerminalMenu: A Main Menu object.
-        """
-        return TerminalMenu(
-            menu_entries=MAIN_MENU_OPTIONS,
-            title="  Main Menu.\n  Press Q or Esc to Quit.\n",
-            menu_highlight_style=("fg_red",),
-            shortcut_brackets_highlight_style=("fg_red",),
-            shortcut_key_highlight_style=("fg_red",),
-        )
+# Modules that import `requests`, `numpy`, `sqlite3` or `simple_term_menu` are imported
+# inside of the functions that use them, so that every command only pays for what it uses.
+
+
+def init_main_menu():
+    """
+    Returns the TerminalMenu object for Main Menu.
+
+    Returns:
+        TerminalMenu: A Main Menu object.
 
-except NotImplementedError:
-    pass
+    Raises:
+        NotImplementedError: if the OS does not support the terminal menu.
+    """
+    from simple_term_menu import TerminalMenu
+
+    return TerminalMenu(
+        menu_entries=MAIN_MENU_OPTIONS,
+        title="  Main Menu.\n  Press Q or Esc to Quit.\n",
+        menu_highlight_style=("fg_red",),
+        shortcut_brackets_highlight_style=("fg_red",),
+        shortcut_key_highlight_style=("fg_red",),
+    )
 
 
 def clear_terminal():
     """
     Clears the terminal screen.
     """
-    os.system("cls" if os.name == "nt" else "clear")
+    with span("terminal clear"):
+        os.system("cls" if os.name == "nt" else "clear")
 
 
 def ask_user_to_input_the_food() -> str:
@@ -69,68 +114,243 @@ def ask_user_to_input_the_food() -> str:
             print(f"{Colors.WARNING}  Food list cannot be empty!{Colors.ENDC}")
 
 
-def get_nutrition_analysis(query: str) -> dict | str:
+@functools.cache
+def get_shared_cache(path: str, ttl: int, max_size: int) -> NutritionCache:
     """
-    Sends a request to Nutrition Analysis API and returns its response object.
+    Returns the cache of the file shared by the whole process, which is flushed when the process exits.
+
+    Args:
+        path (str): Path to a JSON file.
+        ttl (int): Number of seconds a cached response stays valid.
+        max_size (int): Maximum number of cached responses.
+
+    Returns:
+        NutritionCache: A cache object.
+    """
+    cache = NutritionCache(path, ttl, max_size)
+    atexit.register(cache.flush)
+    return cache
+
+
+def get_nutrition_cache() -> NutritionCache:
+    """
+    Returns the cache of Nutrition Analysis API responses configured through the environment.
+
+    Returns:
+        NutritionCache: A Nutrition Analysis API responses cache object.
+    """
+    return get_shared_cache(
+        NUTRITION_CACHE_PATH,
+        config("NUTRITION_CACHE_TTL", default=604800, cast=int),
+        config("NUTRITION_CACHE_MAX_SIZE", default=500, cast=int),
+    )
+
+
+@functools.cache
+def get_session() -> Session:
+    """
+    Returns the session shared by the whole process, which keeps the parsed data and connections between the actions.
+
+    Returns:
+        Session: A session object.
+    """
+    return Session()
+
+
+def get_nutrition_client() -> "NutritionClient":
+    """
+    Returns the Nutrition Analysis API client of the session, so that its connections are reused.
+
+    Returns:
+        NutritionClient: A Nutrition Analysis API client object.
+    """
+    return get_session().nutrition_client
+
+
+@functools.cache
+def get_local_nutrition_database() -> "LocalNutritionDatabase":
+    """
+    Returns the local nutrition database shared by the whole process.
+
+    Returns:
+        LocalNutritionDatabase: A local nutrition database object.
+    """
+    from nutrition_db import LocalNutritionDatabase
+
+    return LocalNutritionDatabase(FOODS_DATABASE_PATH, FOODS_CSV_PATH)
+
+
+def is_local_nutrition_backend() -> bool:
+    """
+    Checks whether the nutrients should be looked up in the local database instead of the Nutrition Analysis API.
+
+    Returns:
+        bool: True if `NUTRITION_BACKEND` is set to 'local'.
+    """
+    return config("NUTRITION_BACKEND", default="api").lower() == "local"
+
+
+def get_nutrition_analysis(query: str) -> dict:
+    """
+    Returns the Nutrition Analysis API response object from the local database (if it is the configured backend),
+    from the cache or sends a request to the API.
 
     Args:
         query (str): Food list as a text.
 
     Returns:
         dict: Nutrition Analysis API response object.
-        str: Error message if the request failed.
+
+    Raises:
+        NutritionAPIError: if the request to the API failed.
     """
-    params = {"query": query}
-    headers = {"X-Api-Key": config("NUTRITION_API_KEY")}
+    if is_local_nutrition_backend():
+        return get_local_nutrition_database().get_nutrition(query)
 
-    try:
-        response = requests.get(NUTRITION_API_BASE_URL, params=params, headers=headers)
-        return response.json()
-    except requests.RequestException as e:
-        return e
+    cache = get_nutrition_cache()
+    cached_response = cache.get(query)
+    if cached_response is not None:
+        return cached_response
 
+    response = get_nutrition_client().get_nutrition(query)
+    cache.set(query, response)
+    return response
 
-def get_total_nutrients_values(response: dict) -> list:
+
+def get_ingredients_cache() -> NutritionCache:
     """
-    Counts and returns the total values of nutrients in a list format.
+    Returns the cache of nutrients per 100 grams of each ingredient configured through the environment.
 
     Returns:
-        list: Total values of nutrients.
+        NutritionCache: An ingredients nutrients cache object.
     """
-    total_calories = sum(item["calories"] for item in response["items"])
-    total_fat = sum(item["fat_total_g"] for item in response["items"])
-    total_carbohydrates = sum(
-        item["carbohydrates_total_g"] for item in response["items"]
+    return get_shared_cache(
+        INGREDIENTS_CACHE_PATH,
+        config("NUTRITION_CACHE_TTL", default=604800, cast=int),
+        config("NUTRITION_CACHE_MAX_SIZE", default=500, cast=int),
     )
-    total_protein = sum(item["protein_g"] for item in response["items"])
-    return Food(
-        "Total", total_calories, total_fat, total_carbohydrates, total_protein
-    ).to_string_list()
 
 
-def get_formatted_food_list(response: dict) -> list | None:
+def get_nutrition_analyses(queries: list) -> dict:
+    """
+    Sends the queries to the Nutrition Analysis API concurrently.
+
+    Args:
+        queries (list): Food lists as a text.
+
+    Returns:
+        dict: Nutrition Analysis API response objects keyed by their queries.
+
+    Raises:
+        NutritionAPIError: if any of the requests to the API failed.
+    """
+    if not queries:
+        return {}
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(
+        max_workers=min(NUTRITION_API_MAX_WORKERS, len(queries))
+    ) as executor:
+        return dict(zip(queries, executor.map(get_nutrition_analysis, queries)))
+
+
+def get_nutrition_analysis_by_ingredients(food_input: str) -> dict:
+    """
+    Builds the Nutrition Analysis API response object from the nutrients cached per 100 grams of each ingredient.
+
+    Ingredients that are missing from the cache are sent to the API concurrently and their nutrients are cached.
+    Ingredients entered without a quantity in grams are sent to the API as they are.
+    Ingredients that the API splits into several items (e.g. 'bread with 20g butter') are not cached,
+    because the items cannot be scaled by the ingredient's quantity, so they are sent with their quantity.
+
+    Args:
+        food_input (str): Food list as a text.
+
+    Returns:
+        dict: Nutrition Analysis API response object.
+
+    Raises:
+        NutritionAPIError: if any of the requests to the API failed.
+    """
+    if is_local_nutrition_backend():
+        return get_nutrition_analysis(food_input)
+
+    ingredients = parse_food_input(food_input)
+    cache = get_ingredients_cache()
+    responses = {}
+    missed_queries = []
+    for name, grams in ingredients:
+        query = name if grams is None else f"100g {name}"
+        if query in responses or query in missed_queries:
+            continue
+        cached_response = cache.get(name) if grams is not None else None
+        if cached_response is None or len(cached_response["items"]) > 1:
+            missed_queries.append(query)
+        else:
+            responses[query] = cached_response
+
+    for query, response in get_nutrition_analyses(missed_queries).items():
+        if query.startswith("100g ") and len(response["items"]) <= 1:
+            response = {"items": list(map(get_nutrients_per_100g, response["items"]))}
+            cache.set(query.removeprefix("100g "), response)
+        responses[query] = response
+
+    # Ingredients with several items are requested again with their own quantity (unless it is 100 grams).
+    combined_queries = {
+        f"{grams:g}g {name}"
+        for name, grams in ingredients
+        if grams is not None
+        and grams != 100
+        and len(responses[f"100g {name}"]["items"]) > 1
+    }
+    responses.update(get_nutrition_analyses(sorted(combined_queries)))
+
+    items = []
+    for name, grams in ingredients:
+        if grams is None:
+            items.extend(responses[name]["items"])
+        elif len(responses[f"100g {name}"]["items"]) > 1:
+            items.extend(responses[f"{grams:g}g {name}"]["items"])
+        else:
+            items.extend(
+                scale_nutrients(item, grams / 100)
+                for item in responses[f"100g {name}"]["items"]
+            )
+    return {"items": items}
+
+
+def get_total_nutrients_values(response: dict | NutritionResult) -> list:
+    """
+    Returns the total values of nutrients in a list format.
+
+    Args:
+        response (dict | NutritionResult): A Nutrition Analysis API response or its parsed result.
+
+    Returns:
+        list: Total values of nutrients.
+    """
+    return ["Total", *map(str, to_nutrition_result(response).totals)]
+
+
+def get_formatted_food_list(response: dict | NutritionResult) -> list | None:
     """
     Formats the list from the Nutrition Analysis API response values and returns it as a list.
 
+    Args:
+        response (dict | NutritionResult): A Nutrition Analysis API response or its parsed result.
+
     Returns:
         list: A list storing each item's nutrients values.
         None: If there are no items in the Nutrition Analysis API response.
     """
-    food_list = []
-    for item in response["items"]:
-        food_list.append(
-            Food(
-                item["name"].title(),
-                item["calories"],
-                item["fat_total_g"],
-                item["carbohydrates_total_g"],
-                item["protein_g"],
-            ).to_string_list()
-        )
-    if not food_list:
+    result = to_nutrition_result(response)
+    if not result.names:
         return None
-    total_nutrients_list = get_total_nutrients_values(response)
-    food_list.append(total_nutrients_list)
+    food_list = [
+        [name.title(), *map(str, row)]
+        for name, row in zip(result.names, result.get_rows())
+    ]
+    food_list.append(get_total_nutrients_values(result))
     return food_list
 
 
@@ -146,7 +366,8 @@ def print_table_of_nutrients(food_list: list | None):
             f"{Colors.WARNING}  Could not calculate the nutrients because the provided food input was unknown!{Colors.ENDC}\n"
         )
     else:
-        print(tabulate(food_list, NUTRIENTS_TABLE_HEADERS, TABLE_STYLE))
+        with span("table rendering"):
+            print(tabulate(food_list, NUTRIENTS_TABLE_HEADERS, TABLE_STYLE))
 
 
 def get_short_dose_data() -> Dose:
@@ -156,26 +377,37 @@ def get_short_dose_data() -> Dose:
     Returns:
         Dose: An insulin dose object.
     """
-    dfh = DosesFileHandler("files/doses.csv")
-    doses = dfh.read_doses()
-
-    for dose in doses:
-        if dose.type == "short":
-            return dose
+    return get_session().get_short_dose()
 
 
-def calculate_insulin_amount_for_calculated_carbs(response: dict, dose: Dose) -> int:
+def calculate_insulin_amount_for_calculated_carbs(
+    response: dict | NutritionResult, dose: Dose
+) -> int:
     """
     Calculates the insulin amount to inject based on the total carbohydrates in a meal.
 
     Args:
-        response (dict): A Nutrition Analysis API response.
+        response (dict | NutritionResult): A Nutrition Analysis API response or its parsed result.
+        dose (Dose): A short insulin dose object.
+
+    Returns:
+        int: Insulin amount to inject for a meal.
+    """
+    total_carbs = to_nutrition_result(response).get_total("carbohydrates_total_g")
+    return calculate_insulin_amount(total_carbs, dose)
+
+
+def calculate_insulin_amount(total_carbs: float, dose: Dose) -> int:
+    """
+    Calculates the insulin amount to inject for the amount of carbohydrates.
+
+    Args:
+        total_carbs (float): Total carbohydrates (g) of a meal.
         dose (Dose): A short insulin dose object.
 
     Returns:
         int: Insulin amount to inject for a meal.
     """
-    total_carbs = sum(item["carbohydrates_total_g"] for item in response["items"])
     return round(total_carbs / dose.carbs_amount * dose.insulin_amount)
 
 
@@ -195,20 +427,335 @@ def init_carbs_calculation():
     """
     A function responsible for handling all of the calculation's logic and printing out the result into terminal.
     """
+    from nutrition_client import NutritionAPIError
+
     try:
         food_input = ask_user_to_input_the_food()
-        response = get_nutrition_analysis(food_input)
-        food_list = get_formatted_food_list(response)
+        result = NutritionResult.from_response(
+            get_nutrition_analysis_by_ingredients(food_input)
+        )
+        food_list = get_formatted_food_list(result)
         print_table_of_nutrients(food_list)
         short_insulin_dose = get_short_dose_data()
         insulin_amount_to_inject = calculate_insulin_amount_for_calculated_carbs(
-            response, short_insulin_dose
+            result, short_insulin_dose
         )
         print_insulin_amount_for_calculated_carbs(insulin_amount_to_inject)
+    except NutritionAPIError as e:
+        print(f"{Colors.FAIL}  {e.message}{Colors.ENDC}\n")
+    except KeyboardInterrupt:
+        pass
+
+
+def read_meals_from_file(path: str) -> list:
+    """
+    Reads the meals (one food list per line) from a text file.
+
+    Args:
+        path (str): Path to a text file. Empty lines and lines starting with '#' are skipped.
+
+    Returns:
+        list: A list of meals as texts.
+    """
+    with open(path, "r") as file:
+        return [
+            line.strip()
+            for line in file
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+def get_meal_nutrients_row(
+    meal: str, response: dict | NutritionResult, dose: Dose
+) -> list:
+    """
+    Returns the meal's total nutrients values and the insulin amount to inject for it.
+
+    Args:
+        meal (str): Food list as a text.
+        response (dict | NutritionResult): A Nutrition Analysis API response for the meal or its parsed result.
+        dose (Dose): A short insulin dose object.
+
+    Returns:
+        list: Meal, its total calories, fat, carbohydrates, protein and insulin amount to inject.
+    """
+    result = to_nutrition_result(response)
+    nutrients = result.get_rounded_totals().values()
+    insulin_amount = calculate_insulin_amount_for_calculated_carbs(result, dose)
+    return [meal, *nutrients, insulin_amount]
+
+
+def get_batch_nutrition_analysis(meals: list) -> list:
+    """
+    Sends the meals to the Nutrition Analysis API concurrently.
+
+    Args:
+        meals (list): A list of meals as texts.
+
+    Returns:
+        list: Nutrition Analysis API response objects or NutritionAPIError objects (if the request failed), in the meals order.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+    from nutrition_client import NutritionAPIError
+
+    def get_response(meal: str) -> dict | NutritionAPIError:
+        try:
+            return get_nutrition_analysis_by_ingredients(meal)
+        except NutritionAPIError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=NUTRITION_API_MAX_WORKERS) as executor:
+        return list(executor.map(get_response, meals))
+
+
+def print_table_of_batch_calculation(meals_rows: list):
+    """
+    Prints the table with the nutrients values and insulin amounts of every meal and their totals.
+
+    Args:
+        meals_rows (list): A list of meals rows.
+    """
+    total_row = ["Total"]
+    for column in range(1, len(BATCH_TABLE_HEADERS)):
+        total_row.append(round(sum(row[column] for row in meals_rows), 1))
+    with span("table rendering"):
+        print(tabulate([*meals_rows, total_row], BATCH_TABLE_HEADERS, TABLE_STYLE))
+
+
+def init_batch_carbs_calculation(path: str):
+    """
+    A function responsible for handling all of the batch calculation's logic and printing out the result into terminal.
+
+    Args:
+        path (str): Path to a text file with a meal on each line.
+    """
+    from nutrition_client import NutritionAPIError
+
+    try:
+        meals = read_meals_from_file(path)
+    except OSError:
+        sys.exit(f"{Colors.FAIL}Could not read the meals file '{path}'.{Colors.ENDC}")
+
+    short_insulin_dose = get_short_dose_data()
+    meals_rows = []
+    for meal, response in zip(meals, get_batch_nutrition_analysis(meals)):
+        if isinstance(response, NutritionAPIError):
+            print(f"{Colors.FAIL}  {meal}: {response.message}{Colors.ENDC}")
+        elif not response["items"]:
+            print(f"{Colors.WARNING}  {meal}: the food input was unknown!{Colors.ENDC}")
+        else:
+            meals_rows.append(
+                get_meal_nutrients_row(meal, response, short_insulin_dose)
+            )
+    if meals_rows:
+        print_table_of_batch_calculation(meals_rows)
+
+
+def get_saved_meals() -> SavedMeals:
+    """
+    Returns the saved meals storage.
+
+    Returns:
+        SavedMeals: A saved meals storage object.
+    """
+    return SavedMeals(SAVED_MEALS_PATH)
+
+
+def get_saved_meal_food_list(meal: dict) -> list:
+    """
+    Formats the saved meal's items and its stored totals as a list.
+
+    Args:
+        meal (dict): A saved meal.
+
+    Returns:
+        list: A list storing each item's nutrients values and the totals.
+    """
+    return [
+        Food(
+            item["name"].title(), *(item[key] for key in NUTRIENT_KEYS)
+        ).to_string_list()
+        for item in meal["items"]
+    ] + [Food("Total", *(meal["total"][key] for key in NUTRIENT_KEYS)).to_string_list()]
+
+
+def refresh_saved_meals(names: list):
+    """
+    Recalculates the nutrients of the saved meals.
+
+    Meals that could not be recalculated keep their nutrients and the error is printed
+    to the standard error, so that one failed meal does not stop the others.
+
+    Args:
+        names (list): Names of the saved meals.
+    """
+    saved_meals = get_saved_meals()
+    for name in names:
+        try:
+            meal = saved_meals.get_meal(name)
+            if meal is None:
+                continue
+            response = get_nutrition_analysis_by_ingredients(meal["food"])
+            saved_meals.save_meal(name, meal["food"], response)
+        except Exception as e:
+            print(
+                f"{Colors.WARNING}  Could not refresh the saved meal '{name}': {e}{Colors.ENDC}",
+                file=sys.stderr,
+            )
+
+
+def start_refreshing_stale_saved_meals() -> threading.Thread | None:
+    """
+    Starts recalculating the stale saved meals in a background thread.
+
+    Meals become stale after `SAVED_MEALS_MAX_AGE` seconds (0 disables the refreshing).
+    The thread is a daemon, so the caller has to join it before the program exits.
+
+    Returns:
+        threading.Thread: The thread recalculating the meals.
+        None: If none of the saved meals are stale.
+    """
+    stale_meals = get_saved_meals().get_stale_meals(
+        config("SAVED_MEALS_MAX_AGE", default=2592000, cast=int)
+    )
+    if not stale_meals:
+        return None
+    thread = threading.Thread(
+        target=refresh_saved_meals, args=(stale_meals,), daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def ask_the_user_to_input_the_meal_name() -> str:
+    """
+    Prompts the user to input the meal's name and returns its value.
+
+    Returns:
+        str: Meal's name.
+    """
+    while True:
+        user_input = input(f"{Colors.HEADER}  Enter the meal's name: {Colors.ENDC}")
+        if SavedMeals.normalize_name(user_input):
+            return user_input.strip()
+        print(f"{Colors.WARNING}  Meal's name cannot be empty!{Colors.ENDC}")
+
+
+def ask_the_user_to_select_a_saved_meal() -> str | None:
+    """
+    Shows the menu of the saved meals and returns the selected meal's name.
+
+    Returns:
+        str: Name of the selected meal.
+        None: If there are no saved meals or the selection was cancelled.
+    """
+    from simple_term_menu import TerminalMenu
+
+    names = list(get_saved_meals().read_meals())
+    if not names:
+        print(f"{Colors.WARNING}  There are no saved meals yet.{Colors.ENDC}\n")
+        return None
+    selection = TerminalMenu(
+        menu_entries=[name.title() for name in names],
+        title="  Saved Meals.\n  Press Q or Esc to go back.\n",
+        menu_highlight_style=("fg_red",),
+    ).show()
+    return None if selection is None else names[selection]
+
+
+def init_saved_meal_calculation(name: str | None = None):
+    """
+    A function responsible for handling all of the saved meal calculation's logic and printing out the result into terminal.
+
+    The stored nutrients are used, so no request is sent to the Nutrition Analysis API.
+
+    Args:
+        name (str | None): Name of the saved meal (selected from the menu if omitted).
+    """
+    if name is None:
+        name = ask_the_user_to_select_a_saved_meal()
+        if name is None:
+            return
+    meal = get_saved_meals().get_meal(name)
+    if meal is None:
+        print(f"{Colors.FAIL}  Saved meal '{name}' was not found.{Colors.ENDC}\n")
+        return
+    print_table_of_nutrients(get_saved_meal_food_list(meal))
+    insulin_amount_to_inject = calculate_insulin_amount(
+        meal["total"]["carbohydrates_total_g"], get_short_dose_data()
+    )
+    print_insulin_amount_for_calculated_carbs(insulin_amount_to_inject)
+
+
+def init_save_meal(name: str | None = None):
+    """
+    A function responsible for handling all of the logic for calculating a meal and saving it under a name.
+
+    Args:
+        name (str | None): Meal's name (the user is asked for it if omitted).
+    """
+    from nutrition_client import NutritionAPIError
+
+    try:
+        if name is None:
+            name = ask_the_user_to_input_the_meal_name()
+        food_input = ask_user_to_input_the_food()
+        result = NutritionResult.from_response(
+            get_nutrition_analysis_by_ingredients(food_input)
+        )
+        food_list = get_formatted_food_list(result)
+        print_table_of_nutrients(food_list)
+        if food_list is None:
+            return
+        get_saved_meals().save_meal(name, food_input, result)
+        print(
+            f"{Colors.OKGREEN}  Meal '{name}' has been successfully saved!{Colors.ENDC}\n"
+        )
+    except NutritionAPIError as e:
+        print(f"{Colors.FAIL}  {e.message}{Colors.ENDC}\n")
     except KeyboardInterrupt:
         pass
 
 
+def print_table_of_saved_meals(meals: dict):
+    """
+    Prints the table with the saved meals and their total nutrients values.
+
+    Args:
+        meals (dict): Saved meals keyed by their names.
+    """
+    rows = [
+        [
+            name.title(),
+            meal["food"],
+            *(meal["total"][key] for key in NUTRIENT_KEYS),
+            date.fromtimestamp(meal["saved_at"]),
+        ]
+        for name, meal in meals.items()
+    ]
+    with span("table rendering"):
+        print(tabulate(rows, SAVED_MEALS_TABLE_HEADERS, TABLE_STYLE))
+
+
+def init_show_saved_meals(refresh: bool = False):
+    """
+    A function responsible for handling all of the logic for printing out the saved meals.
+
+    Args:
+        refresh (bool): Recalculate the stale saved meals before printing them.
+    """
+    if refresh:
+        thread = start_refreshing_stale_saved_meals()
+        if thread is not None:
+            thread.join()
+    meals = get_saved_meals().read_meals()
+    if not meals:
+        print(f"{Colors.WARNING}  There are no saved meals yet.{Colors.ENDC}\n")
+        return
+    print_table_of_saved_meals(meals)
+
+
 def print_table_of_doses(doses_list: list):
     """
     Prints the table with the information of current insulins doses.
@@ -216,38 +763,288 @@ def print_table_of_doses(doses_list: list):
     Args:
         doses_list (list): A list of current insulin doses.
     """
-    print(tabulate(doses_list, DOSES_TABLE_HEADERS, TABLE_STYLE))
+    with span("table rendering"):
+        print(tabulate(doses_list, DOSES_TABLE_HEADERS, TABLE_STYLE))
 
 
 def init_show_doses():
     """
     A function responsible for handling all of the logic for printing out the current insulin doses information.
     """
-    dfh = DosesFileHandler("files/doses.csv")
-    doses = dfh.read_doses()
+    doses = get_session().get_doses()
     print_table_of_doses(doses)
 
 
-def print_table_of_todays_injections(injections_list: list | None):
+def ask_the_user_to_show_the_next_page() -> bool:
+    """
+    Prompts the user to choose whether the next page of the table should be shown.
+
+    Returns:
+        bool: True if the user wants to see the next page.
+    """
+    user_input = input(
+        f"{Colors.HEADER}  Press Enter for the next page or Q to stop: {Colors.ENDC}"
+    )
+    return user_input.strip().lower() != "q"
+
+
+def print_paged_table(
+    rows: Iterable, headers: list, page_size: int, wait_for_next_page: bool = False
+):
+    """
+    Prints the table page by page while its rows are still being read.
+
+    Args:
+        rows (Iterable): Rows of the table (sequences of the values).
+        headers (list): Column headers.
+        page_size (int): Maximum number of rows on a page.
+        wait_for_next_page (bool): Whether to ask the user before printing every next page.
+    """
+    for page_number, lines in enumerate(iter_table_pages(rows, headers, page_size)):
+        if (
+            page_number
+            and wait_for_next_page
+            and not ask_the_user_to_show_the_next_page()
+        ):
+            break
+        with span("table rendering"):
+            print("\n".join(lines), flush=True)
+
+
+def get_injection_rows(injections: Iterable) -> Iterator[list]:
+    """
+    Yields the table rows of the injections.
+
+    Args:
+        injections (Iterable): Injection objects.
+
+    Yields:
+        list: Type, amount and timestamp of the injection.
+    """
+    for injection in injections:
+        yield [injection.type, injection.amount, injection.timestamp]
+
+
+def print_table_of_todays_injections(
+    injections_list: list | None,
+    page_size: int = TABLE_PAGE_SIZE,
+    wait_for_next_page: bool = False,
+):
     """
     Prints the table with the information of today's injections.
 
     Args:
         injections_list (list | None): A list of today's injections or None (if no injections were found).
+        page_size (int): Maximum number of rows on a page.
+        wait_for_next_page (bool): Whether to ask the user before printing every next page.
     """
     if injections_list == None:
         print(f"{Colors.WARNING}  No injections were saved today!\n{Colors.ENDC}")
     else:
-        print(tabulate(injections_list, INJECTIONS_TABLE_HEADERS, TABLE_STYLE))
+        print_paged_table(
+            get_injection_rows(injections_list),
+            INJECTIONS_TABLE_HEADERS,
+            page_size,
+            wait_for_next_page,
+        )
 
 
-def init_todays_injections():
+def init_todays_injections(
+    page_size: int = TABLE_PAGE_SIZE, wait_for_next_page: bool = False
+):
     """
     A function responsible for handling all of the logic for showing today's injections data.
+
+    Args:
+        page_size (int): Maximum number of rows on a page.
+        wait_for_next_page (bool): Whether to ask the user before printing every next page.
+    """
+    injections = get_session().get_todays_injections()
+    print_table_of_todays_injections(injections, page_size, wait_for_next_page)
+
+
+def print_table_of_injections_in_range(
+    injections: Iterator, start: date, end: date, page_size: int = TABLE_PAGE_SIZE
+):
+    """
+    Prints the table with the information of injections that were saved in the date range.
+
+    The injections are printed while they are being read, so that the memory usage does not
+    grow with the size of the range.
+
+    Args:
+        injections (Iterator): Injections in the date range.
+        start (date): First day of the range.
+        end (date): Last day of the range.
+        page_size (int): Maximum number of rows on a page.
+    """
+    first_injection = next(injections, None)
+    if first_injection is None:
+        print(
+            f"{Colors.WARNING}  No injections were saved from {start} to {end}!\n{Colors.ENDC}"
+        )
+    else:
+        print_paged_table(
+            get_injection_rows(chain([first_injection], injections)),
+            INJECTIONS_TABLE_HEADERS,
+            page_size,
+        )
+
+
+def init_injections_in_range(start: date, end: date, page_size: int = TABLE_PAGE_SIZE):
+    """
+    A function responsible for handling all of the logic for showing injections data in the date range.
+
+    Args:
+        start (date): First day of the range.
+        end (date): Last day of the range.
+        page_size (int): Maximum number of rows on a page.
+    """
+    injections_storage = get_session().injections_storage
+    injections = injections_storage.iter_injections(start, end)
+    print_table_of_injections_in_range(injections, start, end, page_size)
+
+
+def parse_page_size_argument(page_size_string: str | None) -> int:
+    """
+    Parses the page size CLI argument.
+
+    Args:
+        page_size_string (str | None): Number of rows or None (if the argument was not provided).
+
+    Returns:
+        int: Maximum number of rows on a page.
+    """
+    if page_size_string is None:
+        return TABLE_PAGE_SIZE
+    if not page_size_string.isdigit() or int(page_size_string) == 0:
+        sys.exit(
+            f"{Colors.FAIL}Page size '{page_size_string}' must be a positive number.{Colors.ENDC}"
+        )
+    return int(page_size_string)
+
+
+def parse_date_argument(date_string: str | None, default: date) -> date:
+    """
+    Converts the date argument into a date.
+
+    Args:
+        date_string (str | None): Date string in format YYYY-MM-DD or None (if the argument was not provided).
+        default (date): Date to return if the argument was not provided.
+
+    Returns:
+        date: Date of the argument.
+    """
+    if date_string is None:
+        return default
+    try:
+        return date.fromisoformat(date_string)
+    except ValueError:
+        sys.exit(
+            f"{Colors.FAIL}Date '{date_string}' must be in format YYYY-MM-DD.{Colors.ENDC}"
+        )
+
+
+def print_report(daily_rows: list, hourly_histogram: list):
+    """
+    Prints the tables with the daily insulin totals and the time-of-day histogram of short insulin injections.
+
+    Args:
+        daily_rows (list): Rows of the date, daily totals and rolling averages of each day.
+        hourly_histogram (list): Number of short insulin injections for each of the 24 hours.
+    """
+    with span("table rendering"):
+        print(tabulate(daily_rows, REPORT_TABLE_HEADERS, TABLE_STYLE))
+    largest_count = max(max(hourly_histogram), 1)
+    histogram_rows = [
+        [f"{hour:02d}:00", count, "█" * round(count / largest_count * 40)]
+        for hour, count in enumerate(hourly_histogram)
+    ]
+    with span("table rendering"):
+        print(tabulate(histogram_rows, HISTOGRAM_TABLE_HEADERS, TABLE_STYLE))
+
+
+def init_report(start: date, end: date):
+    """
+    A function responsible for handling all of the logic for showing the insulin usage report in the date range.
+
+    Args:
+        start (date): First day of the range.
+        end (date): Last day of the range.
+    """
+    from report import (
+        get_daily_totals_from_rollup,
+        get_daily_report_rows,
+        get_hourly_histogram,
+        get_warmup_days,
+    )
+
+    injections_storage = get_session().injections_storage
+    warmup_start = start - timedelta(days=get_warmup_days())
+    daily_totals = get_daily_totals_from_rollup(
+        injections_storage.read_daily_totals(warmup_start, end), warmup_start, end
+    )
+    daily_rows = get_daily_report_rows(daily_totals, start)
+    table = injections_storage.read_injection_table(start, end)
+    print_report(daily_rows, get_hourly_histogram(table).tolist())
+
+
+def init_rebuild_daily_totals():
+    """
+    A function responsible for handling all of the logic for rebuilding the stored daily injections totals.
+    """
+    get_session().injections_storage.rebuild_daily_totals()
+    print(
+        f"{Colors.OKGREEN}  Daily injections totals have been successfully rebuilt!{Colors.ENDC}\n"
+    )
+
+
+def init_show_api_usage():
+    """
+    A function responsible for handling all of the logic for viewing the monthly Nutrition Analysis API usage.
     """
-    ifh = InjectionsFileHandler("files/injections.csv")
-    injections = ifh.read_todays_injections()
-    print_table_of_todays_injections(injections)
+    usage = get_rate_limiter().get_usage()
+    if not usage:
+        print(
+            f"{Colors.WARNING}  No requests have been sent to the Nutrition Analysis API yet.{Colors.ENDC}\n"
+        )
+        return
+    rows = [
+        [month] + [counters.get(counter, 0) for counter in USAGE_COUNTERS]
+        for month, counters in usage.items()
+    ]
+    with span("table rendering"):
+        print(tabulate(rows, USAGE_TABLE_HEADERS, TABLE_STYLE))
+
+
+def print_profile(breakdown: list):
+    """
+    Prints the table with the time that the command spent in each of its phases.
+
+    Args:
+        breakdown (list): Tuples of the phase, number of calls, milliseconds and share of the run time.
+    """
+    rows = [
+        [phase, calls, f"{milliseconds:.1f}", f"{share:.1%}"]
+        for phase, calls, milliseconds, share in breakdown
+    ]
+    print(tabulate(rows, PROFILE_TABLE_HEADERS, TABLE_STYLE))
+
+
+def get_command_name(args: dict) -> str:
+    """
+    Returns the name of the command that was given in the CLI arguments.
+
+    Args:
+        args (dict): Parsed CLI arguments.
+
+    Returns:
+        str: Command name (e.g. 'calculate').
+    """
+    return next(
+        (key for key, value in args.items() if value is True and key[0] not in "-<"),
+        "",
+    )
 
 
 def ask_the_user_to_input_the_insulin_type() -> str:
@@ -336,13 +1133,12 @@ def init_change_insulin_dose(type: str):
         type (str): Insulin's type ('short', 'long').
     """
     try:
-        dfh = DosesFileHandler("files/doses.csv")
         insulin_amount = ask_the_user_to_input_the_insulin_amount()
         carbs_amount = 0
         if type == "short":
             carbs_amount = ask_the_user_to_input_the_carbs_amount()
         dose = Dose(type, insulin_amount, carbs_amount)
-        dfh.update_dose(dose)
+        get_session().update_dose(dose)
         print(
             f"\n{Colors.OKGREEN}  {type.capitalize()} insulin dose has been successfully updated!{Colors.ENDC}\n"
         )
@@ -357,25 +1153,208 @@ def init_add_injection():
     try:
         insulin_type = ask_the_user_to_input_the_insulin_type()
         insulin_amount = ask_the_user_to_input_the_insulin_amount()
-        ifh = InjectionsFileHandler("files/injections.csv")
         current_datetime = get_current_date_and_time()
         injection = Injection(insulin_type, insulin_amount, current_datetime)
-        ifh.save_new_injection(injection)
+        get_session().save_new_injection(injection)
     except KeyboardInterrupt:
         pass
 
 
+def init_import_injections(path: str):
+    """
+    A function responsible for handling all of the logic for importing the injections from a CSV file.
+
+    Args:
+        path (str): Path to a CSV file with the `type`, `amount` and `timestamp` columns.
+    """
+    start_time = time.perf_counter()
+    try:
+        rows, rejected_count = read_injections_to_import(path)
+    except OSError:
+        sys.exit(
+            f"{Colors.FAIL}Could not read the injections file '{path}'.{Colors.ENDC}"
+        )
+    imported_count = get_session().injections_storage.import_injections(rows)
+    elapsed_time = time.perf_counter() - start_time
+
+    rows_per_second = (len(rows) + rejected_count) / elapsed_time
+    print(
+        f"{Colors.OKGREEN}  Imported {imported_count} injections in {elapsed_time:.2f}s ({rows_per_second:.0f} rows/s).{Colors.ENDC}"
+    )
+    # The rows are sorted, so the repeated rows of the file are next to each other.
+    unique_count = sum(1 for _ in groupby(rows))
+    if len(rows) > unique_count:
+        print(
+            f"{Colors.OKBLUE}  Skipped {len(rows) - unique_count} duplicate injections in the file.{Colors.ENDC}"
+        )
+    if unique_count > imported_count:
+        print(
+            f"{Colors.OKBLUE}  Skipped {unique_count - imported_count} already saved injections.{Colors.ENDC}"
+        )
+    if rejected_count:
+        print(f"{Colors.WARNING}  Rejected {rejected_count} invalid rows.{Colors.ENDC}")
+    print()
+
+
+def init_import_glucose_readings(path: str):
+    """
+    A function responsible for handling all of the logic for importing the glucose readings from a CGM CSV export.
+
+    Args:
+        path (str): Path to a CSV file exported from the CGM (or with the `timestamp` and `glucose` columns).
+    """
+    from glucose import GlucoseStore, read_glucose_readings_to_import
+
+    start_time = time.perf_counter()
+    try:
+        readings, rejected_count = read_glucose_readings_to_import(path)
+    except OSError:
+        sys.exit(
+            f"{Colors.FAIL}Could not read the glucose readings file '{path}'.{Colors.ENDC}"
+        )
+    except ValueError as e:
+        sys.exit(f"{Colors.FAIL}{e}{Colors.ENDC}")
+    imported_count = GlucoseStore(GLUCOSE_PATH).import_readings(readings)
+    elapsed_time = time.perf_counter() - start_time
+
+    print(
+        f"{Colors.OKGREEN}  Imported {imported_count} glucose readings in {elapsed_time:.2f}s.{Colors.ENDC}"
+    )
+    if len(readings) > imported_count:
+        print(
+            f"{Colors.OKBLUE}  Skipped {len(readings) - imported_count} already saved readings.{Colors.ENDC}"
+        )
+    if rejected_count:
+        print(f"{Colors.WARNING}  Rejected {rejected_count} invalid rows.{Colors.ENDC}")
+    print()
+
+
+def init_glucose_view(start: date, end: date, page_size: int = TABLE_PAGE_SIZE):
+    """
+    A function responsible for handling all of the logic for viewing the glucose readings with the injections in the date range.
+
+    Args:
+        start (date): First day of the range.
+        end (date): Last day of the range.
+        page_size (int): Maximum number of rows on each page of the table.
+    """
+    from glucose import GlucoseStore, get_overlay_rows, RAW_RESOLUTION
+
+    resolution, summaries = GlucoseStore(GLUCOSE_PATH).read_summaries(
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        GLUCOSE_MAX_ROWS,
+    )
+    injections = get_session().injections_storage.iter_injections(start, end)
+    rows = get_overlay_rows(summaries, resolution, injections)
+    if not rows:
+        print(
+            f"{Colors.WARNING}  No glucose readings or injections were saved in this date range.{Colors.ENDC}\n"
+        )
+        return
+    interval = (
+        "readings" if resolution == RAW_RESOLUTION else f"per {resolution} minutes"
+    )
+    print(
+        f"{Colors.OKBLUE}  Glucose (mg/dL) {interval} from {start} to {end}:{Colors.ENDC}"
+    )
+    print_paged_table(rows, GLUCOSE_TABLE_HEADERS, page_size)
+
+
+def init_migration():
+    """
+    A function responsible for handling all of the logic for migrating the CSV files into the SQLite database.
+    """
+    from sqlite_storage import migrate_csv_to_database
+
+    injections_count, doses_count = migrate_csv_to_database(
+        INJECTIONS_CSV_PATH, DOSES_CSV_PATH, DATABASE_PATH
+    )
+    print(
+        f"{Colors.OKGREEN}  Migrated {injections_count} injections and {doses_count} insulin doses into {DATABASE_PATH}.{Colors.ENDC}\n"
+        f"{Colors.OKBLUE}  Set STORAGE_BACKEND to 'sqlite' to start using the database.{Colors.ENDC}\n"
+    )
+
+
+def init_partitioning():
+    """
+    A function responsible for handling all of the logic for partitioning the injections CSV file by month.
+    """
+    from partitioned_storage import partition_injections_csv
+
+    injections_count = partition_injections_csv(
+        INJECTIONS_CSV_PATH, INJECTIONS_PARTITIONS_PATH
+    )
+    print(
+        f"{Colors.OKGREEN}  Partitioned {injections_count} injections by month into {INJECTIONS_PARTITIONS_PATH}.{Colors.ENDC}\n"
+        f"{Colors.OKBLUE}  Set STORAGE_BACKEND to 'partitioned' to start using the monthly files.{Colors.ENDC}\n"
+    )
+
+
+def parse_port_argument(port_string: str | None) -> int:
+    """
+    Parses the port CLI argument.
+
+    Args:
+        port_string (str | None): Port number or None (if the argument was not provided).
+
+    Returns:
+        int: Port number.
+    """
+    if port_string is None:
+        return SERVER_PORT
+    if not port_string.isdigit() or not 0 < int(port_string) < 65536:
+        sys.exit(
+            f"{Colors.FAIL}Port '{port_string}' must be a number from 1 to 65535.{Colors.ENDC}"
+        )
+    return int(port_string)
+
+
+def init_server(port: int):
+    """
+    A function responsible for handling all of the logic for running the JSON API service on localhost.
+
+    Args:
+        port (int): Port to listen on.
+    """
+    import asyncio
+    from server import DiabetrServer, serve_forever
+
+    def print_address(address: tuple):
+        host, port = address
+        print(
+            f"{Colors.OKGREEN}  Serving the JSON API on http://{host}:{port} (press Ctrl+C to stop).{Colors.ENDC}\n",
+            flush=True,
+        )
+
+    try:
+        asyncio.run(
+            serve_forever(
+                DiabetrServer(get_session()), SERVER_HOST, port, print_address
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        sys.exit(
+            f"{Colors.FAIL}Could not start the service: {e.strerror}.{Colors.ENDC}"
+        )
+    finally:
+        get_session().close()
+
+
 def with_menu():
     """
     Handles the main logic when the program is ran with terminal menu.
     """
     try:
         main_menu = init_main_menu()
-    except NameError:
+    except NotImplementedError:
         sys.exit(
             f"{Colors.FAIL}Your OS is not supported to run the program with the menu.{Colors.ENDC}"
         )
     main_menu_exit = False
+    refresh_thread = None
 
     while not main_menu_exit:
         selection = main_menu.show()
@@ -389,18 +1368,33 @@ def with_menu():
         elif selection == 3:
             init_change_insulin_dose("long")
         elif selection == 4:
-            init_todays_injections()
+            init_todays_injections(wait_for_next_page=True)
         elif selection == 5:
             init_add_injection()
-        elif selection == 6 or selection == None:
+        elif selection == 6:
+            init_saved_meal_calculation()
+            if refresh_thread is None or not refresh_thread.is_alive():
+                refresh_thread = start_refreshing_stale_saved_meals()
+        elif selection == 7:
+            init_save_meal()
+        elif selection == 8 or selection == None:
             main_menu_exit = True
+    if refresh_thread is not None:
+        refresh_thread.join(SAVED_MEALS_REFRESH_TIMEOUT)
+    get_session().close()
 
 
 def without_menu(args: dict):
     """
     Handles the main logic when the program is ran through CLI with arguments.
     """
-    if args["calculate"]:
+    if args["calculate"] and args["--batch"]:
+        init_batch_carbs_calculation(args["--batch"])
+    elif args["calculate"] and args["--meal"]:
+        init_saved_meal_calculation(args["--meal"])
+    elif args["calculate"] and args["--save"]:
+        init_save_meal(args["--save"])
+    elif args["calculate"]:
         init_carbs_calculation()
     elif args["doses"]:
         init_show_doses()
@@ -411,7 +1405,38 @@ def without_menu(args: dict):
                 f"{Colors.FAIL}Insulin type must be either 'short' or 'long'.{Colors.ENDC}"
             )
         init_change_insulin_dose(insulin_type)
+    elif args["view"] and (args["--from"] or args["--to"]):
+        start = parse_date_argument(args["--from"], date.min)
+        end = parse_date_argument(args["--to"], get_current_date())
+        init_injections_in_range(
+            start, end, parse_page_size_argument(args["--page-size"])
+        )
     elif args["view"]:
-        init_todays_injections()
+        init_todays_injections(parse_page_size_argument(args["--page-size"]))
+    elif args["report"]:
+        end = parse_date_argument(args["--to"], get_current_date())
+        start = parse_date_argument(args["--from"], end - timedelta(days=29))
+        init_report(start, end)
     elif args["add"]:
         init_add_injection()
+    elif args["migrate"]:
+        init_migration()
+    elif args["partition"]:
+        init_partitioning()
+    elif args["rollup"]:
+        init_rebuild_daily_totals()
+    elif args["usage"]:
+        init_show_api_usage()
+    elif args["meals"]:
+        init_show_saved_meals(args["--refresh"])
+    elif args["glucose"] and args["import"]:
+        init_import_glucose_readings(args["<file>"])
+    elif args["glucose"]:
+        today = get_current_date()
+        start = parse_date_argument(args["--from"], today)
+        end = parse_date_argument(args["--to"], max(start, today))
+        init_glucose_view(start, end, parse_page_size_argument(args["--page-size"]))
+    elif args["import"]:
+        init_import_injections(args["<file>"])
+    elif args["serve"]:
+        init_server(parse_port_argument(args["--port"]))
@@ -0,0 +1,73 @@
+import re
+
+# Commas separate the ingredients unless they are between two digits (a decimal comma),
+# and 'and' only does when a quantity follows it, so dishes like 'mac and cheese' stay whole.
+INGREDIENT_SEPARATOR = re.compile(
+    r"(?<!\d),|,(?!\d)|\band\b(?=\s*\d+(?:[.,]\d+)?\s*(?:kg|g)\b)", re.IGNORECASE
+)
+INGREDIENT_QUANTITY = re.compile(
+    r"^(?P<amount>\d+(?:[.,]\d+)?)\s*(?P<unit>kg|g)\s+(?P<name>.+)$", re.IGNORECASE
+)
+UNIT_TO_GRAMS = {"g": 1, "kg": 1000}
+
+
+def parse_food_input(food_input: str) -> list:
+    """
+    Splits the food input into ingredient and quantity pairs.
+
+    Args:
+        food_input (str): Food list as a text (e.g. 150g potatoes, 250g cooked chicken).
+
+    Returns:
+        list: Tuples of the ingredient's name and its quantity in grams
+        (None if the ingredient was entered without a quantity in grams).
+    """
+    ingredients = []
+    for part in INGREDIENT_SEPARATOR.split(food_input):
+        part = " ".join(part.split())
+        if not part:
+            continue
+        match = INGREDIENT_QUANTITY.match(part)
+        if match is None:
+            ingredients.append((part.lower(), None))
+            continue
+        amount = float(match["amount"].replace(",", "."))
+        grams = amount * UNIT_TO_GRAMS[match["unit"].lower()]
+        ingredients.append((match["name"].lower(), grams))
+    return ingredients
+
+
+def scale_nutrients(item: dict, ratio: float, rounded: bool = True) -> dict:
+    """
+    Multiplies every numeric nutrient value of the Nutrition Analysis API item by the ratio.
+
+    Args:
+        item (dict): Nutrition Analysis API response item.
+        ratio (float): Number to multiply the nutrient values by.
+        rounded (bool): Whether to round the scaled values to one decimal place like the API does.
+
+    Returns:
+        dict: A new item with the scaled nutrient values.
+    """
+    scaled_item = {}
+    for key, value in item.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = value * ratio
+            if rounded:
+                value = round(value, 1)
+        scaled_item[key] = value
+    return scaled_item
+
+
+def get_nutrients_per_100g(item: dict) -> dict:
+    """
+    Converts the Nutrition Analysis API item's nutrient values to values per 100 grams.
+
+    Args:
+        item (dict): Nutrition Analysis API response item.
+
+    Returns:
+        dict: A new item with the nutrient values per 100 grams.
+    """
+    serving_size = item.get("serving_size_g") or 100
+    return scale_nutrients(item, 100 / serving_size, rounded=False)
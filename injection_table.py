@@ -0,0 +1,126 @@
+from array import array
+from datetime import datetime, timedelta
+from injection import Injection
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MINUTE = timedelta(minutes=1)
+INJECTION_TYPES = ["short", "long"]
+INJECTION_TYPE_CODES = {type: code for code, type in enumerate(INJECTION_TYPES)}
+
+
+def datetime_to_epoch_minute(timestamp: datetime) -> int:
+    """
+    Converts the (local) date and time into the number of minutes since 1970-01-01 00:00.
+
+    Args:
+        timestamp (datetime): Date and time.
+
+    Returns:
+        int: Number of minutes since the epoch.
+    """
+    return (timestamp - EPOCH) // ONE_MINUTE
+
+
+def epoch_minute_to_datetime(minute: int) -> datetime:
+    """
+    Converts the number of minutes since 1970-01-01 00:00 into the (local) date and time.
+
+    Args:
+        minute (int): Number of minutes since the epoch.
+
+    Returns:
+        datetime: Date and time.
+    """
+    return EPOCH + minute * ONE_MINUTE
+
+
+class InjectionTable:
+    """
+    Class for storing the injections history as parallel arrays (7 bytes per injection).
+
+    Attributes:
+        minutes (array): Minutes since 1970-01-01 00:00 of each injection (signed 32-bit).
+        amounts (array): Insulin amount of each injection (unsigned 16-bit).
+        types (array): Insulin type code of each injection (0 - short, 1 - long).
+    """
+
+    __slots__ = ("minutes", "amounts", "types")
+
+    def __init__(self):
+        self.minutes = array("i")
+        self.amounts = array("H")
+        self.types = array("B")
+
+    @classmethod
+    def from_columns(cls, minutes: array, amounts: array, types: array):
+        """
+        Creates the table from already built columns without validating them.
+
+        Should only be used for the data read back from the application's own files.
+
+        Args:
+            minutes (array): Minutes since the epoch (typecode 'i').
+            amounts (array): Insulin amounts (typecode 'H').
+            types (array): Insulin type codes (typecode 'B').
+
+        Returns:
+            InjectionTable: An injection table object.
+        """
+        table = cls()
+        table.minutes = minutes
+        table.amounts = amounts
+        table.types = types
+        return table
+
+    @classmethod
+    def from_injections(cls, injections):
+        """
+        Creates the table from the (already validated) injection objects.
+
+        Args:
+            injections (iterable): Injection objects.
+
+        Returns:
+            InjectionTable: An injection table object.
+        """
+        table = cls()
+        for injection in injections:
+            table.append(injection)
+        return table
+
+    def append(self, injection: Injection):
+        """
+        Adds the injection to the end of the table.
+
+        Args:
+            injection (Injection): Injection object to add.
+        """
+        self.minutes.append(datetime_to_epoch_minute(injection.timestamp))
+        self.amounts.append(injection.amount)
+        self.types.append(INJECTION_TYPE_CODES[injection.type])
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    def __getitem__(self, index: int) -> Injection:
+        return Injection(
+            INJECTION_TYPES[self.types[index]],
+            self.amounts[index],
+            epoch_minute_to_datetime(self.minutes[index]),
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def nbytes(self) -> int:
+        """
+        Counts the memory used by the columns' data.
+
+        Returns:
+            int: Number of bytes.
+        """
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.minutes, self.amounts, self.types)
+        )
@@ -4,37 +4,98 @@ Running a program with menu only works in Linux and macOS.
 
 Usage:
     main.py -h
-    main.py menu
-    main.py (add|calculate|doses|view)
-    main.py update <type>
+    main.py menu [--profile] [--metrics=<file>]
+    main.py (add|doses|migrate|partition|rollup|usage) [--profile]
+                 [--metrics=<file>]
+    main.py calculate [--batch=<file> | --meal=<name> | --save=<name>]
+                 [--profile] [--metrics=<file>]
+    main.py meals [--refresh] [--profile] [--metrics=<file>]
+    main.py view [--from=<date>] [--to=<date>] [--page-size=<rows>]
+                 [--profile] [--metrics=<file>]
+    main.py report [--from=<date>] [--to=<date>] [--profile] [--metrics=<file>]
+    main.py update <type> [--profile] [--metrics=<file>]
+    main.py import <file> [--profile] [--metrics=<file>]
+    main.py glucose import <file> [--profile] [--metrics=<file>]
+    main.py glucose [--from=<date>] [--to=<date>] [--page-size=<rows>]
+                 [--profile] [--metrics=<file>]
+    main.py serve [--port=<port>]
 
 Commands:
     menu            Runs the program with the terminal menu functionality.
     add             Add the new injection.
     calculate       Calculates carbohydrates of a meal and informs the user
                     with the amount of insulin to inject (suggestion).
+    meals           View the saved meals and their total nutrients.
     doses           View current insulin doses.
-    view            View injections that were saved today.
+    view            View injections that were saved today (or in the
+                    date range if --from or --to is provided).
+    report          View daily insulin totals, their rolling averages and
+                    the time of day of short insulin injections (last 30
+                    days if --from is not provided).
     update <type>   Update the insulin dose (types: short, long).
+    import <file>   Imports the injections from a CSV file (columns: type,
+                    amount, timestamp).
+    glucose         View the glucose readings with the injections of today (or
+                    of the date range if --from or --to is provided).
+    glucose import <file>
+                    Imports the glucose readings from a CGM CSV export
+                    (Dexcom Clarity, FreeStyle Libre or the timestamp and
+                    glucose columns).
+    migrate         Copies the injections and insulin doses from the CSV files
+                    into the SQLite database.
+    partition       Copies the injections from the CSV file into monthly files
+                    (closed months are compressed).
+    rollup          Rebuilds the daily injections totals (and the day index)
+                    from the injections CSV file.
+    usage           View the monthly Nutrition Analysis API usage (requests,
+                    rate limited responses, coalesced requests and waiting).
+    serve           Runs a JSON API on localhost for calculating meals, adding
+                    and viewing injections and viewing or updating doses.
 
 Options:
-    -h --help   Shows this screen.
+    -h --help           Shows this screen.
+    --batch=<file>      Calculates every meal from the file (one meal per line).
+    --meal=<name>       Calculates the saved meal from its stored nutrients.
+    --save=<name>       Calculates a meal and saves it under the name.
+    --refresh           Recalculates the saved meals that are older than
+                        SAVED_MEALS_MAX_AGE seconds.
+    --from=<date>       First day of the injections (or glucose readings) to view
+                        or report (YYYY-MM-DD).
+    --to=<date>         Last day of the injections (or glucose readings) to view
+                        or report (YYYY-MM-DD), today if omitted.
+    --page-size=<rows>  Number of rows shown on each page of the table (50 if
+                        omitted).
+    --profile           Prints the time spent in each phase of the command (API
+                        call, JSON decode, CSV read/write, table rendering,
+                        terminal clear and the remaining local overhead).
+    --metrics=<file>    Appends the profiled phases to a file as NDJSON.
+    --port=<port>       Port of the JSON API (8000 if omitted).
 
 Arguments:
     <type>      Insulin type (short, long).
+    <file>      Path to a CSV file.
 """
 
 import helpers
 from docopt import docopt
+from profiling import profiler
 
 
 def main():
-    helpers.clear_terminal()
     args = docopt(__doc__)
-    if args["menu"]:
-        helpers.with_menu()
-    else:
-        helpers.without_menu(args)
+    if args["--profile"] or args["--metrics"]:
+        profiler.start()
+    try:
+        helpers.clear_terminal()
+        if args["menu"]:
+            helpers.with_menu()
+        else:
+            helpers.without_menu(args)
+    finally:
+        if args["--profile"]:
+            helpers.print_profile(profiler.get_breakdown())
+        if args["--metrics"]:
+            profiler.append_metrics(args["--metrics"], helpers.get_command_name(args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+
+class NutritionCache:
+    """
+    Class for caching Nutrition Analysis API responses in a JSON file.
+
+    Entries are keyed by the normalized query, expire after `ttl` seconds and
+    the least recently used entries are evicted once there are more than `max_size` of them.
+    New entries are saved right away, while the lookups only mark the cache as dirty
+    until it is flushed.
+
+    Attributes:
+        path (str): Path to a JSON file.
+        ttl (int): Number of seconds a cached response stays valid.
+        max_size (int): Maximum number of cached responses.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that were not found in the cache or were expired.
+        lock (threading.RLock): Lock of the entries, so that the cache can be shared by threads.
+        dirty (bool): Whether the lookups changed the entries or counters since the last save.
+    """
+
+    def __init__(self, path: str, ttl: int, max_size: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Normalizes the query so that the same food list always maps to the same key.
+
+        Args:
+            query (str): Food list as a text.
+
+        Returns:
+            str: Lowercased query with collapsed whitespace.
+        """
+        return " ".join(query.lower().split())
+
+    def get(self, query: str) -> dict | None:
+        """
+        Returns the cached response for the query.
+
+        Args:
+            query (str): Food list as a text.
+
+        Returns:
+            dict: Cached Nutrition Analysis API response object.
+            None: If the query is not cached or its entry has expired.
+        """
+        key = self.normalize_query(query)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry["saved_at"] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                self.dirty = True
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.dirty = True
+            return entry["response"]
+
+    def set(self, query: str, response: dict):
+        """
+        Caches the response for the query and evicts the least recently used entries.
+
+        Args:
+            query (str): Food list as a text.
+            response (dict): Nutrition Analysis API response object.
+        """
+        key = self.normalize_query(query)
+        with self.lock:
+            self.entries[key] = {"saved_at": time.time(), "response": response}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self.save()
+
+    def load(self):
+        """
+        Loads the cached entries and counters from the JSON file.
+        """
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        self.hits = data.get("hits", 0)
+        self.misses = data.get("misses", 0)
+        self.entries = OrderedDict(data.get("entries", []))
+
+    def flush(self):
+        """
+        Saves the cache if the lookups have changed it since the last save.
+        """
+        with self.lock:
+            if self.dirty:
+                self.save()
+
+    def save(self):
+        """
+        Saves the cached entries (from least to most recently used) and counters to the JSON file.
+
+        The data is written to a temporary file first, so that concurrent readers never see a partially written cache.
+        """
+        with self.lock:
+            data = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": list(self.entries.items()),
+            }
+            temporary_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "w") as file:
+                json.dump(data, file)
+            os.replace(temporary_path, self.path)
+            self.dirty = False
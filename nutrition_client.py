@@ -0,0 +1,229 @@
+import time
+import random
+import threading
+import requests
+from concurrent.futures import Future
+from requests.adapters import HTTPAdapter
+from profiling import span
+from rate_limiter import SharedRateLimiter, QuotaExceededError
+from constants import (
+    NUTRITION_API_BASE_URL,
+    NUTRITION_API_CONNECT_TIMEOUT,
+    NUTRITION_API_READ_TIMEOUT,
+    NUTRITION_API_MAX_RETRIES,
+    NUTRITION_API_BACKOFF_FACTOR,
+    NUTRITION_API_MAX_WORKERS,
+)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class NutritionAPIError(Exception):
+    """
+    Exception raised when the Nutrition Analysis API request fails.
+
+    Attributes:
+        message (str): Description of the failure.
+        status_code (int | None): HTTP status code of the response (None if no response was received).
+        retry_after (float | None): Seconds to wait before the next request, if the API told so.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def get_retry_after(response: requests.Response) -> float | None:
+    """
+    Returns the number of seconds from the response's Retry-After header.
+
+    Args:
+        response (requests.Response): Nutrition Analysis API response.
+
+    Returns:
+        float: Number of seconds to wait before the next request.
+        None: If the header is missing or is not a number of seconds.
+    """
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+class NutritionClient:
+    """
+    Class for sending requests to the Nutrition Analysis API through a pooled keep-alive session.
+
+    Failed connections, timeouts and retryable status codes are retried
+    with an exponential backoff with full jitter. Concurrent requests of the same query
+    share a single request, and the requests wait for the shared rate limiter (if there is one).
+
+    Attributes:
+        api_key (str): Nutrition Analysis API key.
+        base_url (str): Nutrition Analysis API endpoint.
+        timeout (tuple): Connect and read timeouts (in seconds).
+        max_retries (int): Number of retries after the first failed attempt.
+        backoff_factor (float): Base number of seconds to back off before a retry.
+        session (requests.Session): HTTP session reusing the connections.
+        rate_limiter (SharedRateLimiter | None): Rate limiter shared by the program's processes.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = NUTRITION_API_BASE_URL,
+        connect_timeout: float = NUTRITION_API_CONNECT_TIMEOUT,
+        read_timeout: float = NUTRITION_API_READ_TIMEOUT,
+        max_retries: int = NUTRITION_API_MAX_RETRIES,
+        backoff_factor: float = NUTRITION_API_BACKOFF_FACTOR,
+        pool_size: int = NUTRITION_API_MAX_WORKERS,
+        rate_limiter: SharedRateLimiter | None = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.session = requests.Session()
+        self.session.headers.update({"X-Api-Key": api_key})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rate_limiter = rate_limiter
+        self.in_flight_requests = {}
+        self.in_flight_requests_lock = threading.Lock()
+
+    def get_nutrition(self, query: str) -> dict:
+        """
+        Sends a request to the Nutrition Analysis API and returns its response object.
+
+        If the same query is already being requested by another thread, its response is shared
+        instead of sending another request (the response object must not be modified).
+
+        Args:
+            query (str): Food list as a text.
+
+        Returns:
+            dict: Nutrition Analysis API response object.
+
+        Raises:
+            NutritionAPIError: if the request still fails after all of the retries.
+        """
+        key = " ".join(query.lower().split())
+        with self.in_flight_requests_lock:
+            future = self.in_flight_requests.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self.in_flight_requests[key] = Future()
+
+        if not is_leader:
+            if self.rate_limiter is not None:
+                self.rate_limiter.count("coalesced")
+            return future.result()
+
+        try:
+            response = self.send_request_with_retries(query)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.in_flight_requests_lock:
+                del self.in_flight_requests[key]
+
+    def send_request_with_retries(self, query: str) -> dict:
+        """
+        Sends a request to the Nutrition Analysis API, retrying the retryable failures.
+
+        Args:
+            query (str): Food list as a text.
+
+        Returns:
+            dict: Nutrition Analysis API response object.
+
+        Raises:
+            NutritionAPIError: if the request still fails after all of the retries or the quota is used up.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire()
+                except QuotaExceededError as e:
+                    raise NutritionAPIError(e.message)
+            try:
+                return self.send_request(query)
+            except NutritionAPIError as e:
+                retryable = e.status_code is None or e.status_code in (
+                    RETRYABLE_STATUS_CODES
+                )
+                backoff = random.uniform(0, self.backoff_factor * 2**attempt)
+                if e.status_code == 429 and self.rate_limiter is not None:
+                    self.rate_limiter.pause(e.retry_after or backoff)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+            time.sleep(backoff)
+            attempt += 1
+
+    def send_request(self, query: str) -> dict:
+        """
+        Sends a single request to the Nutrition Analysis API.
+
+        Args:
+            query (str): Food list as a text.
+
+        Returns:
+            dict: Nutrition Analysis API response object.
+
+        Raises:
+            NutritionAPIError: if the request failed, the response has an error status or an invalid body.
+        """
+        try:
+            with span("api call"):
+                response = self.session.get(
+                    self.base_url, params={"query": query}, timeout=self.timeout
+                )
+        except requests.Timeout:
+            raise NutritionAPIError("Nutrition Analysis API did not respond in time.")
+        except requests.RequestException:
+            raise NutritionAPIError("Could not connect to the Nutrition Analysis API.")
+
+        if response.status_code == 429:
+            raise NutritionAPIError(
+                "Nutrition Analysis API rate limit was exceeded.",
+                response.status_code,
+                get_retry_after(response),
+            )
+        if response.status_code != 200:
+            raise NutritionAPIError(
+                f"Nutrition Analysis API responded with status {response.status_code}.",
+                response.status_code,
+            )
+        try:
+            with span("json decode"):
+                response_json = response.json()
+        except requests.JSONDecodeError:
+            raise NutritionAPIError(
+                "Nutrition Analysis API responded with an invalid body.",
+                response.status_code,
+            )
+        if not isinstance(response_json, dict) or "items" not in response_json:
+            raise NutritionAPIError(
+                "Nutrition Analysis API responded with an unexpected body.",
+                response.status_code,
+            )
+        return response_json
+
+    def close(self):
+        """
+        Closes the pooled connections.
+        """
+        self.session.close()
@@ -0,0 +1,156 @@
+import os
+import csv
+import sqlite3
+import threading
+from ingredients import parse_food_input, scale_nutrients
+from constants import NUTRIENT_KEYS
+
+
+class LocalNutritionDatabase:
+    """
+    Class for looking up nutrients values of food in a local SQLite database, without the Nutrition Analysis API.
+
+    The database is built from a CSV file with nutrients values per 100 grams of each food
+    and is rebuilt whenever the CSV file changes. Foods are indexed by their normalized names.
+
+    Attributes:
+        path (str): Path to a SQLite database file.
+        csv_path (str): Path to a CSV file with the nutrients values per 100 grams of each food.
+        connection_lock (threading.Lock): Lock of the connection, so that threads sharing the database
+        do not connect or rebuild it twice (or query it before it is rebuilt).
+    """
+
+    def __init__(self, path: str, csv_path: str):
+        self.path = path
+        self.csv_path = csv_path
+        self.connection = None
+        self.connection_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        """
+        Normalizes the food's name so that it can be looked up in the index.
+
+        Args:
+            name (str): Name of the food.
+
+        Returns:
+            str: Lowercased name with collapsed whitespace.
+        """
+        return " ".join(name.lower().split())
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Opens the database and rebuilds it if the CSV file is newer than the database.
+
+        Returns:
+            sqlite3.Connection: A database connection.
+        """
+        with self.connection_lock:
+            if self.connection is None:
+                rebuild = not os.path.exists(self.path) or (
+                    os.path.exists(self.csv_path)
+                    and os.path.getmtime(self.csv_path) > os.path.getmtime(self.path)
+                )
+                self.connection = sqlite3.connect(self.path, check_same_thread=False)
+                if rebuild:
+                    self.rebuild()
+            return self.connection
+
+    def rebuild(self):
+        """
+        Recreates the foods table from the CSV file.
+        """
+        columns = ", ".join(f"{key} REAL NOT NULL" for key in NUTRIENT_KEYS)
+        with self.connection:
+            self.connection.execute("DROP TABLE IF EXISTS foods")
+            self.connection.execute(
+                f"CREATE TABLE foods (normalized_name TEXT PRIMARY KEY, name TEXT NOT NULL, {columns}) WITHOUT ROWID"
+            )
+            if os.path.exists(self.csv_path):
+                self.import_csv(self.csv_path)
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        Inserts (or replaces) the foods from the CSV file.
+
+        Args:
+            csv_path (str): Path to a CSV file with a `name` column and a column for every nutrient (per 100 grams).
+
+        Returns:
+            int: Number of imported foods.
+        """
+        with open(csv_path, "r", newline="") as file:
+            rows = [
+                (
+                    self.normalize_name(row["name"]),
+                    row["name"],
+                    *(float(row[key] or 0) for key in NUTRIENT_KEYS),
+                )
+                for row in csv.DictReader(file)
+            ]
+        placeholders = ", ".join("?" * (len(NUTRIENT_KEYS) + 2))
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO foods VALUES ({placeholders})", rows
+            )
+        return len(rows)
+
+    def get_food(self, name: str) -> dict | None:
+        """
+        Looks up the food by its name (or its singular form).
+
+        Args:
+            name (str): Name of the food.
+
+        Returns:
+            dict: Nutrition Analysis API-like item with nutrients values per 100 grams.
+            None: If the food is not in the database.
+        """
+        normalized_name = self.normalize_name(name)
+        candidates = [normalized_name]
+        if normalized_name.endswith("es"):
+            candidates.append(normalized_name[:-2])
+        if normalized_name.endswith("s"):
+            candidates.append(normalized_name[:-1])
+
+        connection = self.connect()
+        for candidate in candidates:
+            row = connection.execute(
+                f"SELECT name, {', '.join(NUTRIENT_KEYS)} FROM foods WHERE normalized_name = ?",
+                (candidate,),
+            ).fetchone()
+            if row is not None:
+                item = {"name": name, "serving_size_g": 100.0}
+                item.update(zip(NUTRIENT_KEYS, row[1:]))
+                return item
+        return None
+
+    def get_nutrition(self, query: str) -> dict:
+        """
+        Returns the Nutrition Analysis API-like response object for the food list.
+
+        Ingredients entered without a quantity in grams are counted as 100 grams, like the API does.
+        Unknown ingredients are left out of the response.
+
+        Args:
+            query (str): Food list as a text.
+
+        Returns:
+            dict: Nutrition Analysis API-like response object.
+        """
+        items = []
+        for name, grams in parse_food_input(query):
+            item = self.get_food(name)
+            if item is not None:
+                items.append(scale_nutrients(item, (grams or 100) / 100))
+        return {"items": items}
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self.connection_lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,104 @@
+from operator import itemgetter
+from constants import NUTRIENT_KEYS
+
+get_name = itemgetter("name")
+get_nutrient_values = itemgetter(*NUTRIENT_KEYS)
+
+
+class NutritionResult:
+    """
+    Class for storing the parsed Nutrition Analysis API response of a meal.
+
+    The response's items are read once into columns (the names and one column per nutrient)
+    and the totals are summed from the columns, so that the nutrients table, the totals and
+    the insulin amount share the same parsed values.
+
+    Attributes:
+        names (tuple): Name of each item.
+        columns (tuple): Nutrient values of the items, one tuple per `NUTRIENT_KEYS` key.
+        totals (tuple): Total nutrient values of the meal, in the `NUTRIENT_KEYS` order.
+    """
+
+    __slots__ = ("names", "columns", "totals")
+
+    def __init__(self, names: tuple, columns: tuple, totals: tuple):
+        self.names = names
+        self.columns = columns
+        self.totals = totals
+
+    @classmethod
+    def from_response(cls, response: dict) -> "NutritionResult":
+        """
+        Parses the Nutrition Analysis API response object.
+
+        Args:
+            response (dict): Nutrition Analysis API response object.
+
+        Returns:
+            NutritionResult: A nutrition result object.
+        """
+        items = response["items"]
+        columns = tuple(zip(*map(get_nutrient_values, items))) or (
+            ((),) * len(NUTRIENT_KEYS)
+        )
+        return cls(tuple(map(get_name, items)), columns, tuple(map(sum, columns)))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get_total(self, key: str) -> float:
+        """
+        Returns the total value of the nutrient.
+
+        Args:
+            key (str): Nutrient's key (e.g. 'carbohydrates_total_g').
+
+        Returns:
+            float: Total value of the nutrient.
+        """
+        return self.totals[NUTRIENT_KEYS.index(key)]
+
+    def get_rows(self) -> list:
+        """
+        Returns the nutrient values of each item.
+
+        Returns:
+            list: Tuples of the item's nutrient values in the `NUTRIENT_KEYS` order.
+        """
+        return list(zip(*self.columns))
+
+    def get_items(self) -> list:
+        """
+        Returns the name and nutrients of each item.
+
+        Returns:
+            list: Dictionaries with the item's name and its `NUTRIENT_KEYS` values.
+        """
+        return [
+            {"name": name, **dict(zip(NUTRIENT_KEYS, row))}
+            for name, row in zip(self.names, self.get_rows())
+        ]
+
+    def get_rounded_totals(self) -> dict:
+        """
+        Returns the total nutrient values rounded to one decimal.
+
+        Returns:
+            dict: Total nutrient values keyed by `NUTRIENT_KEYS`.
+        """
+        return {key: round(total, 1) for key, total in zip(NUTRIENT_KEYS, self.totals)}
+
+
+def to_nutrition_result(response: "dict | NutritionResult") -> NutritionResult:
+    """
+    Returns the nutrition result of the Nutrition Analysis API response (parsing it only if needed).
+
+    Args:
+        response (dict | NutritionResult): Nutrition Analysis API response object or an already parsed result.
+
+    Returns:
+        NutritionResult: A nutrition result object.
+    """
+    if isinstance(response, NutritionResult):
+        return response
+    return NutritionResult.from_response(response)
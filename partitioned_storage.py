@@ -0,0 +1,388 @@
+import os
+import gzip
+import json
+from datetime import date
+from itertools import groupby
+from date_utils import get_current_date, convert_string_to_datetime
+from file_handlers import (
+    InjectionsFileHandler,
+    parse_injection_line,
+    count_daily_totals,
+    read_injection_table_from_lines,
+)
+from injection import Injection
+from injection_table import InjectionTable
+from profiling import span
+from safe_files import lock_file, open_for_replace, get_lock_path
+from storage import InjectionsStorage
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def get_month(day: date) -> str:
+    """
+    Returns the month of the day, which is also the name of its partition.
+
+    Args:
+        day (date): Any day.
+
+    Returns:
+        str: Month in format YYYY-MM.
+    """
+    return day.isoformat()[:7]
+
+
+class PartitionedInjectionsHandler(InjectionsStorage):
+    """
+    Class for reading/writing injections data from/to a CSV file per month.
+
+    Partitions of the current (and any later) month are plain CSV files, each with its own
+    day index and daily rollup (see InjectionsFileHandler). Once a month is over, its partition
+    is compressed with gzip and its number of rows and daily totals are kept in the manifest,
+    so reports read the closed months without opening them and range reads open only
+    the partitions they overlap.
+
+    Readers open a partition only while holding the manifest's lock, so a partition cannot be
+    compressed or decompressed (and its old files removed) while it is being read.
+
+    Attributes:
+        directory (str): Path to the directory of the partitions.
+        manifest_path (str): Path to the manifest JSON file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+
+    def get_partition_handler(self, month: str) -> InjectionsFileHandler:
+        """
+        Returns the handler of the month's plain CSV partition.
+
+        Args:
+            month (str): Month in format YYYY-MM.
+
+        Returns:
+            InjectionsFileHandler: An injections file handler object.
+        """
+        return InjectionsFileHandler(os.path.join(self.directory, f"{month}.csv"))
+
+    def read_manifest(self) -> dict:
+        """
+        Reads the manifest.
+
+        Returns:
+            dict: Partitions keyed by their month (YYYY-MM), in chronological order.
+        """
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with span("csv read"), open(self.manifest_path, "r") as file:
+            partitions = json.load(file)["partitions"]
+        return dict(sorted(partitions.items()))
+
+    def write_manifest(self, partitions: dict):
+        """
+        Overwrites the manifest.
+
+        Args:
+            partitions (dict): Partitions keyed by their month (YYYY-MM).
+        """
+        with span("csv write"), open_for_replace(self.manifest_path) as file:
+            json.dump({"partitions": dict(sorted(partitions.items()))}, file, indent=2)
+
+    def read_todays_injections(self) -> list | None:
+        """
+        Reads today's injections from the partition of the current month.
+
+        Returns:
+            list: If there is at least one injection saved today.
+            None: If there are no injections saved today.
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+        handler = self.get_partition_handler(get_month(get_current_date()))
+        with lock_file(self.manifest_path):
+            if not os.path.exists(handler.path):
+                return None
+            return handler.read_todays_injections()
+
+    def save_new_injection(self, injection: Injection):
+        """
+        Saves newly added injection to the partition of its month and compresses the closed months.
+
+        Args:
+            injection (Injection): Injection object to save.
+        """
+        month = get_month(injection.timestamp.date())
+        os.makedirs(self.directory, exist_ok=True)
+        with lock_file(self.manifest_path):
+            partitions = self.read_manifest()
+            partition = partitions.get(month)
+            if partition is not None and partition["compressed"]:
+                self.import_injections(
+                    [(injection.timestamp, injection.type, injection.amount)]
+                )
+                return
+
+            self.get_partition_handler(month).save_new_injection(injection)
+            if partition is None:
+                partitions[month] = {"file": f"{month}.csv", "compressed": False}
+                self.write_manifest(partitions)
+            self.compress_closed_partitions(partitions)
+
+    def import_injections(self, rows: list) -> int:
+        """
+        Merges the chronologically sorted rows into the partitions of their months.
+
+        Compressed partitions that get new rows are decompressed, merged and compressed again.
+
+        Args:
+            rows (list): Sorted tuples of the timestamp (datetime), insulin type and amount.
+
+        Returns:
+            int: Number of imported rows.
+        """
+        if not rows:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        imported_count = 0
+        with lock_file(self.manifest_path):
+            partitions = self.read_manifest()
+            for month, month_rows in groupby(
+                rows, lambda row: get_month(row[0].date())
+            ):
+                partition = partitions.get(month)
+                if partition is not None and partition["compressed"]:
+                    self.decompress_partition(month, partitions)
+                imported_count += self.get_partition_handler(month).import_injections(
+                    list(month_rows)
+                )
+                partitions[month] = {"file": f"{month}.csv", "compressed": False}
+            self.write_manifest(partitions)
+            self.compress_closed_partitions(partitions)
+        return imported_count
+
+    def iter_lines_in_range(self, start: date, end: date):
+        """
+        Yields the rows that were saved between the start and end dates (both inclusive),
+        opening only the partitions of the months in the range.
+
+        Each partition's rows are read under the manifest's lock (from the partition
+        the manifest lists at that moment) and yielded after the lock is released.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Yields:
+            str: Rows of the CSV files without their line endings.
+        """
+        if not os.path.exists(self.manifest_path):
+            return
+        start_month, end_month = get_month(start), get_month(end)
+        start_day, end_day = start.isoformat(), end.isoformat()
+        for month in self.read_manifest():
+            if not start_month <= month <= end_month:
+                continue
+            with lock_file(self.manifest_path):
+                if self.read_manifest()[month]["compressed"]:
+                    lines = [
+                        line
+                        for line in self.read_compressed_lines(month)
+                        if start_day <= line[line.rindex(",") + 1 :][:10] <= end_day
+                    ]
+                else:
+                    handler = self.get_partition_handler(month)
+                    lines = list(handler.iter_lines_in_range(start, end))
+            yield from lines
+
+    def iter_injections(self, start: date, end: date):
+        """
+        Yields the injections that were saved between the start and end dates (both inclusive).
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Yields:
+            Injection: Injection objects in chronological order.
+        """
+        for line in self.iter_lines_in_range(start, end):
+            yield parse_injection_line(line)
+
+    def read_injection_table(self, start: date, end: date) -> InjectionTable:
+        """
+        Reads the injections that were saved between the start and end dates (both inclusive) into columns.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            InjectionTable: An injection table object.
+        """
+        return read_injection_table_from_lines(self.iter_lines_in_range(start, end))
+
+    def read_daily_totals(self, start: date, end: date) -> list:
+        """
+        Reads the daily totals of the days between the start and end dates (both inclusive)
+        from the manifest (closed months) and the daily rollups (plain partitions).
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            list: Tuples of the day (YYYY-MM-DD), number and sum of short insulin injections,
+            number and sum of long insulin injections (days without injections are left out).
+        """
+        if not os.path.exists(self.manifest_path):
+            return []
+        start_month, end_month = get_month(start), get_month(end)
+        start_day, end_day = start.isoformat(), end.isoformat()
+        daily_totals = []
+        with lock_file(self.manifest_path):
+            for month, partition in self.read_manifest().items():
+                if not start_month <= month <= end_month:
+                    continue
+                if partition["compressed"]:
+                    daily_totals.extend(
+                        tuple(totals)
+                        for totals in partition["daily_totals"]
+                        if start_day <= totals[0] <= end_day
+                    )
+                else:
+                    handler = self.get_partition_handler(month)
+                    daily_totals.extend(handler.read_daily_totals(start, end))
+        return daily_totals
+
+    def get_revision(self) -> tuple | None:
+        """
+        Returns the revisions of the manifest and of the current month's partition.
+
+        Returns:
+            tuple: Modification time and size of the manifest and the current month's partition.
+            None: If there are no partitions yet.
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+        stat = os.stat(self.manifest_path)
+        handler = self.get_partition_handler(get_month(get_current_date()))
+        return stat.st_mtime_ns, stat.st_size, handler.get_revision()
+
+    def rebuild_daily_totals(self):
+        """
+        Rebuilds the daily rollups of the plain partitions and the manifest's totals of the compressed ones.
+        """
+        with lock_file(self.manifest_path):
+            partitions = self.read_manifest()
+            for month, partition in partitions.items():
+                if partition["compressed"]:
+                    lines = list(self.read_compressed_lines(month))
+                    partition["rows"] = len(lines)
+                    partition["daily_totals"] = count_daily_totals(lines)
+                else:
+                    self.get_partition_handler(month).rebuild_daily_totals()
+            self.write_manifest(partitions)
+
+    def read_compressed_lines(self, month: str) -> list:
+        """
+        Reads the rows of the month's compressed partition.
+
+        Args:
+            month (str): Month in format YYYY-MM.
+
+        Returns:
+            list: Rows of the CSV file without the header and the line endings.
+        """
+        path = os.path.join(self.directory, f"{month}.csv.gz")
+        with span("csv read"):
+            with gzip.open(path, "rt", newline="") as file:
+                file.readline()
+                return [line.rstrip("\r\n") for line in file if line.strip()]
+
+    def compress_closed_partitions(self, partitions: dict):
+        """
+        Compresses the plain partitions of the months before the current one.
+
+        Args:
+            partitions (dict): Partitions keyed by their month (YYYY-MM), updated in place.
+        """
+        current_month = get_month(get_current_date())
+        for month, partition in list(partitions.items()):
+            if not partition["compressed"] and month < current_month:
+                self.compress_partition(month, partitions)
+
+    def compress_partition(self, month: str, partitions: dict):
+        """
+        Replaces the month's plain partition (with its day index and daily rollup) by a gzip-compressed one.
+
+        Args:
+            month (str): Month in format YYYY-MM.
+            partitions (dict): Partitions keyed by their month (YYYY-MM), updated in place.
+        """
+        handler = self.get_partition_handler(month)
+        with lock_file(handler.path):
+            with span("csv read"), open(handler.path, "rb") as file:
+                data = file.read()
+            lines = [line for line in data.decode().splitlines()[1:] if line]
+            with span("csv write"):
+                with open_for_replace(f"{handler.path}.gz", mode="wb") as file:
+                    file.write(gzip.compress(data))
+            partitions[month] = {
+                "file": f"{month}.csv.gz",
+                "compressed": True,
+                "rows": len(lines),
+                "daily_totals": count_daily_totals(lines),
+            }
+            self.write_manifest(partitions)
+            for path in [handler.path, handler.index_path, handler.rollup_path]:
+                if os.path.exists(path):
+                    os.remove(path)
+        # Readers and writers of a partition (including the readers that rebuild its day index
+        # under this lock) hold the manifest's lock first, so nobody waits for this lock anymore.
+        os.remove(get_lock_path(handler.path))
+
+    def decompress_partition(self, month: str, partitions: dict):
+        """
+        Replaces the month's compressed partition by a plain one.
+
+        Args:
+            month (str): Month in format YYYY-MM.
+            partitions (dict): Partitions keyed by their month (YYYY-MM), updated in place.
+        """
+        handler = self.get_partition_handler(month)
+        with lock_file(handler.path):
+            with span("csv read"), gzip.open(f"{handler.path}.gz", "rb") as file:
+                data = file.read()
+            with span("csv write"), open_for_replace(handler.path, mode="wb") as file:
+                file.write(data)
+            partitions[month] = {"file": f"{month}.csv", "compressed": False}
+            self.write_manifest(partitions)
+            os.remove(f"{handler.path}.gz")
+
+
+def partition_injections_csv(csv_path: str, directory: str) -> int:
+    """
+    Copies the injections from the CSV file into monthly partitions.
+    Nothing is copied if there are partitions already.
+
+    Args:
+        csv_path (str): Path to the injections CSV file.
+        directory (str): Path to the directory of the partitions.
+
+    Returns:
+        int: Number of partitioned injections.
+    """
+    handler = PartitionedInjectionsHandler(directory)
+    if handler.read_manifest() or not os.path.exists(csv_path):
+        return 0
+
+    rows = []
+    with span("csv read"), open(csv_path, "r", newline="") as file:
+        file.readline()
+        for line in file:
+            line = line.rstrip("\r\n")
+            if line:
+                type, amount, timestamp = line.split(",")
+                rows.append((convert_string_to_datetime(timestamp), type, int(amount)))
+    return handler.import_injections(rows)
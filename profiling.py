@@ -0,0 +1,131 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class Profiler:
+    """
+    Class for measuring how long the program spends in each phase of a command.
+
+    Spans are exclusive: the time of a span nested inside another span is counted
+    only for the inner phase, so that the phases add up to no more than the run time
+    of a single-threaded command. Spans cost almost nothing while the profiler is disabled.
+
+    Attributes:
+        enabled (bool): Whether the spans are measured.
+        started_at (float): `time.perf_counter()` value of the profiler's start.
+        phases (dict): Number of calls and total seconds, keyed by the phase name.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.perf_counter()
+        self.phases = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        """
+        Enables the profiler and forgets the previous measurements.
+        """
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self.phases = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Measures the time spent inside of the `with` block as the given phase.
+
+        Args:
+            name (str): Phase name, e.g. "api call".
+        """
+        if not self.enabled:
+            yield
+            return
+        stack = self._local.__dict__.setdefault("stack", [])
+        # Every stack entry holds the time spent in the nested spans.
+        stack.append(0.0)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                calls, seconds = self.phases.get(name, (0, 0.0))
+                self.phases[name] = (calls + 1, seconds + elapsed - nested)
+
+    def get_total_seconds(self) -> float:
+        """
+        Returns the number of seconds since the profiler was started.
+
+        Returns:
+            float: Run time in seconds.
+        """
+        return time.perf_counter() - self.started_at
+
+    def get_breakdown(self) -> list:
+        """
+        Returns the measured phases sorted by the time spent in them, followed by
+        the "local overhead" phase which is the run time that was not covered by any span.
+
+        Returns:
+            list: List of (phase, calls, milliseconds, share of the run time) tuples.
+        """
+        total = self.get_total_seconds()
+        with self._lock:
+            phases = sorted(self.phases.items(), key=lambda phase: -phase[1][1])
+        measured = sum(seconds for _, (_, seconds) in phases)
+        rows = [
+            (name, calls, seconds * 1000, seconds / total if total else 0.0)
+            for name, (calls, seconds) in phases
+        ]
+        overhead = max(total - measured, 0.0)
+        rows.append(
+            ("local overhead", 1, overhead * 1000, overhead / total if total else 0.0)
+        )
+        return rows
+
+    def append_metrics(self, path: str, command: str):
+        """
+        Appends the measured phases to a file as newline-delimited JSON, one object per phase.
+
+        Args:
+            path (str): Path to the metrics file.
+            command (str): Name of the profiled command.
+        """
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        total_ms = round(self.get_total_seconds() * 1000, 3)
+        with open(path, "a", encoding="utf-8") as file:
+            for phase, calls, milliseconds, share in self.get_breakdown():
+                metric = {
+                    "timestamp": timestamp,
+                    "command": command,
+                    "phase": phase,
+                    "calls": calls,
+                    "ms": round(milliseconds, 3),
+                    "share": round(share, 4),
+                    "total_ms": total_ms,
+                }
+                file.write(json.dumps(metric) + "\n")
+
+
+profiler = Profiler()
+
+
+def span(name: str):
+    """
+    Measures the time spent inside of the `with` block as the given phase of the process-wide profiler.
+
+    Args:
+        name (str): Phase name, e.g. "api call".
+
+    Returns:
+        A context manager.
+    """
+    return profiler.span(name)
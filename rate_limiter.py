@@ -0,0 +1,165 @@
+import os
+import json
+import time
+from date_utils import get_current_date
+from safe_files import lock_file, open_for_replace
+
+USAGE_COUNTERS = ["requests", "rate_limited", "coalesced", "waited_s"]
+
+
+class QuotaExceededError(Exception):
+    """
+    Exception raised when the monthly quota of requests has been used up.
+
+    Attributes:
+        message (str): Description of the error.
+    """
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+class SharedRateLimiter:
+    """
+    Class for limiting the requests of all of the program's processes with a token bucket,
+    and for counting the requests per month.
+
+    The bucket and the counters are kept in a JSON file that is only read and written
+    while it is locked, so parallel processes share a single limit. When the API responds
+    with 429, the bucket is paused for every process until the API can be called again.
+
+    Attributes:
+        path (str): Path to the JSON state file.
+        rate (float): Number of tokens (requests) added per second.
+        capacity (int): Maximum number of tokens, i.e. the size of a burst.
+        monthly_quota (int): Maximum number of requests per month (0 means unlimited).
+    """
+
+    def __init__(self, path: str, rate: float, capacity: int, monthly_quota: int = 0):
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self.monthly_quota = monthly_quota
+
+    def read_state(self) -> dict:
+        """
+        Reads the state of the bucket and the counters (a full bucket if the file is missing or invalid).
+
+        Returns:
+            dict: Tokens, the time they were counted, the time until which requests are paused and the counters per month.
+        """
+        state = {
+            "tokens": float(self.capacity),
+            "updated_at": time.time(),
+            "paused_until": 0.0,
+            "usage": {},
+        }
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as file:
+                    state.update(json.load(file))
+            except (OSError, ValueError):
+                pass
+        return state
+
+    def write_state(self, state: dict):
+        """
+        Overwrites the state of the bucket and the counters.
+
+        Args:
+            state (dict): State of the bucket and the counters.
+        """
+        with open_for_replace(self.path) as file:
+            json.dump(state, file)
+
+    def get_month_usage(self, state: dict) -> dict:
+        """
+        Returns the counters of the current month, creating them if needed.
+
+        Args:
+            state (dict): State of the bucket and the counters.
+
+        Returns:
+            dict: Counters of the current month.
+        """
+        month = get_current_date().isoformat()[:7]
+        usage = state["usage"].setdefault(month, {})
+        for counter in USAGE_COUNTERS:
+            usage.setdefault(counter, 0)
+        return usage
+
+    def acquire(self) -> float:
+        """
+        Blocks until a token is available (and the requests are not paused), then takes it.
+
+        Returns:
+            float: Number of seconds spent waiting.
+
+        Raises:
+            QuotaExceededError: if the monthly quota of requests has been used up.
+        """
+        waited = 0.0
+        while True:
+            with lock_file(self.path):
+                state = self.read_state()
+                usage = self.get_month_usage(state)
+                if self.monthly_quota and usage["requests"] >= self.monthly_quota:
+                    raise QuotaExceededError(
+                        f"The monthly quota of {self.monthly_quota} requests has been used up."
+                    )
+                now = time.time()
+                tokens = min(
+                    self.capacity,
+                    state["tokens"] + (now - state["updated_at"]) * self.rate,
+                )
+                delay = max(
+                    state["paused_until"] - now,
+                    0.0 if tokens >= 1 else (1 - tokens) / self.rate,
+                )
+                if delay <= 0:
+                    tokens -= 1
+                    usage["requests"] += 1
+                    usage["waited_s"] = round(usage["waited_s"] + waited, 3)
+                state["tokens"], state["updated_at"] = tokens, now
+                self.write_state(state)
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """
+        Empties the bucket and pauses the requests of every process, after the API responded with 429.
+
+        Args:
+            seconds (float): Number of seconds to pause the requests for.
+        """
+        with lock_file(self.path):
+            state = self.read_state()
+            now = time.time()
+            state["tokens"], state["updated_at"] = 0.0, now
+            state["paused_until"] = max(state["paused_until"], now + seconds)
+            self.get_month_usage(state)["rate_limited"] += 1
+            self.write_state(state)
+
+    def count(self, counter: str):
+        """
+        Increments the counter of the current month.
+
+        Args:
+            counter (str): Name of the counter (e.g. 'coalesced').
+        """
+        with lock_file(self.path):
+            state = self.read_state()
+            self.get_month_usage(state)[counter] += 1
+            self.write_state(state)
+
+    def get_usage(self) -> dict:
+        """
+        Returns the counters of every month.
+
+        Returns:
+            dict: Counters keyed by the month (YYYY-MM), in chronological order.
+        """
+        return dict(sorted(self.read_state()["usage"].items()))
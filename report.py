@@ -0,0 +1,107 @@
+import numpy as np
+from datetime import date, timedelta
+from injection_table import InjectionTable, INJECTION_TYPES, INJECTION_TYPE_CODES
+
+MINUTES_PER_DAY = 1440
+ROLLING_WINDOWS = [7, 14, 30]
+
+
+def get_daily_totals_from_rollup(
+    daily_totals: list, start: date, end: date
+) -> np.ndarray:
+    """
+    Arranges the stored daily totals of the date range into an array with a row for every day.
+
+    Args:
+        daily_totals (list): Tuples of the day (YYYY-MM-DD), number and sum of short insulin injections,
+        number and sum of long insulin injections.
+        start (date): First day of the range.
+        end (date): Last day of the range.
+
+    Returns:
+        np.ndarray: Array of shape (number of days, number of insulin types).
+    """
+    totals = np.zeros(((end - start).days + 1, len(INJECTION_TYPES)))
+    for day, *counts_and_amounts in daily_totals:
+        day_number = (date.fromisoformat(day) - start).days
+        if 0 <= day_number < len(totals):
+            totals[day_number] = counts_and_amounts[1::2]
+    return totals
+
+
+def get_rolling_averages(daily_totals: np.ndarray, window: int) -> np.ndarray:
+    """
+    Averages the daily totals over the trailing window of days.
+
+    The first days of the array are averaged over the days that are available.
+
+    Args:
+        daily_totals (np.ndarray): Array of shape (number of days, number of insulin types).
+        window (int): Number of days to average over.
+
+    Returns:
+        np.ndarray: Array of the same shape as `daily_totals`.
+    """
+    cumulative_totals = np.cumsum(daily_totals, axis=0)
+    window_totals = cumulative_totals.copy()
+    window_totals[window:] -= cumulative_totals[:-window]
+    days_in_window = np.minimum(np.arange(1, len(daily_totals) + 1), window)
+    return window_totals / days_in_window[:, np.newaxis]
+
+
+def get_hourly_histogram(table: InjectionTable, type: str = "short") -> np.ndarray:
+    """
+    Counts the injections of the insulin type by the hour of the day.
+
+    Args:
+        table (InjectionTable): Injections history.
+        type (str): Type of insulin (short, long).
+
+    Returns:
+        np.ndarray: Number of injections for each of the 24 hours.
+    """
+    minutes = np.frombuffer(table.minutes, dtype=np.int32)
+    types = np.frombuffer(table.types, dtype=np.uint8)
+    hours = minutes[types == INJECTION_TYPE_CODES[type]] % MINUTES_PER_DAY // 60
+    return np.bincount(hours, minlength=24)
+
+
+def get_daily_report_rows(daily_totals: np.ndarray, start: date) -> list:
+    """
+    Builds the rows of daily totals and their rolling averages for each day after the warmup days.
+
+    The daily totals should start with the days before the start date (one less than the longest rolling window),
+    so that the first days are averaged correctly.
+
+    Args:
+        daily_totals (np.ndarray): Array of shape (number of days, number of insulin types) starting with the warmup days.
+        start (date): First day of the report.
+
+    Returns:
+        list: Rows of the date, daily totals and rolling averages ('short / long') of each day.
+    """
+    warmup_days = get_warmup_days()
+    rolling_averages = [
+        get_rolling_averages(daily_totals, window)[warmup_days:]
+        for window in ROLLING_WINDOWS
+    ]
+    daily_totals = daily_totals[warmup_days:]
+
+    rows = []
+    for day_number in range(len(daily_totals)):
+        row = [start + timedelta(days=day_number)]
+        row.extend(int(total) for total in daily_totals[day_number])
+        for averages in rolling_averages:
+            row.append(" / ".join(f"{value:.1f}" for value in averages[day_number]))
+        rows.append(row)
+    return rows
+
+
+def get_warmup_days() -> int:
+    """
+    Returns the number of days before the report's start date needed by the longest rolling window.
+
+    Returns:
+        int: Number of warmup days.
+    """
+    return max(ROLLING_WINDOWS) - 1
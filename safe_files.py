@@ -0,0 +1,116 @@
+import os
+import threading
+from contextlib import contextmanager
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# Each lock is held by a single thread of the process at a time, and the thread can take
+# it again (e.g. when a writer rebuilds the day index), without locking the file twice.
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+_held_lock_files = {}
+
+
+def acquire_file_lock(file):
+    """
+    Blocks until the exclusive advisory lock of the open file is acquired.
+
+    Args:
+        file: File object of the lock file.
+    """
+    if os.name == "nt":
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after 10 seconds, but the lock is always released eventually.
+                continue
+    fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+
+def release_file_lock(file):
+    """
+    Releases the exclusive advisory lock of the open file.
+
+    Args:
+        file: File object of the lock file.
+    """
+    if os.name == "nt":
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def get_lock_path(path: str) -> str:
+    """
+    Returns the path to the lock file of the file.
+
+    Args:
+        path (str): Path to the locked file.
+
+    Returns:
+        str: Absolute path to the lock file.
+    """
+    return f"{os.path.abspath(path)}.lock"
+
+
+@contextmanager
+def lock_file(path: str):
+    """
+    Holds the exclusive advisory lock of the file while the `with` block runs.
+
+    The lock is taken on a separate `<path>.lock` file, so that the locked file itself can
+    be replaced. Only the writers of the same file wait for each other.
+
+    Args:
+        path (str): Path to the file that is going to be written.
+    """
+    lock_path = get_lock_path(path)
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(lock_path, threading.RLock())
+
+    with thread_lock:
+        if lock_path in _held_lock_files:
+            yield
+            return
+        with open(lock_path, "a+b") as lock_file:
+            acquire_file_lock(lock_file)
+            _held_lock_files[lock_path] = lock_file
+            try:
+                yield
+            finally:
+                del _held_lock_files[lock_path]
+                release_file_lock(lock_file)
+
+
+@contextmanager
+def open_for_replace(path: str, newline: str | None = None, mode: str = "w"):
+    """
+    Opens a temporary file for writing and replaces the file with it once the `with` block succeeds.
+
+    Readers see either the old or the new contents of the file, never a partially written file.
+
+    Args:
+        path (str): Path to the file that is going to be replaced.
+        newline (str | None): Newline mode of the opened file (text mode only).
+        mode (str): 'w' to write text or 'wb' to write bytes.
+
+    Yields:
+        A file object of the temporary file.
+    """
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporary_path, mode, newline=newline) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
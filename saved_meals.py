@@ -0,0 +1,133 @@
+import os
+import json
+import time
+from safe_files import lock_file, open_for_replace
+from nutrition_result import NutritionResult, to_nutrition_result
+
+
+class SavedMeals:
+    """
+    Class for storing the named meals with their nutrients in a JSON file.
+
+    Each meal keeps its food list, the nutrients of every item and the precomputed totals,
+    so that it can be calculated without the Nutrition Analysis API.
+
+    Attributes:
+        path (str): Path to a JSON file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        """
+        Normalizes the meal's name so that it can be looked up in any case.
+
+        Args:
+            name (str): Meal's name.
+
+        Returns:
+            str: Lowercased name with collapsed whitespace.
+        """
+        return " ".join(name.lower().split())
+
+    def read_meals(self) -> dict:
+        """
+        Reads the saved meals from the JSON file.
+
+        Returns:
+            dict: Saved meals keyed by their normalized names (empty if the file is missing or invalid).
+        """
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def get_meal(self, name: str) -> dict | None:
+        """
+        Returns the saved meal.
+
+        Args:
+            name (str): Meal's name.
+
+        Returns:
+            dict: Food list, items, total nutrients and the time the meal was saved.
+            None: If there is no meal with this name.
+        """
+        return self.read_meals().get(self.normalize_name(name))
+
+    def save_meal(self, name: str, food: str, response: dict | NutritionResult) -> dict:
+        """
+        Saves the meal (or replaces the meal with the same name) with its nutrients and totals.
+
+        Args:
+            name (str): Meal's name.
+            food (str): Food list as a text.
+            response (dict | NutritionResult): Nutrition Analysis API response object for the food list or its parsed result.
+
+        Returns:
+            dict: The saved meal.
+
+        Raises:
+            ValueError: if the name is empty or the response has no items.
+        """
+        key = self.normalize_name(name)
+        if not key:
+            raise ValueError("Meal's name cannot be empty!")
+        result = to_nutrition_result(response)
+        if not len(result):
+            raise ValueError("The food input was unknown!")
+
+        meal = {
+            "food": food,
+            "items": result.get_items(),
+            "total": result.get_rounded_totals(),
+            "saved_at": time.time(),
+        }
+        with lock_file(self.path):
+            meals = self.read_meals()
+            meals[key] = meal
+            with open_for_replace(self.path) as file:
+                json.dump(meals, file)
+        return meal
+
+    def delete_meal(self, name: str) -> bool:
+        """
+        Deletes the saved meal.
+
+        Args:
+            name (str): Meal's name.
+
+        Returns:
+            bool: True if the meal was deleted, False if there was no meal with this name.
+        """
+        with lock_file(self.path):
+            meals = self.read_meals()
+            if meals.pop(self.normalize_name(name), None) is None:
+                return False
+            with open_for_replace(self.path) as file:
+                json.dump(meals, file)
+        return True
+
+    def get_stale_meals(self, max_age: int) -> list:
+        """
+        Returns the names of the meals that were saved more than `max_age` seconds ago.
+
+        Args:
+            max_age (int): Number of seconds the saved nutrients stay fresh (0 means they never get stale).
+
+        Returns:
+            list: Names of the stale meals.
+        """
+        if max_age <= 0:
+            return []
+        now = time.time()
+        return [
+            name
+            for name, meal in self.read_meals().items()
+            if now - meal["saved_at"] > max_age
+        ]
@@ -0,0 +1,393 @@
+import json
+import asyncio
+import traceback
+from http import HTTPStatus
+from datetime import date
+from urllib.parse import urlsplit, parse_qs
+from session import Session
+from dose import Dose
+from injection import Injection
+from date_utils import get_current_date, get_current_date_and_time
+from constants import DATETIME_FORMAT, SERVER_MAX_BODY_SIZE
+
+
+class HTTPError(Exception):
+    """
+    Exception raised when the request to the API service cannot be handled.
+
+    Attributes:
+        status (HTTPStatus): Status of the error response.
+        message (str): Description of the error.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def dose_to_json(dose: Dose) -> dict:
+    """
+    Converts the insulin dose into a JSON object.
+
+    Args:
+        dose (Dose): Insulin dose object.
+
+    Returns:
+        dict: Type, insulin amount and carbs amount of the dose.
+    """
+    return {
+        "type": dose.type,
+        "insulin_amount": dose.insulin_amount,
+        "carbs_amount": dose.carbs_amount,
+    }
+
+
+def injection_to_json(injection: Injection) -> dict:
+    """
+    Converts the injection into a JSON object.
+
+    Args:
+        injection (Injection): Injection object.
+
+    Returns:
+        dict: Type, amount and timestamp (YYYY-MM-DD HH:MM) of the injection.
+    """
+    return {
+        "type": injection.type,
+        "amount": injection.amount,
+        "timestamp": injection.timestamp.strftime(DATETIME_FORMAT),
+    }
+
+
+def parse_json_body(body: bytes) -> dict:
+    """
+    Parses the request body as a JSON object.
+
+    Args:
+        body (bytes): Request body.
+
+    Returns:
+        dict: Parsed JSON object.
+
+    Raises:
+        HTTPError: if the body is not a JSON object.
+    """
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be valid JSON.")
+    if not isinstance(data, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+    return data
+
+
+def parse_date_parameter(parameters: dict, name: str, default: date) -> date:
+    """
+    Parses the date query parameter.
+
+    Args:
+        parameters (dict): Parsed query parameters.
+        name (str): Name of the parameter.
+        default (date): Date to return if the parameter was not provided.
+
+    Returns:
+        date: Date of the parameter.
+
+    Raises:
+        HTTPError: if the date is not in format YYYY-MM-DD.
+    """
+    if name not in parameters:
+        return default
+    try:
+        return date.fromisoformat(parameters[name][0])
+    except ValueError:
+        raise HTTPError(
+            HTTPStatus.BAD_REQUEST, f"Parameter '{name}' must be in format YYYY-MM-DD."
+        )
+
+
+def format_response(status: HTTPStatus, payload, keep_alive: bool) -> bytes:
+    """
+    Formats the HTTP response with a JSON body.
+
+    Args:
+        status (HTTPStatus): Response status.
+        payload: JSON payload.
+        keep_alive (bool): Whether the connection stays open.
+
+    Returns:
+        bytes: Response bytes.
+    """
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+class DiabetrServer:
+    """
+    Class for serving the program's actions as a JSON API over HTTP/1.1 with keep-alive connections.
+
+    A single session is shared by all of the requests, so the parsed doses, today's injections
+    and the pooled connections to the Nutrition Analysis API stay warm between the requests.
+    Blocking work runs in threads; the storage is accessed by a single request at a time.
+
+    Endpoints:
+        GET /doses, PUT /doses/<type>, GET /injections[?from=&to=], POST /injections, POST /calculate.
+
+    Attributes:
+        session (Session): Program's state shared by the requests.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.storage_lock = asyncio.Lock()
+
+    async def run_with_storage(self, function, *args):
+        """
+        Runs the blocking storage function in a thread while no other request is using the storage.
+
+        Args:
+            function (callable): Function to run.
+            *args: Arguments of the function.
+
+        Returns:
+            The return value of the function.
+        """
+        async with self.storage_lock:
+            return await asyncio.to_thread(function, *args)
+
+    async def get_doses(self) -> list:
+        """
+        Returns the insulin doses.
+
+        Returns:
+            list: JSON objects of the insulin doses.
+        """
+        doses = await self.run_with_storage(self.session.get_doses)
+        return [dose_to_json(dose) for dose in doses]
+
+    async def update_dose(self, type: str, data: dict) -> dict:
+        """
+        Updates the insulin dose.
+
+        Args:
+            type (str): Insulin's type ('short', 'long').
+            data (dict): JSON object with the insulin amount and the carbs amount (short insulin only).
+
+        Returns:
+            dict: JSON object of the updated insulin dose.
+
+        Raises:
+            HTTPError: if the dose is invalid.
+        """
+        try:
+            dose = Dose(type, data.get("insulin_amount"), data.get("carbs_amount", 0))
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        await self.run_with_storage(self.session.update_dose, dose)
+        return dose_to_json(dose)
+
+    async def get_injections(self, parameters: dict) -> list:
+        """
+        Returns today's injections (or the injections in the date range if `from` or `to` is provided).
+
+        Args:
+            parameters (dict): Parsed query parameters.
+
+        Returns:
+            list: JSON objects of the injections.
+
+        Raises:
+            HTTPError: if a date parameter is invalid.
+        """
+        if "from" not in parameters and "to" not in parameters:
+            injections = await self.run_with_storage(self.session.get_todays_injections)
+        else:
+            start = parse_date_parameter(parameters, "from", date.min)
+            end = parse_date_parameter(parameters, "to", get_current_date())
+            injections = await self.run_with_storage(
+                lambda: list(
+                    self.session.injections_storage.iter_injections(start, end)
+                )
+            )
+        return [injection_to_json(injection) for injection in injections or []]
+
+    async def add_injection(self, data: dict) -> dict:
+        """
+        Saves a new injection with the current date and time.
+
+        Args:
+            data (dict): JSON object with the insulin type and amount.
+
+        Returns:
+            dict: JSON object of the saved injection.
+
+        Raises:
+            HTTPError: if the injection is invalid.
+        """
+        try:
+            injection = Injection(
+                data.get("type"), data.get("amount"), get_current_date_and_time()
+            )
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        await self.run_with_storage(self.session.save_new_injection, injection)
+        return injection_to_json(injection)
+
+    async def calculate(self, data: dict) -> dict:
+        """
+        Calculates the nutrients of the meal and the amount of insulin to inject.
+
+        Args:
+            data (dict): JSON object with the food list as a text.
+
+        Returns:
+            dict: JSON object with the meal, the nutrients of each item, their totals and the insulin amount.
+
+        Raises:
+            HTTPError: if the food list is empty or unknown, or the Nutrition Analysis API request failed.
+        """
+        from helpers import get_nutrition_analysis_by_ingredients
+        from nutrition_client import NutritionAPIError
+        from diabetr import build_result
+
+        food_input = data.get("food")
+        if not isinstance(food_input, str) or not food_input.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Food list cannot be empty!")
+        try:
+            response = await asyncio.to_thread(
+                get_nutrition_analysis_by_ingredients, food_input
+            )
+        except NutritionAPIError as e:
+            raise HTTPError(HTTPStatus.BAD_GATEWAY, e.message)
+        if not response["items"]:
+            raise HTTPError(
+                HTTPStatus.UNPROCESSABLE_ENTITY, "The provided food input was unknown!"
+            )
+        short_dose = await self.run_with_storage(self.session.get_short_dose)
+        return build_result(food_input, response, short_dose).to_dict()
+
+    async def handle_request(self, method: str, target: str, body: bytes) -> tuple:
+        """
+        Routes the request to its action.
+
+        Args:
+            method (str): HTTP method.
+            target (str): Request target (path and query).
+            body (bytes): Request body.
+
+        Returns:
+            tuple: Response status and the JSON payload.
+
+        Raises:
+            HTTPError: if the request cannot be handled.
+        """
+        url = urlsplit(target)
+        path = url.path.rstrip("/")
+        if path == "/doses" and method == "GET":
+            return HTTPStatus.OK, await self.get_doses()
+        if path in ("/doses/short", "/doses/long") and method == "PUT":
+            type = path.rsplit("/", 1)[1]
+            return HTTPStatus.OK, await self.update_dose(type, parse_json_body(body))
+        if path == "/injections" and method == "GET":
+            return HTTPStatus.OK, await self.get_injections(parse_qs(url.query))
+        if path == "/injections" and method == "POST":
+            return HTTPStatus.CREATED, await self.add_injection(parse_json_body(body))
+        if path == "/calculate" and method == "POST":
+            return HTTPStatus.OK, await self.calculate(parse_json_body(body))
+        if path in (
+            "/doses",
+            "/doses/short",
+            "/doses/long",
+            "/injections",
+            "/calculate",
+        ):
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Method is not allowed.")
+        raise HTTPError(HTTPStatus.NOT_FOUND, "Not found.")
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """
+        Reads the requests of a single connection and writes their responses until the connection is closed.
+
+        Args:
+            reader (asyncio.StreamReader): Connection's reader.
+            writer (asyncio.StreamWriter): Connection's writer.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                    content_length = int(headers.get("content-length", 0))
+                    if content_length > SERVER_MAX_BODY_SIZE:
+                        keep_alive = False
+                        raise HTTPError(
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            "Request body is too large.",
+                        )
+                    body = await reader.readexactly(content_length)
+                    status, payload = await self.handle_request(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except ValueError:
+                    keep_alive = False
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": "Bad request."}
+                except Exception:
+                    traceback.print_exc()
+                    status = HTTPStatus.INTERNAL_SERVER_ERROR
+                    payload = {"error": "Internal server error."}
+
+                writer.write(format_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        """
+        Starts listening for the connections.
+
+        Args:
+            host (str): Host to listen on.
+            port (int): Port to listen on (0 picks a free port).
+
+        Returns:
+            asyncio.Server: A listening server object.
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def serve_forever(server: DiabetrServer, host: str, port: int, on_start=None):
+    """
+    Runs the API service until it is cancelled.
+
+    Args:
+        server (DiabetrServer): API service.
+        host (str): Host to listen on.
+        port (int): Port to listen on.
+        on_start (callable | None): Called with the listening address once the service has started.
+    """
+    listening_server = await server.start(host, port)
+    if on_start is not None:
+        on_start(listening_server.sockets[0].getsockname()[:2])
+    async with listening_server:
+        await listening_server.serve_forever()
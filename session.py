@@ -0,0 +1,148 @@
+from typing import TYPE_CHECKING
+from decouple import config
+from rate_limiter import SharedRateLimiter
+from storage import get_doses_storage, get_injections_storage
+from date_utils import get_current_date
+from injection import Injection
+from dose import Dose
+from constants import NUTRITION_API_USAGE_PATH
+
+if TYPE_CHECKING:
+    from nutrition_client import NutritionClient
+
+
+def get_rate_limiter() -> SharedRateLimiter:
+    """
+    Returns the Nutrition Analysis API rate limiter configured through the environment.
+
+    Returns:
+        SharedRateLimiter: A rate limiter object shared by the program's processes.
+    """
+    return SharedRateLimiter(
+        NUTRITION_API_USAGE_PATH,
+        config("NUTRITION_API_RATE_LIMIT", default=1.0, cast=float),
+        config("NUTRITION_API_BURST", default=5, cast=int),
+        config("NUTRITION_API_MONTHLY_QUOTA", default=0, cast=int),
+    )
+
+
+class Session:
+    """
+    Class for keeping the program's state in memory between the actions of a long-running (menu) session.
+
+    The parsed insulin doses and today's injections are reloaded only when their storage
+    was changed by another process (or when the day changes).
+
+    Attributes:
+        doses_storage (DosesStorage): Insulin doses storage.
+        injections_storage (InjectionsStorage): Injections storage.
+    """
+
+    def __init__(self):
+        self.doses_storage = get_doses_storage()
+        self.injections_storage = get_injections_storage()
+        self._nutrition_client = None
+        self._doses = None
+        self._doses_revision = None
+        self._todays_injections = None
+        self._todays_injections_day = None
+        self._injections_revision = None
+
+    @property
+    def nutrition_client(self) -> "NutritionClient":
+        """
+        Returns the Nutrition Analysis API client, creating it on the first use.
+
+        Returns:
+            NutritionClient: A Nutrition Analysis API client object.
+        """
+        if self._nutrition_client is None:
+            from nutrition_client import NutritionClient
+
+            self._nutrition_client = NutritionClient(
+                config("NUTRITION_API_KEY"), rate_limiter=get_rate_limiter()
+            )
+        return self._nutrition_client
+
+    def get_doses(self) -> list:
+        """
+        Returns the insulin doses, reading them from the storage only if it has changed.
+
+        Returns:
+            list: A list of insulin doses.
+        """
+        revision = self.doses_storage.get_revision()
+        if self._doses is None or revision is None or revision != self._doses_revision:
+            self._doses = self.doses_storage.read_doses()
+            self._doses_revision = self.doses_storage.get_revision()
+        return self._doses
+
+    def get_short_dose(self) -> Dose:
+        """
+        Returns the short insulin dose.
+
+        Returns:
+            Dose: An insulin dose object.
+        """
+        for dose in self.get_doses():
+            if dose.type == "short":
+                return dose
+
+    def update_dose(self, dose: Dose):
+        """
+        Updates the insulin dose in the storage and in memory.
+
+        Args:
+            dose (Dose): Insulin Dose object to save.
+        """
+        self.doses_storage.update_dose(dose)
+        self._doses = None
+
+    def get_todays_injections(self) -> list | None:
+        """
+        Returns today's injections, reading them from the storage only if it has changed or the day has changed.
+
+        Returns:
+            list: If there is at least one injection saved today.
+            None: If there are no injections saved today.
+        """
+        today = get_current_date()
+        revision = self.injections_storage.get_revision()
+        if (
+            self._todays_injections_day != today
+            or revision is None
+            or revision != self._injections_revision
+        ):
+            self._todays_injections = (
+                self.injections_storage.read_todays_injections() or []
+            )
+            self._todays_injections_day = today
+            self._injections_revision = self.injections_storage.get_revision()
+        return list(self._todays_injections) or None
+
+    def save_new_injection(self, injection: Injection):
+        """
+        Saves the injection to the storage and adds it to today's injections in memory.
+
+        Args:
+            injection (Injection): Injection object to save.
+        """
+        is_up_to_date = (
+            self._todays_injections_day == get_current_date()
+            and self._injections_revision is not None
+            and self.injections_storage.get_revision() == self._injections_revision
+        )
+        self.injections_storage.save_new_injection(injection)
+        if not is_up_to_date:
+            self._todays_injections_day = None
+            return
+        if injection.timestamp.date() == self._todays_injections_day:
+            self._todays_injections.append(injection)
+        self._injections_revision = self.injections_storage.get_revision()
+
+    def close(self):
+        """
+        Closes the pooled connections of the Nutrition Analysis API client.
+        """
+        if self._nutrition_client is not None:
+            self._nutrition_client.close()
@@ -0,0 +1,279 @@
+import sqlite3
+from array import array
+from datetime import date, datetime
+from storage import InjectionsStorage, DosesStorage
+from date_utils import get_current_date, convert_string_to_datetime
+from injection import Injection
+from injection_table import (
+    InjectionTable,
+    INJECTION_TYPE_CODES,
+    datetime_to_epoch_minute,
+)
+from dose import Dose
+from file_handlers import InjectionsFileHandler, DosesFileHandler
+
+
+def connect_database(path: str) -> sqlite3.Connection:
+    """
+    Opens the SQLite database in WAL mode and creates its tables if they do not exist yet.
+
+    The connection can be used by other threads (e.g. the server's worker threads), as long as
+    only one of them uses it at a time.
+
+    Args:
+        path (str): Path to a SQLite database file.
+
+    Returns:
+        sqlite3.Connection: A database connection.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with connection:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS injections ("
+            "id INTEGER PRIMARY KEY, type TEXT NOT NULL, amount INTEGER NOT NULL, timestamp TEXT NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS injections_timestamp ON injections (timestamp)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS doses ("
+            "type TEXT PRIMARY KEY, insulin_amount INTEGER NOT NULL, carbs_amount INTEGER NOT NULL)"
+        )
+    return connection
+
+
+class InjectionsDatabaseHandler(InjectionsStorage):
+    """
+    Class for reading/writing injections data from/to SQLite database.
+
+    Attributes:
+        path (str): Path to a SQLite database file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = connect_database(path)
+
+    def read_todays_injections(self) -> list | None:
+        """
+        Queries the database and returns a list of injections that were saved today.
+
+        Returns:
+            list: If there is at least one injection saved today.
+            None: If there are no injections saved today.
+        """
+        today = get_current_date()
+        todays_injections = list(self.iter_injections(today, today))
+        if not todays_injections:
+            return None
+        return todays_injections
+
+    def save_new_injection(self, injection: Injection):
+        """
+        Saves newly added injection to the database.
+
+        Args:
+            injection (Injection): Injection object to save.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO injections (type, amount, timestamp) VALUES (?, ?, ?)",
+                (injection.type, injection.amount, str(injection.timestamp)),
+            )
+
+    def import_injections(self, rows: list) -> int:
+        """
+        Inserts the chronologically sorted rows in a single transaction, skipping the ones that are already saved.
+
+        Args:
+            rows (list): Sorted tuples of the timestamp (datetime), insulin type and amount.
+
+        Returns:
+            int: Number of imported rows.
+        """
+        with self.connection:
+            changes_before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT INTO injections (type, amount, timestamp) SELECT ?, ?, ? "
+                "WHERE NOT EXISTS (SELECT 1 FROM injections WHERE timestamp = ?3 AND type = ?1 AND amount = ?2)",
+                [(type, amount, str(timestamp)) for timestamp, type, amount in rows],
+            )
+            return self.connection.total_changes - changes_before
+
+    def iter_injections(self, start: date, end: date):
+        """
+        Yields the injections that were saved between the start and end dates (both inclusive).
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Yields:
+            Injection: Injection objects in chronological order.
+        """
+        # Timestamps are stored as 'YYYY-MM-DD HH:MM:SS', which sorts before 'YYYY-MM-DDT' of the same day.
+        rows = self.connection.execute(
+            "SELECT type, amount, timestamp FROM injections "
+            "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, id",
+            (start.isoformat(), f"{end.isoformat()}T"),
+        )
+        for type, amount, timestamp in rows:
+            yield Injection(type, amount, convert_string_to_datetime(timestamp))
+
+    def read_injection_table(self, start: date, end: date) -> InjectionTable:
+        """
+        Reads the injections that were saved between the start and end dates (both inclusive) into columns.
+
+        Rows are trusted (they were validated when saved), so no Injection objects are created.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            InjectionTable: An injection table object.
+        """
+        minutes, amounts, types = array("i"), array("H"), array("B")
+        rows = self.connection.execute(
+            "SELECT type, amount, timestamp FROM injections "
+            "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, id",
+            (start.isoformat(), f"{end.isoformat()}T"),
+        )
+        for type, amount, timestamp in rows:
+            minutes.append(datetime_to_epoch_minute(datetime.fromisoformat(timestamp)))
+            amounts.append(amount)
+            types.append(INJECTION_TYPE_CODES[type])
+        return InjectionTable.from_columns(minutes, amounts, types)
+
+    def get_revision(self) -> tuple:
+        """
+        Returns the database's data version and the number of changes made through this connection.
+
+        Returns:
+            tuple: Data version (changes when other connections commit) and the number of own changes.
+        """
+        (data_version,) = self.connection.execute("PRAGMA data_version").fetchone()
+        return data_version, self.connection.total_changes
+
+    def read_daily_totals(self, start: date, end: date) -> list:
+        """
+        Counts the daily totals of the days between the start and end dates (both inclusive) in the database.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            list: Tuples of the day (YYYY-MM-DD), number and sum of short insulin injections,
+            number and sum of long insulin injections (days without injections are left out).
+        """
+        return self.connection.execute(
+            "SELECT substr(timestamp, 1, 10) AS day, "
+            "SUM(type = 'short'), SUM(CASE WHEN type = 'short' THEN amount ELSE 0 END), "
+            "SUM(type = 'long'), SUM(CASE WHEN type = 'long' THEN amount ELSE 0 END) "
+            "FROM injections WHERE timestamp >= ? AND timestamp < ? GROUP BY day ORDER BY day",
+            (start.isoformat(), f"{end.isoformat()}T"),
+        ).fetchall()
+
+
+class DosesDatabaseHandler(DosesStorage):
+    """
+    Class for reading/updating insulin doses data from/to SQLite database.
+
+    Attributes:
+        path (str): Path to a SQLite database file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = connect_database(path)
+
+    def read_doses(self) -> list:
+        """
+        Queries the database and returns a list of insulin doses.
+
+        Returns:
+            list: A list of insulin doses.
+        """
+        rows = self.connection.execute(
+            "SELECT type, insulin_amount, carbs_amount FROM doses ORDER BY type DESC"
+        ).fetchall()
+        if not rows:
+            self.insert_default_doses()
+            return self.read_doses()
+        return [Dose(*row) for row in rows]
+
+    def update_dose(self, dose: Dose):
+        """
+        Updates the insulin dose information in the database.
+
+        Args:
+            dose (Dose): Insulin Dose object to save.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO doses VALUES (?, ?, ?)",
+                (dose.type, dose.insulin_amount, dose.carbs_amount),
+            )
+
+    def get_revision(self) -> tuple:
+        """
+        Returns the database's data version and the number of changes made through this connection.
+
+        Returns:
+            tuple: Data version (changes when other connections commit) and the number of own changes.
+        """
+        (data_version,) = self.connection.execute("PRAGMA data_version").fetchone()
+        return data_version, self.connection.total_changes
+
+    def insert_default_doses(self):
+        """
+        Inserts the default values for the insulin doses.
+        """
+        self.update_dose(Dose("short", 1, 10))
+        self.update_dose(Dose("long", 24, 0))
+
+
+def migrate_csv_to_database(
+    injections_csv_path: str, doses_csv_path: str, database_path: str
+) -> tuple:
+    """
+    Copies the injections and insulin doses from the CSV files into the SQLite database in a single transaction.
+
+    Injections are only copied into an empty injections table, so running the migration twice does not duplicate them.
+
+    Args:
+        injections_csv_path (str): Path to the injections CSV file.
+        doses_csv_path (str): Path to the insulin doses CSV file.
+        database_path (str): Path to a SQLite database file.
+
+    Returns:
+        tuple: Number of migrated injections and insulin doses.
+    """
+    connection = connect_database(database_path)
+    injections = list(
+        InjectionsFileHandler(injections_csv_path).iter_injections(date.min, date.max)
+    )
+    doses = DosesFileHandler(doses_csv_path).read_doses()
+
+    with connection:
+        (injections_count,) = connection.execute(
+            "SELECT COUNT(*) FROM injections"
+        ).fetchone()
+        if injections_count:
+            injections = []
+        connection.executemany(
+            "INSERT INTO injections (type, amount, timestamp) VALUES (?, ?, ?)",
+            [
+                (injection.type, injection.amount, str(injection.timestamp))
+                for injection in injections
+            ],
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO doses VALUES (?, ?, ?)",
+            [(dose.type, dose.insulin_amount, dose.carbs_amount) for dose in doses],
+        )
+    connection.close()
+    return len(injections), len(doses)
@@ -0,0 +1,197 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from decouple import config
+from injection import Injection
+from injection_table import InjectionTable, INJECTION_TYPE_CODES
+from dose import Dose
+from constants import (
+    INJECTIONS_CSV_PATH,
+    INJECTIONS_PARTITIONS_PATH,
+    DOSES_CSV_PATH,
+    DATABASE_PATH,
+)
+
+
+class InjectionsStorage(ABC):
+    """
+    Interface for reading/writing injections data.
+    """
+
+    @abstractmethod
+    def read_todays_injections(self) -> list | None:
+        """
+        Returns a list of injections that were saved today.
+
+        Returns:
+            list: If there is at least one injection saved today.
+            None: If there are no injections saved today.
+        """
+
+    @abstractmethod
+    def save_new_injection(self, injection: Injection):
+        """
+        Saves newly added injection.
+
+        Args:
+            injection (Injection): Injection object to save.
+        """
+
+    @abstractmethod
+    def import_injections(self, rows: list) -> int:
+        """
+        Saves the chronologically sorted rows at once, skipping the ones that are already saved.
+
+        Args:
+            rows (list): Sorted tuples of the timestamp (datetime), insulin type and amount.
+
+        Returns:
+            int: Number of imported rows.
+        """
+
+    @abstractmethod
+    def iter_injections(self, start: date, end: date):
+        """
+        Yields the injections that were saved between the start and end dates (both inclusive).
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Yields:
+            Injection: Injection objects in chronological order.
+        """
+
+    def read_injection_table(self, start: date, end: date) -> InjectionTable:
+        """
+        Reads the injections that were saved between the start and end dates (both inclusive) into columns.
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            InjectionTable: An injection table object.
+        """
+        return InjectionTable.from_injections(self.iter_injections(start, end))
+
+    def read_daily_totals(self, start: date, end: date) -> list:
+        """
+        Counts the daily totals of the days between the start and end dates (both inclusive).
+
+        Args:
+            start (date): First day of the range.
+            end (date): Last day of the range.
+
+        Returns:
+            list: Tuples of the day (YYYY-MM-DD), number and sum of short insulin injections,
+            number and sum of long insulin injections (days without injections are left out).
+        """
+        daily_totals = []
+        for injection in self.iter_injections(start, end):
+            day = injection.timestamp.date().isoformat()
+            if not daily_totals or daily_totals[-1][0] != day:
+                daily_totals.append([day, 0, 0, 0, 0])
+            column = 1 + 2 * INJECTION_TYPE_CODES[injection.type]
+            daily_totals[-1][column] += 1
+            daily_totals[-1][column + 1] += injection.amount
+        return [tuple(totals) for totals in daily_totals]
+
+    def get_revision(self):
+        """
+        Returns a value that changes whenever the injections are changed.
+
+        Returns:
+            Hashable value or None (if the storage cannot tell when it has changed).
+        """
+        return None
+
+    def rebuild_daily_totals(self):
+        """
+        Rebuilds the stored daily totals (if the storage keeps any) from the injections.
+        """
+
+
+class DosesStorage(ABC):
+    """
+    Interface for reading/updating insulin doses data.
+    """
+
+    @abstractmethod
+    def read_doses(self) -> list:
+        """
+        Returns a list of insulin doses.
+
+        Returns:
+            list: A list of insulin doses.
+        """
+
+    @abstractmethod
+    def update_dose(self, dose: Dose):
+        """
+        Updates the insulin dose information.
+
+        Args:
+            dose (Dose): Insulin Dose object to save.
+        """
+
+    def get_revision(self):
+        """
+        Returns a value that changes whenever the insulin doses are changed.
+
+        Returns:
+            Hashable value or None (if the storage cannot tell when it has changed).
+        """
+        return None
+
+
+def get_storage_backend() -> str:
+    """
+    Returns the storage backend configured through the environment.
+
+    Returns:
+        str: 'csv', 'partitioned' or 'sqlite'.
+    """
+    backend = config("STORAGE_BACKEND", default="csv").lower()
+    if backend not in ["csv", "partitioned", "sqlite"]:
+        raise ValueError(
+            "Storage backend must be either 'csv', 'partitioned' or 'sqlite'."
+        )
+    return backend
+
+
+def get_injections_storage() -> InjectionsStorage:
+    """
+    Returns the injections storage of the configured backend.
+
+    Returns:
+        InjectionsStorage: An injections storage object.
+    """
+    if get_storage_backend() == "sqlite":
+        from sqlite_storage import InjectionsDatabaseHandler
+
+        return InjectionsDatabaseHandler(DATABASE_PATH)
+    if get_storage_backend() == "partitioned":
+        from partitioned_storage import PartitionedInjectionsHandler
+
+        return PartitionedInjectionsHandler(INJECTIONS_PARTITIONS_PATH)
+
+    from file_handlers import InjectionsFileHandler
+
+    return InjectionsFileHandler(INJECTIONS_CSV_PATH)
+
+
+def get_doses_storage() -> DosesStorage:
+    """
+    Returns the insulin doses storage of the configured backend.
+
+    Returns:
+        DosesStorage: An insulin doses storage object.
+    """
+    if get_storage_backend() == "sqlite":
+        from sqlite_storage import DosesDatabaseHandler
+
+        return DosesDatabaseHandler(DATABASE_PATH)
+
+    from file_handlers import DosesFileHandler
+
+    return DosesFileHandler(DOSES_CSV_PATH)
@@ -0,0 +1,130 @@
+from itertools import chain, islice
+from typing import Iterable, Iterator
+
+# Borders of tabulate's "rounded_grid" style, so that the streamed tables look like the rest.
+TOP_BORDER = ("╭─", "─┬─", "─╮")
+ROW_SEPARATOR = ("├─", "─┼─", "─┤")
+BOTTOM_BORDER = ("╰─", "─┴─", "─╯")
+CELL_SEPARATOR = ("│ ", " │ ", " │")
+# Like tabulate, the headers are padded to be wider than the values.
+HEADER_PADDING = 2
+
+
+def is_number(value) -> bool:
+    """
+    Checks whether the table cell value is a number.
+
+    Args:
+        value: Table cell value.
+
+    Returns:
+        bool: True if the value is an int or a float.
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def get_column_widths(headers: list, sample: list) -> list:
+    """
+    Returns the widths of the columns that fit the headers and every row of the sample.
+
+    Args:
+        headers (list): Column headers.
+        sample (list): First rows of the table.
+
+    Returns:
+        list: Width of each column.
+    """
+    widths = [len(header) + HEADER_PADDING for header in headers]
+    for row in sample:
+        widths = [max(width, len(str(value))) for width, value in zip(widths, row)]
+    return widths
+
+
+def get_column_alignments(headers: list, sample: list) -> list:
+    """
+    Returns the alignments of the columns: numeric columns are aligned right, the rest left.
+
+    Args:
+        headers (list): Column headers.
+        sample (list): First rows of the table.
+
+    Returns:
+        list: Either 'right' or 'left' for each column.
+    """
+    return [
+        "right" if sample and all(is_number(row[i]) for row in sample) else "left"
+        for i in range(len(headers))
+    ]
+
+
+def format_border(widths: list, border: tuple) -> str:
+    """
+    Returns the horizontal border line of the table.
+
+    Args:
+        widths (list): Width of each column.
+        border (tuple): Left, middle and right parts of the border.
+
+    Returns:
+        str: Border line.
+    """
+    left, middle, right = border
+    return left + middle.join("─" * width for width in widths) + right
+
+
+def format_row(row: Iterable, widths: list, alignments: list) -> str:
+    """
+    Returns the table row line. Values that are wider than their column are truncated.
+
+    Args:
+        row (Iterable): Values of the row.
+        widths (list): Width of each column.
+        alignments (list): Either 'right' or 'left' for each column.
+
+    Returns:
+        str: Row line.
+    """
+    cells = []
+    for value, width, alignment in zip(row, widths, alignments):
+        cell = str(value)
+        if len(cell) > width:
+            cell = cell[: width - 1] + "…"
+        cells.append(cell.rjust(width) if alignment == "right" else cell.ljust(width))
+    left, middle, right = CELL_SEPARATOR
+    return left + middle.join(cells) + right
+
+
+def iter_table_pages(
+    rows: Iterable, headers: list, page_size: int, sample_size: int = 100
+) -> Iterator[list]:
+    """
+    Yields the table page by page, so that the first rows can be printed before the rest are read.
+
+    Column widths and alignments are fixed from the first `sample_size` rows, so only
+    the sample and a single page are ever kept in memory. Every page is a complete table with the headers.
+
+    Args:
+        rows (Iterable): Rows of the table (sequences of the values).
+        headers (list): Column headers.
+        page_size (int): Maximum number of rows on a page.
+        sample_size (int): Number of rows used to fix the column widths.
+
+    Yields:
+        list: Lines of a single page.
+    """
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    widths = get_column_widths(headers, sample)
+    alignments = get_column_alignments(headers, sample)
+    rows = chain(sample, rows)
+
+    while page := list(islice(rows, page_size)):
+        lines = [
+            format_border(widths, TOP_BORDER),
+            format_row(headers, widths, alignments),
+        ]
+        for row in page:
+            lines.append(format_border(widths, ROW_SEPARATOR))
+            lines.append(format_row(row, widths, alignments))
+        lines.append(format_border(widths, BOTTOM_BORDER))
+        yield lines
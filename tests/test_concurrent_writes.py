@@ -0,0 +1,56 @@
+import os
+import multiprocessing
+import pytest
+from datetime import datetime
+from file_handlers import InjectionsFileHandler, DosesFileHandler
+from injection import Injection
+from dose import Dose
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="uses fork")
+
+
+def save_injections(path: str, hour: int):
+    ifh = InjectionsFileHandler(path)
+    for minute in range(20):
+        ifh.save_new_injection(
+            Injection("short", 1, datetime(2024, 3, 1, hour, minute))
+        )
+
+
+def update_doses(path: str, type: str):
+    dfh = DosesFileHandler(path)
+    for amount in range(1, 21):
+        dfh.update_dose(Dose(type, amount, 10 if type == "short" else 0))
+
+
+def run_in_parallel(target, arguments: list):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=target, args=args) for args in arguments]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+
+def test_parallel_appends_are_not_lost(tmp_path):
+    path = str(tmp_path / "injections.csv")
+    run_in_parallel(save_injections, [(path, hour) for hour in range(8, 12)])
+
+    ifh = InjectionsFileHandler(path)
+    with open(path, "rb") as file:
+        assert len(file.read().splitlines()) == 1 + 4 * 20
+    assert ifh.read_daily_rollup() == [("2024-03-01", 80, 80, 0, 0)]
+
+
+def test_parallel_dose_updates_are_not_lost(tmp_path):
+    path = str(tmp_path / "doses.csv")
+    DosesFileHandler(path).read_doses()
+    run_in_parallel(update_doses, [(path, "short"), (path, "long")])
+
+    doses = DosesFileHandler(path).read_doses()
+    assert [(dose.type, dose.insulin_amount) for dose in doses] == [
+        ("short", 20),
+        ("long", 20),
+    ]
+    assert sorted(os.listdir(tmp_path)) == ["doses.csv", "doses.csv.lock"]
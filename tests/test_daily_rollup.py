@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from file_handlers import InjectionsFileHandler
+from injection import Injection
+
+
+def test_save_new_injection_updates_daily_rollup(tmp_path):
+    ifh = InjectionsFileHandler(str(tmp_path / "injections.csv"))
+    ifh.save_new_injection(Injection("short", 4, datetime(2024, 3, 1, 8)))
+    ifh.save_new_injection(Injection("short", 6, datetime(2024, 3, 1, 13)))
+    ifh.save_new_injection(Injection("long", 24, datetime(2024, 3, 1, 22)))
+    ifh.save_new_injection(Injection("short", 5, datetime(2024, 3, 3, 8)))
+
+    assert ifh.read_daily_totals(date(2024, 3, 1), date(2024, 3, 3)) == [
+        ("2024-03-01", 2, 10, 1, 24),
+        ("2024-03-03", 1, 5, 0, 0),
+    ]
+    assert ifh.read_daily_rollup() == ifh.rebuild_daily_rollup()
+
+
+def test_import_injections_updates_daily_rollup(tmp_path):
+    ifh = InjectionsFileHandler(str(tmp_path / "injections.csv"))
+    ifh.save_new_injection(Injection("short", 4, datetime(2024, 3, 1, 8)))
+    ifh.save_new_injection(Injection("short", 5, datetime(2024, 3, 3, 8)))
+
+    ifh.import_injections(
+        [
+            (datetime(2024, 3, 2, 22), "long", 24),
+            (datetime(2024, 3, 3, 12), "short", 7),
+        ]
+    )
+
+    assert ifh.read_daily_totals(date(2024, 3, 2), date(2024, 3, 3)) == [
+        ("2024-03-02", 0, 0, 1, 24),
+        ("2024-03-03", 2, 12, 0, 0),
+    ]
+    assert ifh.read_daily_rollup() == ifh.rebuild_daily_rollup()
@@ -0,0 +1,135 @@
+from datetime import date, datetime, timedelta
+import pytest
+import diabetr
+import helpers
+import session as session_module
+from session import Session
+from file_handlers import InjectionsFileHandler, DosesFileHandler
+from injection import Injection
+from tests.test_get_nutrition_analysis_by_ingredients import StubNutritionClient
+
+response = {
+    "items": [
+        {
+            "name": "rice",
+            "calories": 260.0,
+            "fat_total_g": 0.6,
+            "carbohydrates_total_g": 56.2,
+            "protein_g": 5.4,
+            "serving_size_g": 200.0,
+        },
+        {
+            "name": "chicken",
+            "calories": 330.0,
+            "fat_total_g": 7.2,
+            "carbohydrates_total_g": 0.0,
+            "protein_g": 62.0,
+            "serving_size_g": 200.0,
+        },
+    ]
+}
+
+
+@pytest.fixture
+def storage_session(tmp_path, monkeypatch) -> Session:
+    monkeypatch.setattr(
+        session_module,
+        "get_doses_storage",
+        lambda: DosesFileHandler(str(tmp_path / "doses.csv")),
+    )
+    monkeypatch.setattr(
+        session_module,
+        "get_injections_storage",
+        lambda: InjectionsFileHandler(str(tmp_path / "injections.csv")),
+    )
+    session = Session()
+    monkeypatch.setattr(helpers, "get_session", lambda: session)
+    return session
+
+
+@pytest.fixture
+def session(storage_session, monkeypatch) -> Session:
+    monkeypatch.setattr(
+        helpers, "get_nutrition_analysis_by_ingredients", lambda meal: response
+    )
+    return storage_session
+
+
+def test_calculate_returns_result_without_terminal_output(session, capsys):
+    result = diabetr.calculate("200g rice, 200g chicken")
+
+    assert result.items[0] == {
+        "name": "rice",
+        "calories": 260.0,
+        "fat_total_g": 0.6,
+        "carbohydrates_total_g": 56.2,
+        "protein_g": 5.4,
+    }
+    assert result.total == {
+        "calories": 590.0,
+        "fat_total_g": 7.8,
+        "carbohydrates_total_g": 56.2,
+        "protein_g": 67.4,
+    }
+    assert result.insulin_amount == 6
+    assert capsys.readouterr() == ("", "")
+
+
+def test_calculate_rejects_empty_meal(session):
+    with pytest.raises(ValueError):
+        diabetr.calculate("  ")
+
+
+def test_log_injection_and_update_dose(session):
+    injection = diabetr.log_injection("short", 4, datetime(2024, 3, 1, 8))
+    assert injection == Injection("short", 4, datetime(2024, 3, 1, 8))
+    assert diabetr.get_injections(date(2024, 3, 1), date(2024, 3, 1)) == [injection]
+
+    diabetr.update_dose("short", 2, 10)
+    assert diabetr.get_short_dose().insulin_amount == 2
+    assert diabetr.calculate("200g rice, 200g chicken").insulin_amount == 11
+
+    with pytest.raises(ValueError):
+        diabetr.log_injection("medium", 4)
+
+
+def test_calculate_many_shares_the_client_and_caches(
+    storage_session, tmp_path, monkeypatch
+):
+    client = StubNutritionClient()
+    monkeypatch.setattr(
+        helpers, "NUTRITION_CACHE_PATH", str(tmp_path / "nutrition_cache.json")
+    )
+    monkeypatch.setattr(
+        helpers, "INGREDIENTS_CACHE_PATH", str(tmp_path / "ingredients_cache.json")
+    )
+    monkeypatch.setattr(helpers, "is_local_nutrition_backend", lambda: False)
+    storage_session._nutrition_client = client
+
+    results = diabetr.calculate_many(["200g potatoes", "50g potatoes and 100g chicken"])
+
+    assert [result.total["carbohydrates_total_g"] for result in results] == [42.0, 10.5]
+    assert [result.insulin_amount for result in results] == [4, 1]
+    assert client.queries == ["100g potatoes", "100g chicken"]
+    assert helpers.get_nutrition_cache() is helpers.get_nutrition_cache()
+
+
+def test_backdated_injection_is_merged_in_time_order(session):
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    diabetr.log_injection(
+        "long", 24, datetime.combine(yesterday, datetime.min.time()).replace(hour=22)
+    )
+    now_injection = diabetr.log_injection("short", 4)
+    diabetr.log_injection(
+        "short", 3, datetime.combine(yesterday, datetime.min.time()).replace(hour=1)
+    )
+
+    assert diabetr.get_todays_injections() == [now_injection]
+    assert [
+        injection.amount for injection in diabetr.get_injections(yesterday, yesterday)
+    ] == [3, 24]
+    assert session.injections_storage.read_daily_totals(yesterday, today) == [
+        (yesterday.isoformat(), 1, 3, 1, 24),
+        (today.isoformat(), 1, 4, 0, 0),
+    ]
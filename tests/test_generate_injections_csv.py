@@ -0,0 +1,17 @@
+from datetime import datetime
+from benchmarks.generate_injections import generate_injections_csv
+from file_handlers import InjectionsFileHandler
+
+
+def test_generate_injections_csv_writes_sorted_log_ending_at_end_date(tmp_path):
+    path = tmp_path / "injections.csv"
+    generate_injections_csv(str(path), 1000, end=datetime(2024, 3, 4, 23, 0))
+
+    lines = path.read_bytes().decode().splitlines()
+    timestamps = [line.split(",")[2] for line in lines[1:]]
+    assert len(timestamps) == 1000
+    assert timestamps == sorted(timestamps)
+    assert timestamps[-1] == "2024-03-04 23:00:00"
+    assert (
+        InjectionsFileHandler(str(path)).rebuild_daily_rollup()[-1][0] == "2024-03-04"
+    )
@@ -0,0 +1,27 @@
+from helpers import get_meal_nutrients_row
+from dose import Dose
+
+
+def test_get_meal_nutrients_row_returns_totals_and_insulin_amount():
+    mock_response = {
+        "items": [
+            {
+                "name": "potatoes",
+                "calories": 92.9,
+                "fat_total_g": 0.1,
+                "protein_g": 2.5,
+                "carbohydrates_total_g": 21.0,
+            },
+            {
+                "name": "orange juice",
+                "calories": 46.4,
+                "fat_total_g": 0.1,
+                "protein_g": 0.7,
+                "carbohydrates_total_g": 11.2,
+            },
+        ]
+    }
+
+    assert get_meal_nutrients_row(
+        "100g potatoes, 100g orange juice", mock_response, Dose("short", 1, 10)
+    ) == ["100g potatoes, 100g orange juice", 139.3, 0.2, 32.2, 3.2, 3]
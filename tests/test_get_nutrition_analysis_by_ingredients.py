@@ -0,0 +1,143 @@
+import helpers
+from helpers import get_nutrition_analysis_by_ingredients
+
+mock_responses = {
+    "100g potatoes": {
+        "items": [
+            {
+                "name": "potatoes",
+                "calories": 92.9,
+                "serving_size_g": 100.0,
+                "fat_total_g": 0.1,
+                "protein_g": 2.5,
+                "carbohydrates_total_g": 21.0,
+            }
+        ]
+    },
+    "100g bread with 20g butter": {
+        "items": [
+            {
+                "name": "bread",
+                "calories": 261.6,
+                "serving_size_g": 100.0,
+                "fat_total_g": 3.4,
+                "protein_g": 8.8,
+                "carbohydrates_total_g": 49.4,
+            },
+            {
+                "name": "butter",
+                "calories": 143.4,
+                "serving_size_g": 20.0,
+                "fat_total_g": 16.2,
+                "protein_g": 0.2,
+                "carbohydrates_total_g": 0.0,
+            },
+        ]
+    },
+    "150g bread with 20g butter": {
+        "items": [
+            {
+                "name": "bread",
+                "calories": 392.4,
+                "serving_size_g": 150.0,
+                "fat_total_g": 5.1,
+                "protein_g": 13.2,
+                "carbohydrates_total_g": 74.1,
+            },
+            {
+                "name": "butter",
+                "calories": 143.4,
+                "serving_size_g": 20.0,
+                "fat_total_g": 16.2,
+                "protein_g": 0.2,
+                "carbohydrates_total_g": 0.0,
+            },
+        ]
+    },
+    "100g chicken": {
+        "items": [
+            {
+                "name": "chicken",
+                "calories": 222.6,
+                "serving_size_g": 100.0,
+                "fat_total_g": 12.9,
+                "protein_g": 23.7,
+                "carbohydrates_total_g": 0.0,
+            }
+        ]
+    },
+}
+
+
+def test_get_nutrition_analysis_by_ingredients_requests_only_missed_ingredients(
+    tmp_path, monkeypatch
+):
+    queries = []
+
+    def mock_get_nutrition_analysis(query):
+        queries.append(query)
+        return mock_responses[query]
+
+    monkeypatch.setattr(
+        helpers, "INGREDIENTS_CACHE_PATH", str(tmp_path / "ingredients_cache.json")
+    )
+    monkeypatch.setattr(helpers, "get_nutrition_analysis", mock_get_nutrition_analysis)
+
+    response = get_nutrition_analysis_by_ingredients("150g potatoes, 250g chicken")
+    assert sorted(queries) == ["100g chicken", "100g potatoes"]
+    assert [item["carbohydrates_total_g"] for item in response["items"]] == [31.5, 0.0]
+
+    queries.clear()
+    response = get_nutrition_analysis_by_ingredients("200g potatoes, 250g chicken")
+    assert queries == []
+    assert [item["calories"] for item in response["items"]] == [185.8, 556.5]
+
+
+class StubNutritionClient:
+    def __init__(self):
+        self.queries = []
+
+    def get_nutrition(self, query):
+        self.queries.append(query)
+        return mock_responses[query]
+
+
+def test_get_nutrition_analysis_caches_the_client_responses(tmp_path, monkeypatch):
+    client = StubNutritionClient()
+    monkeypatch.setattr(
+        helpers, "NUTRITION_CACHE_PATH", str(tmp_path / "nutrition_cache.json")
+    )
+    monkeypatch.setattr(
+        helpers, "INGREDIENTS_CACHE_PATH", str(tmp_path / "ingredients_cache.json")
+    )
+    monkeypatch.setattr(helpers, "is_local_nutrition_backend", lambda: False)
+    monkeypatch.setattr(helpers, "get_nutrition_client", lambda: client)
+
+    response = get_nutrition_analysis_by_ingredients("150g potatoes,250g chicken")
+    assert [item["carbohydrates_total_g"] for item in response["items"]] == [31.5, 0.0]
+    assert (
+        helpers.get_nutrition_analysis("100g potatoes")
+        == mock_responses["100g potatoes"]
+    )
+    assert sorted(client.queries) == ["100g chicken", "100g potatoes"]
+
+
+def test_ingredients_with_several_items_are_not_scaled(tmp_path, monkeypatch):
+    queries = []
+
+    def mock_get_nutrition_analysis(query):
+        queries.append(query)
+        return mock_responses[query]
+
+    monkeypatch.setattr(
+        helpers, "INGREDIENTS_CACHE_PATH", str(tmp_path / "ingredients_cache.json")
+    )
+    monkeypatch.setattr(helpers, "get_nutrition_analysis", mock_get_nutrition_analysis)
+
+    response = get_nutrition_analysis_by_ingredients("100g bread with 20g butter")
+    assert response == mock_responses["100g bread with 20g butter"]
+
+    queries.clear()
+    response = get_nutrition_analysis_by_ingredients("150g bread with 20g butter")
+    assert queries == ["100g bread with 20g butter", "150g bread with 20g butter"]
+    assert [item["fat_total_g"] for item in response["items"]] == [5.1, 16.2]
@@ -0,0 +1,122 @@
+import numpy as np
+from datetime import datetime, timedelta
+from injection import Injection
+from glucose import (
+    GlucoseStore,
+    READING_DTYPE,
+    RAW_RESOLUTION,
+    read_glucose_readings_to_import,
+    downsample_readings,
+    get_overlay_rows,
+)
+from injection_table import datetime_to_epoch_minute
+
+
+def create_readings(start: datetime, values: list) -> np.ndarray:
+    readings = np.empty(len(values), dtype=READING_DTYPE)
+    readings["minute"] = [
+        datetime_to_epoch_minute(start + timedelta(minutes=5 * index))
+        for index in range(len(values))
+    ]
+    readings["glucose"] = values
+    return readings
+
+
+def test_read_glucose_readings_from_cgm_exports(tmp_path):
+    path = tmp_path / "readings.csv"
+    path.write_text(
+        "timestamp,glucose\n"
+        "2024-03-01 08:05,120\n"
+        "2024-03-01 08:00,110\n"
+        "2024-03-01 08:00,111\n"
+        "2024-03-01 08:10,High\n"
+        "2024-03-01 08:15,\n"
+        "yesterday,100\n"
+    )
+    readings, rejected_count = read_glucose_readings_to_import(str(path))
+    assert readings["glucose"].tolist() == [110, 120, 400]
+    assert rejected_count == 1
+
+    path.write_text(
+        "FreeStyle LibreLink,Generated on,01-03-2024 09:00,Generated by,user\n"
+        "Device,Serial Number,Device Timestamp,Record Type,Historic Glucose mmol/L\n"
+        "FreeStyle LibreLink,1,01-03-2024 08:00,0,6.1\n"
+        "FreeStyle LibreLink,1,01-03-2024 08:15,1,\n"
+    )
+    readings, rejected_count = read_glucose_readings_to_import(str(path))
+    assert readings["glucose"].tolist() == [110]
+    assert readings["minute"][0] == datetime_to_epoch_minute(datetime(2024, 3, 1, 8))
+    assert rejected_count == 0
+
+
+def test_downsample_readings_keeps_min_max_and_mean():
+    readings = create_readings(datetime(2024, 3, 1, 7, 50), [90, 100, 110, 130, 150])
+    summaries = downsample_readings(readings, 15)
+
+    assert summaries["minute"].tolist() == [
+        datetime_to_epoch_minute(datetime(2024, 3, 1, 7, 45)),
+        datetime_to_epoch_minute(datetime(2024, 3, 1, 8)),
+    ]
+    assert summaries["min"].tolist() == [90, 110]
+    assert summaries["max"].tolist() == [100, 150]
+    assert (summaries["sum"] / summaries["count"]).tolist() == [95, 130]
+
+
+def test_glucose_store_appends_and_merges_readings(tmp_path):
+    store = GlucoseStore(str(tmp_path / "glucose"))
+    day = datetime(2024, 3, 1)
+    readings = create_readings(day, list(range(100, 388)))
+
+    assert store.import_readings(readings[100:]) == 188
+    assert store.import_readings(readings[:150]) == 100
+    assert store.import_readings(readings) == 0
+    assert store.open_readings()["glucose"].tolist() == list(range(100, 388))
+
+    resolution, summaries = store.read_summaries(day, day + timedelta(days=1), 96)
+    assert resolution == 15
+    assert len(summaries) == 96
+    assert summaries["min"][0] == 100 and summaries["max"][0] == 102
+
+    resolution, summaries = store.read_summaries(
+        day + timedelta(hours=1), day + timedelta(hours=2), 96
+    )
+    assert resolution == RAW_RESOLUTION
+    assert summaries["min"].tolist() == list(range(112, 124))
+
+    resolution, summaries = store.read_summaries(day, day + timedelta(days=30), 96)
+    assert resolution == 1440
+    assert summaries["count"].tolist() == [288]
+
+
+def test_overlay_rows_merge_readings_and_injections():
+    readings = create_readings(datetime(2024, 3, 1, 8), [100, 110, 120])
+    rows = get_overlay_rows(
+        downsample_readings(readings, 60),
+        60,
+        [
+            Injection("short", 4, datetime(2024, 3, 1, 8, 10)),
+            Injection("long", 24, datetime(2024, 3, 1, 22, 0)),
+        ],
+    )
+
+    assert rows == [
+        [datetime(2024, 3, 1, 8), 100, 110, 120, "short 4"],
+        [datetime(2024, 3, 1, 22), "", "", "", "long 24"],
+    ]
+
+
+def test_one_minute_readings_are_summarized_when_they_do_not_fit(tmp_path):
+    store = GlucoseStore(str(tmp_path / "glucose"))
+    day = datetime(2024, 3, 1)
+    readings = np.empty(120, dtype=READING_DTYPE)
+    readings["minute"] = datetime_to_epoch_minute(day) + np.arange(120)
+    readings["glucose"] = 100
+    store.import_readings(readings)
+
+    resolution, summaries = store.read_summaries(day, day + timedelta(hours=2), 96)
+    assert resolution == 15
+    assert summaries["count"].tolist() == [15] * 8
+
+    resolution, summaries = store.read_summaries(day, day + timedelta(hours=1), 96)
+    assert resolution == RAW_RESOLUTION
+    assert len(summaries) == 60
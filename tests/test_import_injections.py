@@ -0,0 +1,105 @@
+from datetime import date, datetime
+import helpers
+import session as session_module
+from session import Session
+from bulk_import import validate_injection_rows
+from file_handlers import InjectionsFileHandler, DosesFileHandler
+from injection import Injection
+
+
+def test_validate_injection_rows_sorts_valid_rows_and_counts_rejected():
+    rows, rejected_count = validate_injection_rows(
+        [
+            {"type": "short", "amount": "5", "timestamp": "2024-03-04 12:00"},
+            {"type": "Long", "amount": "24", "timestamp": "2024-03-03 22:00"},
+            {"type": "medium", "amount": "5", "timestamp": "2024-03-04 12:00"},
+            {"type": "short", "amount": "-1", "timestamp": "2024-03-04 12:00"},
+            {"type": "short", "amount": "5", "timestamp": "yesterday"},
+            {"type": "short", "amount": "5"},
+        ]
+    )
+
+    assert rows == [
+        (datetime(2024, 3, 3, 22), "long", 24),
+        (datetime(2024, 3, 4, 12), "short", 5),
+    ]
+    assert rejected_count == 4
+
+
+def test_import_injections_merges_rows_into_csv_file(tmp_path):
+    path = tmp_path / "injections.csv"
+    path.write_text(
+        "type,amount,timestamp\r\n"
+        "short,15,2024-03-03 13:00:00\r\n"
+        "short,10,2024-03-05 08:00:00"
+    )
+    ifh = InjectionsFileHandler(str(path))
+
+    imported_count = ifh.import_injections(
+        [
+            (datetime(2024, 3, 4, 22), "long", 24),
+            (datetime(2024, 3, 5, 8), "short", 10),
+            (datetime(2024, 3, 6, 9), "short", 6),
+        ]
+    )
+
+    assert imported_count == 2
+    assert path.read_bytes().decode() == (
+        "type,amount,timestamp\r\n"
+        "short,15,2024-03-03 13:00:00\r\n"
+        "long,24,2024-03-04 22:00:00\r\n"
+        "short,10,2024-03-05 08:00:00\r\n"
+        "short,6,2024-03-06 09:00:00\r\n"
+    )
+    assert ifh.read_day_index() == ifh.rebuild_day_index()
+    assert list(ifh.iter_injections(date(2024, 3, 6), date(2024, 3, 6))) == [
+        Injection("short", 6, datetime(2024, 3, 6, 9))
+    ]
+
+
+def test_import_injections_skips_repeated_rows_of_the_batch(tmp_path):
+    path = tmp_path / "injections.csv"
+    ifh = InjectionsFileHandler(str(path))
+
+    imported_count = ifh.import_injections(
+        [
+            (datetime(2024, 3, 4, 8), "short", 5),
+            (datetime(2024, 3, 4, 8), "short", 5),
+            (datetime(2024, 3, 4, 22), "long", 24),
+        ]
+    )
+
+    assert imported_count == 2
+    assert list(ifh.iter_injections(date(2024, 3, 4), date(2024, 3, 4))) == [
+        Injection("short", 5, datetime(2024, 3, 4, 8)),
+        Injection("long", 24, datetime(2024, 3, 4, 22)),
+    ]
+
+
+def test_import_reports_file_duplicates_and_saved_rows_apart(
+    tmp_path, monkeypatch, capsys
+):
+    handler = InjectionsFileHandler(str(tmp_path / "injections.csv"))
+    handler.save_new_injection(Injection("long", 24, datetime(2024, 3, 3, 22)))
+    monkeypatch.setattr(session_module, "get_injections_storage", lambda: handler)
+    monkeypatch.setattr(
+        session_module,
+        "get_doses_storage",
+        lambda: DosesFileHandler(str(tmp_path / "doses.csv")),
+    )
+    session = Session()
+    monkeypatch.setattr(helpers, "get_session", lambda: session)
+    path = tmp_path / "import.csv"
+    path.write_text(
+        "type,amount,timestamp\n"
+        "long,24,2024-03-03 22:00\n"
+        "short,5,2024-03-04 08:00\n"
+        "short,5,2024-03-04 08:00\n"
+    )
+
+    helpers.init_import_injections(str(path))
+
+    output = capsys.readouterr().out
+    assert "Imported 1 injections" in output
+    assert "Skipped 1 duplicate injections in the file." in output
+    assert "Skipped 1 already saved injections." in output
@@ -0,0 +1,80 @@
+import os
+import sys
+import subprocess
+import pytest
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME_BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", 150))
+# Budget of the commands that need `requests` or `numpy`.
+HEAVY_IMPORT_TIME_BUDGET_MS = int(os.environ.get("HEAVY_IMPORT_TIME_BUDGET_MS", 400))
+HEAVY_MODULES = ["requests", "numpy", "sqlite3", "simple_term_menu"]
+
+
+def get_imported_modules(
+    arguments: list, stdin: str, cwd: str, env: dict | None = None
+) -> dict:
+    """
+    Runs the Python interpreter with `-X importtime` and returns the self import time of each imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env={**os.environ, "TERM": "dumb", "STORAGE_BACKEND": "csv", **(env or {})},
+    )
+    imported_modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        imported_modules[name.strip()] = int(self_time)
+    return imported_modules
+
+
+@pytest.mark.parametrize(
+    "command, stdin, env, heavy_modules, budget_ms",
+    [
+        (["doses"], "", {}, set(), IMPORT_TIME_BUDGET_MS),
+        (["view"], "", {}, set(), IMPORT_TIME_BUDGET_MS),
+        (["add"], "short\n5\n", {}, set(), IMPORT_TIME_BUDGET_MS),
+        (["update", "short"], "2\n10\n", {}, set(), IMPORT_TIME_BUDGET_MS),
+        (["import", "injections.csv"], "", {}, set(), IMPORT_TIME_BUDGET_MS),
+        (["-h"], "", {}, set(), IMPORT_TIME_BUDGET_MS),
+        (["menu"], "", {}, {"simple_term_menu"}, IMPORT_TIME_BUDGET_MS),
+        (["report"], "", {}, {"numpy"}, HEAVY_IMPORT_TIME_BUDGET_MS),
+        (
+            ["calculate"],
+            "100g potatoes\n",
+            {"NUTRITION_BACKEND": "local"},
+            {"requests", "sqlite3"},
+            HEAVY_IMPORT_TIME_BUDGET_MS,
+        ),
+    ],
+)
+def test_command_startup_stays_within_import_time_budget(
+    tmp_path, command, stdin, env, heavy_modules, budget_ms
+):
+    (tmp_path / "files").mkdir()
+    (tmp_path / "injections.csv").write_text(
+        "type,amount,timestamp\nshort,4,2024-03-01 08:00:00\n"
+    )
+    interpreter_modules = get_imported_modules(["-c", "pass"], "", str(tmp_path))
+    command_modules = get_imported_modules(
+        [os.path.join(REPOSITORY_PATH, "main.py"), *command], stdin, str(tmp_path), env
+    )
+
+    assert "helpers" in command_modules
+    for module in HEAVY_MODULES:
+        assert (module in command_modules) == (module in heavy_modules), module
+
+    import_time_ms = (
+        sum(
+            self_time
+            for module, self_time in command_modules.items()
+            if module not in interpreter_modules
+        )
+        / 1000
+    )
+    assert import_time_ms < budget_ms
@@ -0,0 +1,29 @@
+from datetime import date, datetime
+from file_handlers import InjectionsFileHandler
+from injection_table import InjectionTable
+from injection import Injection
+
+
+def test_injection_table_stores_injections_as_columns():
+    injections = [
+        Injection("short", 5, datetime(2024, 3, 4, 8, 30)),
+        Injection("long", 24, datetime(2024, 3, 4, 22)),
+    ]
+    table = InjectionTable.from_injections(injections)
+
+    assert list(table.minutes) == [28492350, 28493160]
+    assert list(table.amounts) == [5, 24]
+    assert list(table.types) == [0, 1]
+    assert list(table) == injections
+    assert table.nbytes() == 14
+
+
+def test_read_injection_table_returns_same_injections_as_iter_injections(tmp_path):
+    ifh = InjectionsFileHandler(str(tmp_path / "injections.csv"))
+    for day, hour in [(1, 8), (2, 8), (2, 20), (3, 8)]:
+        ifh.save_new_injection(Injection("short", hour, datetime(2024, 3, day, hour)))
+
+    start, end = date(2024, 3, 2), date(2024, 3, 3)
+    assert list(ifh.read_injection_table(start, end)) == list(
+        ifh.iter_injections(start, end)
+    )
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from file_handlers import InjectionsFileHandler
+from injection import Injection
+
+
+def test_iter_injections_returns_injections_in_date_range(tmp_path):
+    ifh = InjectionsFileHandler(str(tmp_path / "injections.csv"))
+    for day, hour in [(1, 8), (1, 20), (2, 8), (4, 8), (4, 12), (6, 8)]:
+        ifh.save_new_injection(Injection("short", hour, datetime(2024, 3, day, hour)))
+
+    assert ifh.read_day_index()[0] == ("2024-03-01", len("type,amount,timestamp\r\n"))
+    assert list(ifh.iter_injections(date(2024, 3, 2), date(2024, 3, 4))) == [
+        Injection("short", 8, datetime(2024, 3, 2, 8)),
+        Injection("short", 8, datetime(2024, 3, 4, 8)),
+        Injection("short", 12, datetime(2024, 3, 4, 12)),
+    ]
+    assert list(ifh.iter_injections(date(2024, 3, 7), date(2024, 3, 9))) == []
+
+
+def test_iter_injections_rebuilds_missing_day_index(tmp_path):
+    path = tmp_path / "injections.csv"
+    path.write_text(
+        "type,amount,timestamp\r\n"
+        "short,15,2024-03-03 13:29:00\r\n"
+        "long,24,2024-03-04 22:00:00\r\n"
+    )
+    ifh = InjectionsFileHandler(str(path))
+
+    assert list(ifh.iter_injections(date(2024, 3, 4), date(2024, 3, 4))) == [
+        Injection("long", 24, datetime(2024, 3, 4, 22))
+    ]
+    assert ifh.read_day_index() == [("2024-03-03", 23), ("2024-03-04", 53)]
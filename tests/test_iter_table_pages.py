@@ -0,0 +1,36 @@
+from datetime import datetime
+from tabulate import tabulate
+from table_renderer import iter_table_pages
+from constants import INJECTIONS_TABLE_HEADERS, TABLE_STYLE
+
+rows = [
+    ["short", 4, datetime(2024, 3, 1, 8, 0)],
+    ["long", 24, datetime(2024, 3, 1, 22, 0)],
+    ["short", 12, datetime(2024, 3, 2, 13, 30)],
+]
+
+
+def test_single_page_matches_tabulate():
+    pages = list(iter_table_pages(rows, INJECTIONS_TABLE_HEADERS, 50))
+    assert len(pages) == 1
+    assert "\n".join(pages[0]) == tabulate(rows, INJECTIONS_TABLE_HEADERS, TABLE_STYLE)
+
+
+def test_pages_share_column_widths():
+    pages = list(iter_table_pages(iter(rows), INJECTIONS_TABLE_HEADERS, 2))
+    assert len(pages) == 2
+    assert "\n".join(pages[1]) == tabulate(
+        rows[2:], INJECTIONS_TABLE_HEADERS, TABLE_STYLE
+    )
+    assert pages[0][0] == pages[1][0]
+
+
+def test_rows_after_the_sample_are_truncated():
+    long_rows = [["short", 4, "x"], ["short", 4, "y" * 30]]
+    pages = list(iter_table_pages(long_rows, ["Type", "Amount", "Note"], 50, 1))
+    assert pages[0][-2].endswith("yyyy… │")
+    assert len(pages[0][-2]) == len(pages[0][0])
+
+
+def test_no_rows_yields_no_pages():
+    assert list(iter_table_pages([], INJECTIONS_TABLE_HEADERS, 50)) == []
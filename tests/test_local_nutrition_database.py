@@ -0,0 +1,33 @@
+from nutrition_db import LocalNutritionDatabase
+
+
+def test_local_nutrition_database_returns_scaled_items(tmp_path):
+    csv_path = tmp_path / "foods.csv"
+    csv_path.write_text(
+        "name,calories,fat_total_g,carbohydrates_total_g,protein_g\n"
+        "potato,87,0.1,20.1,1.9\n"
+        "Chicken Breast,165,3.6,0,31\n"
+    )
+    database = LocalNutritionDatabase(str(tmp_path / "foods.db"), str(csv_path))
+
+    assert database.get_nutrition("150g potatoes, 200g chicken  breast, 1 unicorn") == {
+        "items": [
+            {
+                "name": "potatoes",
+                "serving_size_g": 150.0,
+                "calories": 130.5,
+                "fat_total_g": 0.2,
+                "carbohydrates_total_g": 30.2,
+                "protein_g": 2.8,
+            },
+            {
+                "name": "chicken breast",
+                "serving_size_g": 200.0,
+                "calories": 330.0,
+                "fat_total_g": 7.2,
+                "carbohydrates_total_g": 0.0,
+                "protein_g": 62.0,
+            },
+        ]
+    }
+    database.close()
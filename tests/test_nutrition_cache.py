@@ -0,0 +1,49 @@
+import nutrition_cache
+from nutrition_cache import NutritionCache
+
+mock_response = {
+    "items": [
+        {
+            "name": "potatoes",
+            "calories": 92.9,
+            "fat_total_g": 0.1,
+            "protein_g": 2.5,
+            "carbohydrates_total_g": 21.0,
+        }
+    ]
+}
+
+
+def test_nutrition_cache_returns_response_for_normalized_query(tmp_path):
+    cache = NutritionCache(str(tmp_path / "cache.json"), 60, 10)
+    cache.set("150g Potatoes", mock_response)
+
+    assert cache.get("  150g   potatoes ") == mock_response
+    assert cache.get("200g potatoes") == None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.flush()
+    reloaded_cache = NutritionCache(str(tmp_path / "cache.json"), 60, 10)
+    assert reloaded_cache.get("150g potatoes") == mock_response
+    assert (reloaded_cache.hits, reloaded_cache.misses) == (2, 1)
+
+
+def test_nutrition_cache_expires_entries_after_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(nutrition_cache.time, "time", lambda: 1000.0)
+    cache = NutritionCache(str(tmp_path / "cache.json"), 60, 10)
+    cache.set("150g potatoes", mock_response)
+
+    monkeypatch.setattr(nutrition_cache.time, "time", lambda: 1061.0)
+    assert cache.get("150g potatoes") == None
+
+
+def test_nutrition_cache_evicts_least_recently_used_entry(tmp_path):
+    cache = NutritionCache(str(tmp_path / "cache.json"), 60, 2)
+    cache.set("potatoes", mock_response)
+    cache.set("rice", mock_response)
+    cache.get("potatoes")
+    cache.set("chicken", mock_response)
+
+    assert cache.get("rice") == None
+    assert cache.get("potatoes") == mock_response
+    assert cache.get("chicken") == mock_response
@@ -0,0 +1,59 @@
+import pytest
+import requests
+import nutrition_client
+from nutrition_client import NutritionClient, NutritionAPIError
+
+
+class MockResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def test_nutrition_client_retries_retryable_failures(monkeypatch):
+    client = NutritionClient("key", max_retries=2)
+    responses = [
+        requests.ConnectionError(),
+        MockResponse(503, {}),
+        MockResponse(200, {"items": []}),
+    ]
+
+    def mock_get(*args, **kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(client.session, "get", mock_get)
+    monkeypatch.setattr(nutrition_client.time, "sleep", lambda seconds: None)
+
+    assert client.get_nutrition("150g potatoes") == {"items": []}
+
+
+def test_nutrition_client_raises_nutrition_api_error(monkeypatch):
+    client = NutritionClient("key", max_retries=1)
+    calls = []
+
+    def mock_get(*args, **kwargs):
+        calls.append(kwargs["timeout"])
+        return MockResponse(401, {"message": "Invalid API Key."})
+
+    monkeypatch.setattr(client.session, "get", mock_get)
+
+    with pytest.raises(NutritionAPIError) as e:
+        client.get_nutrition("150g potatoes")
+    assert e.value.status_code == 401
+    assert calls == [client.timeout]
+
+    def mock_timeout(*args, **kwargs):
+        raise requests.Timeout()
+
+    monkeypatch.setattr(client.session, "get", mock_timeout)
+    monkeypatch.setattr(nutrition_client.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(NutritionAPIError) as e:
+        client.get_nutrition("150g potatoes")
+    assert e.value.status_code == None
@@ -0,0 +1,69 @@
+from nutrition_result import NutritionResult, to_nutrition_result
+from helpers import get_formatted_food_list, get_meal_nutrients_row
+from dose import Dose
+
+mock_response = {
+    "items": [
+        {
+            "name": "potatoes",
+            "calories": 92.9,
+            "fat_total_g": 0.1,
+            "protein_g": 2.5,
+            "carbohydrates_total_g": 21.0,
+            "serving_size_g": 100.0,
+        },
+        {
+            "name": "orange juice",
+            "calories": 46.4,
+            "fat_total_g": 0.1,
+            "protein_g": 0.7,
+            "carbohydrates_total_g": 11.2,
+            "serving_size_g": 100.0,
+        },
+    ]
+}
+
+
+def test_nutrition_result_parses_the_response_into_columns():
+    result = NutritionResult.from_response(mock_response)
+
+    assert len(result) == 2
+    assert result.names == ("potatoes", "orange juice")
+    assert result.columns[0] == (92.9, 46.4)
+    assert result.get_total("carbohydrates_total_g") == 32.2
+    assert result.get_rounded_totals() == {
+        "calories": 139.3,
+        "fat_total_g": 0.2,
+        "carbohydrates_total_g": 32.2,
+        "protein_g": 3.2,
+    }
+    assert result.get_items()[1] == {
+        "name": "orange juice",
+        "calories": 46.4,
+        "fat_total_g": 0.1,
+        "carbohydrates_total_g": 11.2,
+        "protein_g": 0.7,
+    }
+    assert to_nutrition_result(result) is result
+
+
+def test_nutrition_result_is_shared_by_the_pipeline():
+    result = NutritionResult.from_response(mock_response)
+
+    assert get_formatted_food_list(result) == get_formatted_food_list(mock_response)
+    assert get_meal_nutrients_row("meal", result, Dose("short", 1, 10)) == [
+        "meal",
+        139.3,
+        0.2,
+        32.2,
+        3.2,
+        3,
+    ]
+
+
+def test_empty_response_has_zero_totals():
+    result = NutritionResult.from_response({"items": []})
+
+    assert len(result) == 0
+    assert result.get_total("calories") == 0
+    assert get_formatted_food_list(result) is None
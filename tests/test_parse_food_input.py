@@ -0,0 +1,24 @@
+from ingredients import parse_food_input
+
+
+def test_parse_food_input_returns_ingredient_and_quantity_pairs():
+    assert parse_food_input("150g Potatoes, 250 g cooked chicken") == [
+        ("potatoes", 150.0),
+        ("cooked chicken", 250.0),
+    ]
+
+    assert parse_food_input("1,5kg rice and 200g chicken, an apple") == [
+        ("rice", 1500.0),
+        ("chicken", 200.0),
+        ("an apple", None),
+    ]
+
+    assert parse_food_input("200g mac and cheese, fish and chips") == [
+        ("mac and cheese", 200.0),
+        ("fish and chips", None),
+    ]
+
+    assert parse_food_input("150g potatoes,250g chicken") == [
+        ("potatoes", 150.0),
+        ("chicken", 250.0),
+    ]
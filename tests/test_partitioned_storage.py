@@ -0,0 +1,131 @@
+import os
+from datetime import date, datetime
+import partitioned_storage
+import file_handlers
+from partitioned_storage import PartitionedInjectionsHandler, partition_injections_csv
+from file_handlers import InjectionsFileHandler
+from injection import Injection
+
+
+def create_handler(tmp_path, monkeypatch, today: date) -> PartitionedInjectionsHandler:
+    monkeypatch.setattr(partitioned_storage, "get_current_date", lambda: today)
+    monkeypatch.setattr(file_handlers, "get_current_date", lambda: today)
+    return PartitionedInjectionsHandler(str(tmp_path / "injections"))
+
+
+def test_closed_months_are_compressed(tmp_path, monkeypatch):
+    handler = create_handler(tmp_path, monkeypatch, date(2024, 3, 31))
+    handler.save_new_injection(Injection("short", 4, datetime(2024, 3, 31, 8)))
+    assert sorted(os.listdir(handler.directory)) == [
+        "2024-03.csv",
+        "2024-03.csv.lock",
+        "2024-03_daily.csv",
+        "2024-03_index.csv",
+        "manifest.json",
+        "manifest.json.lock",
+    ]
+
+    handler = create_handler(tmp_path, monkeypatch, date(2024, 4, 1))
+    handler.save_new_injection(Injection("long", 24, datetime(2024, 4, 1, 22)))
+
+    partitions = handler.read_manifest()
+    assert partitions["2024-03"] == {
+        "file": "2024-03.csv.gz",
+        "compressed": True,
+        "rows": 1,
+        "daily_totals": [["2024-03-31", 1, 4, 0, 0]],
+    }
+    assert partitions["2024-04"] == {"file": "2024-04.csv", "compressed": False}
+    assert sorted(os.listdir(handler.directory))[:2] == [
+        "2024-03.csv.gz",
+        "2024-04.csv",
+    ]
+    assert handler.read_todays_injections() == [
+        Injection("long", 24, datetime(2024, 4, 1, 22))
+    ]
+    assert list(handler.iter_injections(date(2024, 3, 1), date(2024, 4, 30))) == [
+        Injection("short", 4, datetime(2024, 3, 31, 8)),
+        Injection("long", 24, datetime(2024, 4, 1, 22)),
+    ]
+    assert handler.read_daily_totals(date(2024, 3, 1), date(2024, 4, 30)) == [
+        ("2024-03-31", 1, 4, 0, 0),
+        ("2024-04-01", 0, 0, 1, 24),
+    ]
+
+
+def test_range_reads_open_only_overlapping_partitions(tmp_path, monkeypatch):
+    handler = create_handler(tmp_path, monkeypatch, date(2024, 4, 2))
+    handler.import_injections(
+        [
+            (datetime(2024, 1, 5, 8), "short", 3),
+            (datetime(2024, 2, 5, 8), "short", 5),
+            (datetime(2024, 4, 2, 8), "short", 7),
+        ]
+    )
+    opened_months = []
+    read_compressed_lines = handler.read_compressed_lines
+    monkeypatch.setattr(
+        handler,
+        "read_compressed_lines",
+        lambda month: opened_months.append(month) or read_compressed_lines(month),
+    )
+
+    injections = list(handler.iter_injections(date(2024, 2, 1), date(2024, 2, 29)))
+    assert injections == [Injection("short", 5, datetime(2024, 2, 5, 8))]
+    assert opened_months == ["2024-02"]
+
+
+def test_import_into_compressed_month(tmp_path, monkeypatch):
+    handler = create_handler(tmp_path, monkeypatch, date(2024, 4, 2))
+    handler.import_injections([(datetime(2024, 2, 5, 8), "short", 5)])
+    assert (
+        handler.import_injections(
+            [
+                (datetime(2024, 2, 5, 8), "short", 5),
+                (datetime(2024, 2, 6, 8), "short", 6),
+            ]
+        )
+        == 1
+    )
+
+    partition = handler.read_manifest()["2024-02"]
+    assert partition["compressed"]
+    assert partition["rows"] == 2
+
+
+def test_partition_injections_csv(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "injections.csv")
+    ifh = InjectionsFileHandler(csv_path)
+    ifh.save_new_injection(Injection("short", 4, datetime(2024, 2, 1, 8)))
+    ifh.save_new_injection(Injection("short", 6, datetime(2024, 3, 1, 8)))
+    monkeypatch.setattr(
+        partitioned_storage, "get_current_date", lambda: date(2024, 3, 1)
+    )
+
+    directory = str(tmp_path / "injections")
+    assert partition_injections_csv(csv_path, directory) == 2
+    assert partition_injections_csv(csv_path, directory) == 0
+    assert list(PartitionedInjectionsHandler(directory).read_manifest()) == [
+        "2024-02",
+        "2024-03",
+    ]
+
+
+def test_range_read_follows_partitions_compressed_during_the_read(
+    tmp_path, monkeypatch
+):
+    handler = create_handler(tmp_path, monkeypatch, date(2024, 3, 31))
+    handler.import_injections(
+        [
+            (datetime(2024, 2, 5, 8), "short", 5),
+            (datetime(2024, 3, 5, 8), "short", 6),
+        ]
+    )
+    injections = handler.iter_injections(date(2024, 2, 1), date(2024, 3, 31))
+    assert next(injections) == Injection("short", 5, datetime(2024, 2, 5, 8))
+
+    handler = create_handler(tmp_path, monkeypatch, date(2024, 4, 1))
+    handler.save_new_injection(Injection("long", 24, datetime(2024, 4, 1, 22)))
+    assert handler.read_manifest()["2024-03"]["compressed"]
+
+    assert list(injections) == [Injection("short", 6, datetime(2024, 3, 5, 8))]
@@ -0,0 +1,42 @@
+import json
+import time
+from profiling import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.span("csv read"):
+        pass
+    assert profiler.phases == {}
+
+
+def test_nested_spans_are_exclusive():
+    profiler = Profiler()
+    profiler.start()
+    with profiler.span("csv write"):
+        with profiler.span("csv read"):
+            time.sleep(0.02)
+    calls, seconds = profiler.phases["csv write"]
+    assert calls == 1
+    assert seconds < 0.01
+    assert profiler.phases["csv read"][1] >= 0.02
+
+
+def test_breakdown_ends_with_local_overhead(tmp_path):
+    profiler = Profiler()
+    profiler.start()
+    with profiler.span("api call"):
+        time.sleep(0.01)
+    with profiler.span("api call"):
+        pass
+    breakdown = profiler.get_breakdown()
+    assert [row[0] for row in breakdown] == ["api call", "local overhead"]
+    assert breakdown[0][1] == 2
+
+    path = tmp_path / "metrics.ndjson"
+    profiler.append_metrics(str(path), "calculate")
+    profiler.append_metrics(str(path), "calculate")
+    metrics = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(metrics) == 4
+    assert metrics[0]["command"] == "calculate"
+    assert metrics[0]["phase"] == "api call"
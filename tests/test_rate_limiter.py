@@ -0,0 +1,147 @@
+import threading
+import pytest
+import rate_limiter
+import nutrition_client
+from rate_limiter import SharedRateLimiter, QuotaExceededError
+from nutrition_client import NutritionClient, NutritionAPIError
+
+
+class MockResponse:
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return self.body
+
+
+def get_month_usage(limiter: SharedRateLimiter) -> dict:
+    return next(iter(limiter.get_usage().values()))
+
+
+def test_rate_limiter_waits_for_tokens(tmp_path, monkeypatch):
+    now = [1000.0]
+    sleeps = []
+
+    def mock_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: now[0])
+    monkeypatch.setattr(rate_limiter.time, "sleep", mock_sleep)
+    limiter = SharedRateLimiter(str(tmp_path / "usage.json"), 2, 2)
+
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.5]
+    assert sleeps == [0.5]
+
+    limiter.pause(3)
+    assert limiter.acquire() == 3
+    assert get_month_usage(limiter) == {
+        "requests": 4,
+        "rate_limited": 1,
+        "coalesced": 0,
+        "waited_s": 3.5,
+    }
+
+
+def test_rate_limiter_monthly_quota_is_shared(tmp_path):
+    path = str(tmp_path / "usage.json")
+    SharedRateLimiter(path, 100, 10, monthly_quota=2).acquire()
+    limiter = SharedRateLimiter(path, 100, 10, monthly_quota=2)
+    limiter.acquire()
+
+    with pytest.raises(QuotaExceededError):
+        limiter.acquire()
+
+    client = NutritionClient("key", rate_limiter=limiter)
+    with pytest.raises(NutritionAPIError):
+        client.get_nutrition("150g potatoes")
+
+
+def test_rate_limited_response_pauses_the_limiter(tmp_path, monkeypatch):
+    limiter = SharedRateLimiter(str(tmp_path / "usage.json"), 100, 10)
+    client = NutritionClient("key", max_retries=1, rate_limiter=limiter)
+    responses = [
+        MockResponse(429, {}, {"Retry-After": "0.01"}),
+        MockResponse(200, {"items": []}),
+    ]
+    monkeypatch.setattr(client.session, "get", lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr(nutrition_client.time, "sleep", lambda seconds: None)
+
+    assert client.get_nutrition("150g potatoes") == {"items": []}
+    assert get_month_usage(limiter)["rate_limited"] == 1
+    assert get_month_usage(limiter)["requests"] == 2
+
+
+def test_concurrent_identical_queries_share_one_request(tmp_path, monkeypatch):
+    limiter = SharedRateLimiter(str(tmp_path / "usage.json"), 100, 10)
+    client = NutritionClient("key", rate_limiter=limiter)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def mock_get(*args, **kwargs):
+        calls.append(kwargs["params"])
+        started.set()
+        release.wait(5)
+        return MockResponse(200, {"items": []})
+
+    monkeypatch.setattr(client.session, "get", mock_get)
+    results = []
+    leader = threading.Thread(
+        target=lambda: results.append(client.get_nutrition("150g potatoes"))
+    )
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(
+            target=lambda: results.append(client.get_nutrition(" 150g  Potatoes"))
+        )
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    while get_month_usage(limiter)["coalesced"] < 3:
+        pass
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"items": []}] * 4
+    assert client.in_flight_requests == {}
+
+
+def test_coalesced_queries_get_the_leaders_unexpected_error(tmp_path, monkeypatch):
+    limiter = SharedRateLimiter(str(tmp_path / "usage.json"), 100, 10)
+    client = NutritionClient("key", rate_limiter=limiter)
+    started, release = threading.Event(), threading.Event()
+
+    def mock_get(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(client.session, "get", mock_get)
+    errors = []
+
+    def get_nutrition():
+        try:
+            client.get_nutrition("150g potatoes")
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=get_nutrition)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=get_nutrition)
+    follower.start()
+    while get_month_usage(limiter)["coalesced"] < 1:
+        pass
+    release.set()
+    leader.join()
+    follower.join(5)
+
+    assert not follower.is_alive()
+    assert [str(e) for e in errors] == ["unexpected", "unexpected"]
+    assert client.in_flight_requests == {}
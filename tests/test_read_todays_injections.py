@@ -0,0 +1,36 @@
+from datetime import date, datetime
+import file_handlers
+from file_handlers import InjectionsFileHandler
+from injection import Injection
+
+
+def test_read_todays_injections_returns_only_todays_injections(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_handlers, "get_current_date", lambda: date(2024, 3, 4))
+    path = tmp_path / "injections.csv"
+    path.write_text(
+        "type,amount,timestamp\r\n"
+        "short,15,2024-03-03 13:29:00\r\n"
+        "long,24,2024-03-03 22:00:00\r\n"
+        "short,10,2024-03-04 11:14:00\r\n"
+        "short,5,2024-03-04 15:37:00\r\n"
+    )
+
+    assert InjectionsFileHandler(str(path)).read_todays_injections() == [
+        Injection("short", 10, datetime(2024, 3, 4, 11, 14)),
+        Injection("short", 5, datetime(2024, 3, 4, 15, 37)),
+    ]
+
+
+def test_read_todays_injections_returns_none_when_nothing_saved_today(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(file_handlers, "get_current_date", lambda: date(2024, 3, 5))
+    path = tmp_path / "injections.csv"
+    path.write_text("type,amount,timestamp\r\nshort,15,2024-03-03 13:29:00")
+
+    assert InjectionsFileHandler(str(path)).read_todays_injections() == None
+
+    header_only_path = tmp_path / "empty.csv"
+    header_only_path.write_text("type,amount,timestamp\r\n")
+
+    assert InjectionsFileHandler(str(header_only_path)).read_todays_injections() == None
@@ -0,0 +1,53 @@
+import numpy as np
+from datetime import date, datetime
+from injection import Injection
+from injection_table import InjectionTable
+from report import (
+    get_daily_totals_from_rollup,
+    get_rolling_averages,
+    get_hourly_histogram,
+)
+
+table = InjectionTable.from_injections(
+    [
+        Injection("short", 4, datetime(2024, 3, 1, 8)),
+        Injection("short", 6, datetime(2024, 3, 1, 13)),
+        Injection("long", 24, datetime(2024, 3, 1, 22)),
+        Injection("short", 5, datetime(2024, 3, 3, 8)),
+        Injection("long", 22, datetime(2024, 3, 3, 22)),
+    ]
+)
+
+
+def test_get_daily_totals_from_rollup_fills_every_day_of_the_range():
+    daily_totals = [
+        ("2024-02-29", 1, 3, 0, 0),
+        ("2024-03-01", 2, 10, 1, 24),
+        ("2024-03-03", 1, 5, 1, 22),
+    ]
+
+    assert get_daily_totals_from_rollup(
+        daily_totals, date(2024, 3, 1), date(2024, 3, 3)
+    ).tolist() == [
+        [10, 24],
+        [0, 0],
+        [5, 22],
+    ]
+
+
+def test_get_rolling_averages_averages_available_days():
+    daily_totals = np.array([[10.0, 24.0], [0.0, 0.0], [5.0, 22.0]])
+
+    assert get_rolling_averages(daily_totals, 2).tolist() == [
+        [10.0, 24.0],
+        [5.0, 12.0],
+        [2.5, 11.0],
+    ]
+
+
+def test_get_hourly_histogram_counts_short_injections_by_hour():
+    histogram = get_hourly_histogram(table).tolist()
+
+    assert histogram[8] == 2
+    assert histogram[13] == 1
+    assert sum(histogram) == 3
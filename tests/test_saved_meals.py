@@ -0,0 +1,124 @@
+import time
+import pytest
+import helpers
+from saved_meals import SavedMeals
+from dose import Dose
+
+response = {
+    "items": [
+        {
+            "name": "rice",
+            "calories": 260.0,
+            "fat_total_g": 0.6,
+            "carbohydrates_total_g": 56.2,
+            "protein_g": 5.4,
+            "serving_size_g": 200.0,
+        },
+        {
+            "name": "chicken",
+            "calories": 330.0,
+            "fat_total_g": 7.2,
+            "carbohydrates_total_g": 0.0,
+            "protein_g": 62.0,
+            "serving_size_g": 200.0,
+        },
+    ]
+}
+
+
+def test_save_meal_stores_items_and_totals(tmp_path):
+    saved_meals = SavedMeals(str(tmp_path / "meals.json"))
+    saved_meals.save_meal("Chicken  Rice", "200g rice, 200g chicken", response)
+
+    meal = SavedMeals(str(tmp_path / "meals.json")).get_meal("chicken rice")
+    assert meal["food"] == "200g rice, 200g chicken"
+    assert meal["items"][1] == {
+        "name": "chicken",
+        "calories": 330.0,
+        "fat_total_g": 7.2,
+        "carbohydrates_total_g": 0.0,
+        "protein_g": 62.0,
+    }
+    assert meal["total"] == {
+        "calories": 590.0,
+        "fat_total_g": 7.8,
+        "carbohydrates_total_g": 56.2,
+        "protein_g": 67.4,
+    }
+    assert saved_meals.get_meal("dinner") is None
+
+    with pytest.raises(ValueError):
+        saved_meals.save_meal(" ", "200g rice", response)
+    with pytest.raises(ValueError):
+        saved_meals.save_meal("dinner", "unknown", {"items": []})
+
+    assert saved_meals.delete_meal("chicken rice")
+    assert not saved_meals.delete_meal("chicken rice")
+
+
+def test_stale_meals_are_refreshed(tmp_path, monkeypatch):
+    saved_meals = SavedMeals(str(tmp_path / "meals.json"))
+    monkeypatch.setattr(helpers, "get_saved_meals", lambda: saved_meals)
+    saved_meals.save_meal("lunch", "200g rice", {"items": response["items"][:1]})
+    saved_meals.save_meal("dinner", "200g chicken", {"items": response["items"][1:]})
+    monkeypatch.setattr(time, "time", lambda: 10**10)
+
+    assert saved_meals.get_stale_meals(0) == []
+    assert saved_meals.get_stale_meals(60) == ["lunch", "dinner"]
+
+    monkeypatch.setattr(
+        helpers, "get_nutrition_analysis_by_ingredients", lambda food: response
+    )
+    thread = helpers.start_refreshing_stale_saved_meals()
+    thread.join()
+
+    assert saved_meals.get_meal("lunch")["total"]["calories"] == 590.0
+    assert saved_meals.get_stale_meals(60) == []
+
+
+def test_saved_meal_calculation_skips_the_api(tmp_path, monkeypatch, capsys):
+    saved_meals = SavedMeals(str(tmp_path / "meals.json"))
+    saved_meals.save_meal("lunch", "200g rice, 200g chicken", response)
+    monkeypatch.setattr(helpers, "get_saved_meals", lambda: saved_meals)
+    monkeypatch.setattr(helpers, "get_short_dose_data", lambda: Dose("short", 1, 10))
+
+    def fail(food):
+        raise AssertionError("the API was called")
+
+    monkeypatch.setattr(helpers, "get_nutrition_analysis_by_ingredients", fail)
+    monkeypatch.setattr(
+        helpers,
+        "start_refreshing_stale_saved_meals",
+        lambda: pytest.fail("the saved meals were refreshed"),
+    )
+
+    helpers.init_saved_meal_calculation("Lunch")
+    assert "Inject this amount of insulin: 6" in capsys.readouterr().out
+    assert helpers.get_saved_meal_food_list(saved_meals.get_meal("lunch")) == [
+        ["Rice", "260.0", "0.6", "56.2", "5.4"],
+        ["Chicken", "330.0", "7.2", "0.0", "62.0"],
+        ["Total", "590.0", "7.8", "56.2", "67.4"],
+    ]
+
+
+def test_refresh_continues_after_a_failed_meal(tmp_path, monkeypatch, capsys):
+    saved_meals = SavedMeals(str(tmp_path / "meals.json"))
+    monkeypatch.setattr(helpers, "get_saved_meals", lambda: saved_meals)
+    saved_meals.save_meal("lunch", "200g rice", {"items": response["items"][:1]})
+    saved_meals.save_meal("dinner", "200g chicken", {"items": response["items"][1:]})
+
+    def get_nutrition_analysis_by_ingredients(food):
+        if food == "200g rice":
+            raise KeyError("items")
+        return response
+
+    monkeypatch.setattr(
+        helpers,
+        "get_nutrition_analysis_by_ingredients",
+        get_nutrition_analysis_by_ingredients,
+    )
+    helpers.refresh_saved_meals(["lunch", "dinner"])
+
+    assert saved_meals.get_meal("lunch")["total"]["calories"] == 260.0
+    assert saved_meals.get_meal("dinner")["total"]["calories"] == 590.0
+    assert "Could not refresh the saved meal 'lunch'" in capsys.readouterr().err
@@ -0,0 +1,27 @@
+from ingredients import scale_nutrients, get_nutrients_per_100g
+
+
+def test_scale_nutrients_scales_numeric_values_only():
+    item = {
+        "name": "potatoes",
+        "calories": 92.9,
+        "serving_size_g": 100.0,
+        "carbohydrates_total_g": 21.0,
+    }
+
+    assert scale_nutrients(item, 1.5) == {
+        "name": "potatoes",
+        "calories": 139.4,
+        "serving_size_g": 150.0,
+        "carbohydrates_total_g": 31.5,
+    }
+
+
+def test_get_nutrients_per_100g_uses_serving_size():
+    item = {"name": "rice", "calories": 260.0, "serving_size_g": 200.0}
+
+    assert get_nutrients_per_100g(item) == {
+        "name": "rice",
+        "calories": 130.0,
+        "serving_size_g": 100.0,
+    }
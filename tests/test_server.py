@@ -0,0 +1,150 @@
+import json
+import asyncio
+import helpers
+import session as session_module
+from session import Session
+from server import DiabetrServer
+from file_handlers import InjectionsFileHandler, DosesFileHandler
+from sqlite_storage import InjectionsDatabaseHandler, DosesDatabaseHandler
+from tests.test_get_nutrition_analysis_by_ingredients import StubNutritionClient
+
+
+def create_server(tmp_path, monkeypatch) -> DiabetrServer:
+    monkeypatch.setattr(
+        session_module,
+        "get_doses_storage",
+        lambda: DosesFileHandler(str(tmp_path / "doses.csv")),
+    )
+    monkeypatch.setattr(
+        session_module,
+        "get_injections_storage",
+        lambda: InjectionsFileHandler(str(tmp_path / "injections.csv")),
+    )
+    return DiabetrServer(Session())
+
+
+async def send_requests(server: DiabetrServer, requests: list) -> list:
+    listening_server = await server.start("127.0.0.1", 0)
+    reader, writer = await asyncio.open_connection(
+        *listening_server.sockets[0].getsockname()[:2]
+    )
+    responses = []
+    for method, target, payload in requests:
+        body = b"" if payload is None else json.dumps(payload).encode()
+        writer.write(
+            f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            headers[name.lower()] = value.strip()
+        body = await reader.readexactly(int(headers["content-length"]))
+        responses.append((status, json.loads(body)))
+    writer.close()
+    listening_server.close()
+    await listening_server.wait_closed()
+    return responses
+
+
+def test_doses_and_injections_over_one_connection(tmp_path, monkeypatch):
+    server = create_server(tmp_path, monkeypatch)
+    responses = asyncio.run(
+        send_requests(
+            server,
+            [
+                ("GET", "/doses", None),
+                ("PUT", "/doses/short", {"insulin_amount": 2, "carbs_amount": 12}),
+                ("POST", "/injections", {"type": "short", "amount": 4}),
+                ("GET", "/injections", None),
+                ("GET", "/doses", None),
+            ],
+        )
+    )
+
+    assert responses[0] == (
+        200,
+        [
+            {"type": "short", "insulin_amount": 1, "carbs_amount": 10},
+            {"type": "long", "insulin_amount": 24, "carbs_amount": 0},
+        ],
+    )
+    assert responses[1][0] == 200
+    assert responses[2][0] == 201
+    assert responses[3][0] == 200
+    assert [(item["type"], item["amount"]) for item in responses[3][1]] == [
+        ("short", 4)
+    ]
+    assert responses[4][1][0]["insulin_amount"] == 2
+
+
+def test_invalid_requests_get_error_responses(tmp_path, monkeypatch):
+    server = create_server(tmp_path, monkeypatch)
+    responses = asyncio.run(
+        send_requests(
+            server,
+            [
+                ("POST", "/injections", {"type": "medium", "amount": 4}),
+                ("GET", "/injections?from=yesterday", None),
+                ("POST", "/calculate", {"food": " "}),
+                ("DELETE", "/doses", None),
+                ("GET", "/meals", None),
+            ],
+        )
+    )
+
+    assert [status for status, _ in responses] == [400, 400, 400, 405, 404]
+    assert responses[0][1] == {
+        "error": "Insulin's type must be either 'short' or 'long'."
+    }
+
+
+def test_calculate_goes_through_the_nutrition_client(tmp_path, monkeypatch):
+    server = create_server(tmp_path, monkeypatch)
+    client = StubNutritionClient()
+    monkeypatch.setattr(
+        helpers, "NUTRITION_CACHE_PATH", str(tmp_path / "nutrition_cache.json")
+    )
+    monkeypatch.setattr(
+        helpers, "INGREDIENTS_CACHE_PATH", str(tmp_path / "ingredients_cache.json")
+    )
+    monkeypatch.setattr(helpers, "is_local_nutrition_backend", lambda: False)
+    monkeypatch.setattr(helpers, "get_nutrition_client", lambda: client)
+
+    responses = asyncio.run(
+        send_requests(server, [("POST", "/calculate", {"food": "200g potatoes"})])
+    )
+
+    status, payload = responses[0]
+    assert status == 200
+    assert payload["insulin_amount"] == 4
+    assert client.queries == ["100g potatoes"]
+
+
+def test_sqlite_storage_is_used_from_the_worker_threads(tmp_path, monkeypatch):
+    database_path = str(tmp_path / "diabetr.db")
+    monkeypatch.setattr(
+        session_module, "get_doses_storage", lambda: DosesDatabaseHandler(database_path)
+    )
+    monkeypatch.setattr(
+        session_module,
+        "get_injections_storage",
+        lambda: InjectionsDatabaseHandler(database_path),
+    )
+    server = DiabetrServer(Session())
+    responses = asyncio.run(
+        send_requests(
+            server,
+            [
+                ("GET", "/doses", None),
+                ("POST", "/injections", {"type": "short", "amount": 4}),
+                ("GET", "/injections", None),
+            ],
+        )
+    )
+
+    assert [status for status, _ in responses] == [200, 201, 200]
+    assert [(item["type"], item["amount"]) for item in responses[2][1]] == [
+        ("short", 4)
+    ]
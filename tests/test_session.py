@@ -0,0 +1,53 @@
+from datetime import date, datetime
+import os
+import session as session_module
+from session import Session
+from file_handlers import InjectionsFileHandler, DosesFileHandler
+from injection import Injection
+from dose import Dose
+
+
+def create_session(tmp_path, monkeypatch) -> Session:
+    monkeypatch.setattr(
+        session_module,
+        "get_doses_storage",
+        lambda: DosesFileHandler(str(tmp_path / "doses.csv")),
+    )
+    monkeypatch.setattr(
+        session_module,
+        "get_injections_storage",
+        lambda: InjectionsFileHandler(str(tmp_path / "injections.csv")),
+    )
+    monkeypatch.setattr(session_module, "get_current_date", lambda: date(2024, 3, 4))
+    return Session()
+
+
+def test_session_reloads_doses_only_when_file_changes(tmp_path, monkeypatch):
+    session = create_session(tmp_path, monkeypatch)
+    reads = []
+    read_doses = session.doses_storage.read_doses
+    monkeypatch.setattr(
+        session.doses_storage, "read_doses", lambda: reads.append(1) or read_doses()
+    )
+
+    assert session.get_short_dose() == Dose("short", 1, 10)
+    session.get_doses()
+    assert len(reads) == 1
+
+    DosesFileHandler(str(tmp_path / "doses.csv")).update_dose(Dose("short", 2, 12))
+    os.utime(tmp_path / "doses.csv", ns=(0, 0))
+    assert session.get_short_dose() == Dose("short", 2, 12)
+    assert len(reads) == 2
+
+
+def test_session_keeps_todays_injections_in_memory(tmp_path, monkeypatch):
+    session = create_session(tmp_path, monkeypatch)
+    injection = Injection("short", 5, datetime(2024, 3, 4, 8))
+
+    assert session.get_todays_injections() == None
+
+    session.save_new_injection(injection)
+    monkeypatch.setattr(
+        session.injections_storage, "read_todays_injections", lambda: 1 / 0
+    )
+    assert session.get_todays_injections() == [injection]
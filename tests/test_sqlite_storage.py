@@ -0,0 +1,61 @@
+from datetime import date, datetime
+from sqlite_storage import (
+    InjectionsDatabaseHandler,
+    DosesDatabaseHandler,
+    migrate_csv_to_database,
+)
+from injection import Injection
+from dose import Dose
+
+
+def test_injections_database_handler_returns_injections_in_date_range(tmp_path):
+    handler = InjectionsDatabaseHandler(str(tmp_path / "diabetr.db"))
+    handler.save_new_injection(Injection("long", 24, datetime(2024, 3, 3, 22)))
+    handler.save_new_injection(Injection("short", 5, datetime(2024, 3, 4, 8)))
+    handler.save_new_injection(Injection("short", 7, datetime(2024, 3, 5, 8)))
+
+    assert list(handler.iter_injections(date(2024, 3, 3), date(2024, 3, 4))) == [
+        Injection("long", 24, datetime(2024, 3, 3, 22)),
+        Injection("short", 5, datetime(2024, 3, 4, 8)),
+    ]
+
+
+def test_doses_database_handler_updates_dose(tmp_path):
+    handler = DosesDatabaseHandler(str(tmp_path / "diabetr.db"))
+
+    assert handler.read_doses() == [Dose("short", 1, 10), Dose("long", 24, 0)]
+
+    handler.update_dose(Dose("short", 2, 15))
+    assert handler.read_doses() == [Dose("short", 2, 15), Dose("long", 24, 0)]
+
+
+def test_migrate_csv_to_database_copies_injections_once(tmp_path):
+    injections_path = tmp_path / "injections.csv"
+    injections_path.write_text(
+        "type,amount,timestamp\r\n"
+        "short,15,2024-03-03 13:29:00\r\n"
+        "long,24,2024-03-04 22:00:00\r\n"
+    )
+    doses_path = tmp_path / "doses.csv"
+    doses_path.write_text(
+        "type,insulin_amount,carbs_amount\r\nshort,2,12\r\nlong,20,0\r\n"
+    )
+    database_path = str(tmp_path / "diabetr.db")
+
+    assert migrate_csv_to_database(
+        str(injections_path), str(doses_path), database_path
+    ) == (2, 2)
+    assert migrate_csv_to_database(
+        str(injections_path), str(doses_path), database_path
+    ) == (0, 2)
+    assert DosesDatabaseHandler(database_path).read_doses()[0] == Dose("short", 2, 12)
+    assert (
+        len(
+            list(
+                InjectionsDatabaseHandler(database_path).iter_injections(
+                    date.min, date.max
+                )
+            )
+        )
+        == 2
+    )